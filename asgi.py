@@ -0,0 +1,310 @@
+"""
+ASGI serving mode: the same per-tool routes and Bearer auth as main.py, served by uvicorn.
+
+Tools with an async arun() are awaited on the event loop; other tools' run() calls go to a
+bounded thread pool, so one slow call no longer blocks every other request. Requests sent
+with Accept: application/x-ndjson to tools that have astream() are streamed record by record.
+
+    python asgi.py --port 8000 --workers 32 --max-concurrency 256 --max-queue 1024
+    uvicorn asgi:app --port 8000          # limits from ASGI_* env variables
+"""
+import argparse
+import asyncio
+import contextvars
+import inspect
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+
+from dotenv import load_dotenv
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+from main import bearer_authorized, tools, db_token
+from utils.compression import CompressionMiddleware
+from utils.batch import BatchValidationError, batch_concurrency, batch_item, parse_batch, requested_tools
+from utils.http_cache import RESPONSE_VALIDATORS, cache_control
+from utils.jobs import async_requested, get_job_runner
+from utils.metrics import CONTENT_TYPE, REGISTRY, observe_tool_call
+from utils.single_flight import TOOL_CALLS, is_read_only
+from utils.tracing import load_trace, start_trace, trace_headers, trace_requested
+
+load_dotenv()
+
+
+class ToolRunner:
+    """
+    Runs tool calls with at most max_concurrency in flight. Up to max_queue more calls wait
+    for a slot; beyond that, calls are rejected so a traffic spike cannot pile up without bound.
+    """
+
+    def __init__(self, workers: int, max_concurrency: int, max_queue: int):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="tool")
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self._slots = None
+        self._waiting = 0
+
+    def overloaded(self) -> bool:
+        return self._waiting >= self.max_queue
+
+    async def _acquire(self) -> None:
+        if self._slots is None:
+            # Created lazily so the semaphore belongs to the server's event loop
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+        self._waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self._waiting -= 1
+
+    async def run(self, tool) -> str:
+        await self._acquire()
+        try:
+            if inspect.iscoroutinefunction(getattr(tool, "arun", None)):
+                return await tool.arun()
+            # Copy the context so request-scoped state (e.g. an active trace) reaches the worker thread
+            return await asyncio.get_running_loop().run_in_executor(self.executor, contextvars.copy_context().run, tool.run)
+        finally:
+            self._slots.release()
+
+    async def stream(self, tool):
+        """Yield tool.astream() records, holding one slot until the stream ends."""
+        await self._acquire()
+        try:
+            async for record in tool.astream():
+                yield record
+        finally:
+            self._slots.release()
+
+
+def _authorized(request: Request) -> bool:
+    return bearer_authorized(request.headers.get("Authorization"), db_token)
+
+
+def create_tool_endpoint(tool_class, runner: ToolRunner):
+    async def endpoint(request: Request):
+        print(f"Endpoint /{tool_class.__name__} called")  # Debug print
+        if not _authorized(request):
+            return JSONResponse({"message": "Unauthorized"}, status_code=401)
+        if runner.overloaded():
+            return JSONResponse({"message": "Server busy, retry later"}, status_code=503, headers={"Retry-After": "1"})
+
+        started_at = time.perf_counter()
+        action, status = None, "error"
+        try:
+            if not getattr(tool_class, "loaded", True):
+                # First call of a manifest tool: import its module off the event loop
+                await asyncio.get_running_loop().run_in_executor(runner.executor, tool_class.load)
+            arguments = await request.json()
+            tool = tool_class(**arguments)
+            action = arguments.get("action")
+            if async_requested(request.query_params.get("async")):
+                # Long calls run as a job; poll /jobs/{job_id} for progress and the result
+                job_id = await asyncio.to_thread(get_job_runner().submit, tool_class.__name__, arguments, tool.run)
+                status = "queued"
+                return JSONResponse({"job_id": job_id, "status": "queued", "status_url": f"/jobs/{job_id}"}, status_code=202)
+            if "application/x-ndjson" in (request.headers.get("Accept") or "") and hasattr(tool, "astream"):
+                status = "streamed"
+                return StreamingResponse(stream_ndjson(tool, runner), media_type="application/x-ndjson")
+            if trace_requested(request.headers.get("X-Trace"), request.query_params.get("trace")):
+                # Traced calls always execute, bypassing coalescing and revalidation
+                with start_trace(f"{tool_class.__name__} {action or ''}".strip(), tool=tool_class.__name__, action=action) as trace:
+                    result = await runner.run(tool)
+                response = JSONResponse({"response": result}, headers=await asyncio.to_thread(trace_headers, trace))
+            elif is_read_only(tool_class):
+                response = await run_read_tool(request, tool_class, tool, arguments, runner)
+            else:
+                response = JSONResponse({"response": await runner.run(tool)})
+            status = "not_modified" if response.status_code == 304 else "ok"
+            return response
+        except Exception as e:
+            return JSONResponse({"Error": str(e)})
+        finally:
+            observe_tool_call(tool_class.__name__, action, status, time.perf_counter() - started_at)
+    return endpoint
+
+
+async def stream_ndjson(tool, runner: ToolRunner):
+    """One JSON record per line, sent as soon as the tool yields it."""
+    try:
+        async for record in runner.stream(tool):
+            yield json.dumps(record) + "\n"
+    except Exception as e:
+        yield json.dumps({"type": "error", "error": str(e)}) + "\n"
+
+
+async def freshness_token(tool):
+    """The tool's cheap data version marker, or None if it has none or the check fails."""
+    try:
+        if hasattr(tool, "afreshness_token"):
+            return await tool.afreshness_token()
+        return None
+    except Exception as e:
+        print(f"Freshness check failed: {e}")
+        return None
+
+
+async def run_read_tool(request: Request, tool_class, tool, arguments: dict, runner: ToolRunner):
+    """Run a read-only tool with coalescing, Cache-Control and ETag / If-None-Match revalidation."""
+    if_none_match = request.headers.get("If-None-Match")
+    headers = {"Cache-Control": cache_control(arguments.get("action"))}
+    validator_key, etag = RESPONSE_VALIDATORS.revalidate(tool_class.__name__, arguments, await freshness_token(tool), if_none_match)
+    if etag:
+        return Response(status_code=304, headers=dict(headers, ETag=etag))
+
+    # Identical read calls already in flight share one execution (and one runner slot)
+    result = await TOOL_CALLS.ado(TOOL_CALLS.key(tool_class.__name__, arguments), lambda: runner.run(tool))
+    response = JSONResponse({"response": result}, headers=headers)
+    etag, not_modified = RESPONSE_VALIDATORS.finish(validator_key, response.body, if_none_match)
+    if not_modified:
+        return Response(status_code=304, headers=dict(headers, ETag=etag))
+    if etag:
+        response.headers["ETag"] = etag
+    return response
+
+
+def create_batch_endpoint(tools_by_name: dict, runner: ToolRunner):
+    async def batch(request: Request):
+        """
+        Run an array of {"tool", "args"} calls concurrently (at most ?max_concurrency at once) and
+        return their results in order. Nothing runs unless every call validates.
+        """
+        if not _authorized(request):
+            return JSONResponse({"message": "Unauthorized"}, status_code=401)
+        if runner.overloaded():
+            return JSONResponse({"message": "Server busy, retry later"}, status_code=503, headers={"Retry-After": "1"})
+        try:
+            payload = await request.json()
+        except ValueError:
+            payload = None
+        loop = asyncio.get_running_loop()
+        for tool_class in requested_tools(payload, tools_by_name):
+            if not getattr(tool_class, "loaded", True):
+                # Import manifest tools off the event loop before they are instantiated
+                await loop.run_in_executor(runner.executor, tool_class.load)
+        try:
+            calls = parse_batch(payload, tools_by_name)
+        except BatchValidationError as e:
+            return JSONResponse({"Error": str(e), "errors": e.errors}, status_code=400)
+
+        requested = request.query_params.get("max_concurrency")
+        slots = asyncio.Semaphore(batch_concurrency(int(requested) if requested and requested.isdigit() else None, len(calls)))
+
+        async def run_call(call):
+            async with slots:
+                started_at = time.perf_counter()
+                try:
+                    if is_read_only(call.tool_class):
+                        response = await TOOL_CALLS.ado(TOOL_CALLS.key(call.name, call.arguments), lambda: runner.run(call.tool))
+                    else:
+                        response = await runner.run(call.tool)
+                    item = batch_item(call, started_at, response=response)
+                except Exception as e:
+                    item = batch_item(call, started_at, error=e)
+                observe_tool_call(call.name, call.arguments.get("action"), "error" if "Error" in item else "ok", time.perf_counter() - started_at)
+                return item
+
+        started_at = time.perf_counter()
+        results = await asyncio.gather(*(run_call(call) for call in calls))
+        return JSONResponse({"results": results, "elapsed_ms": round((time.perf_counter() - started_at) * 1000, 1)})
+    return batch
+
+
+async def notion_metrics(request: Request):
+    """Retry and throttling counters of the shared Notion client."""
+    from utils.notion_api import get_client_metrics
+    if not _authorized(request):
+        return JSONResponse({"message": "Unauthorized"}, status_code=401)
+    return JSONResponse(dict(get_client_metrics(), single_flight=TOOL_CALLS.stats(), http_cache=RESPONSE_VALIDATORS.stats()))
+
+
+async def metrics(request: Request):
+    """Tool, Notion API and cache metrics in the Prometheus text format."""
+    if not _authorized(request):
+        return JSONResponse({"message": "Unauthorized"}, status_code=401)
+    return Response(REGISTRY.render(), headers={"Content-Type": CONTENT_TYPE})
+
+
+async def get_job(request: Request):
+    """Status, progress counters and, once finished, the result of a call made with ?async=1."""
+    if not _authorized(request):
+        return JSONResponse({"message": "Unauthorized"}, status_code=401)
+    job = await asyncio.to_thread(get_job_runner().get, request.path_params["job_id"])
+    if job is None:
+        return JSONResponse({"message": "Job not found"}, status_code=404)
+    return JSONResponse(job)
+
+
+async def get_trace(request: Request):
+    """A trace saved for a request sent with X-Trace: 1, as Chrome trace-event JSON."""
+    if not _authorized(request):
+        return JSONResponse({"message": "Unauthorized"}, status_code=401)
+    trace = load_trace(request.path_params["trace_id"])
+    if trace is None:
+        return JSONResponse({"message": "Trace not found"}, status_code=404)
+    return Response(trace, media_type="application/json")
+
+
+async def slack_events(request: Request):
+    """Slack Events API receiver; channel and user events keep the Slack directories current."""
+    from utils.slack_directory import handle_slack_event
+    status, body = handle_slack_event(await request.body(), dict(request.headers))
+    return JSONResponse(body, status_code=status)
+
+
+def create_app(workers: int, max_concurrency: int, max_queue: int, tool_classes: list = None) -> Starlette:
+    """Build the ASGI app with one POST route per tool class (default: every tool found by main.py)."""
+    runner = ToolRunner(workers, max_concurrency, max_queue)
+    tool_classes = tool_classes or tools
+    routes = [Route(f"/{tool.__name__}", create_tool_endpoint(tool, runner), methods=["POST"], name=tool.__name__) for tool in tool_classes]
+    routes.append(Route("/batch", create_batch_endpoint({tool.__name__: tool for tool in tool_classes}, runner), methods=["POST"]))
+    routes.append(Route("/notion/metrics", notion_metrics, methods=["GET"]))
+    routes.append(Route("/metrics", metrics, methods=["GET"]))
+    routes.append(Route("/jobs/{job_id}", get_job, methods=["GET"]))
+    routes.append(Route("/traces/{trace_id}", get_trace, methods=["GET"]))
+    routes.append(Route("/slack/events", slack_events, methods=["POST"]))
+
+    @asynccontextmanager
+    async def lifespan(app):
+        yield
+        runner.executor.shutdown(wait=False)
+
+    app = Starlette(routes=routes, lifespan=lifespan, middleware=[Middleware(CompressionMiddleware)])
+    app.state.runner = runner
+    return app
+
+
+def _limits_from_env() -> dict:
+    return {
+        "workers": int(os.getenv("ASGI_TOOL_WORKERS", 32)),
+        "max_concurrency": int(os.getenv("ASGI_MAX_CONCURRENCY", 256)),
+        "max_queue": int(os.getenv("ASGI_MAX_QUEUE", 1024)),
+    }
+
+
+app = create_app(**_limits_from_env())
+
+
+def main():
+    import uvicorn
+
+    limits = _limits_from_env()
+    parser = argparse.ArgumentParser(description="Serve the tool endpoints over ASGI with uvicorn")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", 8000)))
+    parser.add_argument("--workers", type=int, default=limits["workers"], help="Threads running synchronous tool calls (ASGI_TOOL_WORKERS)")
+    parser.add_argument("--max-concurrency", type=int, default=limits["max_concurrency"], help="Tool calls in flight at once (ASGI_MAX_CONCURRENCY)")
+    parser.add_argument("--max-queue", type=int, default=limits["max_queue"], help="Calls waiting for a slot before new ones get 503 (ASGI_MAX_QUEUE)")
+    args = parser.parse_args()
+
+    uvicorn.run(create_app(args.workers, args.max_concurrency, args.max_queue), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,304 @@
+"""
+Micro-benchmark for clean_notion_database_response: rows/sec of the compiled field
+extractors against the previous interpreting implementation.
+
+Raw Notion pages are synthesized from the captured cleaned outputs in
+local_agency/local-tests/outputs and repeated up to --rows rows per database.
+Both implementations must produce identical output before they are timed.
+
+    python benchmarks/bench_database_cleanup.py --rows 1000
+"""
+import argparse
+import ast
+import itertools
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.db_response_cleanup import DATABASE_CONFIGS, clean_notion_database_response
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), '..', 'local_agency', 'local-tests', 'outputs')
+FIXTURE_FILES = {
+    "4542b3f7-39c3-47e0-9ecd-22c58437d812": "list_notes_db.py",
+    "567db0a8-1efc-4123-9478-ef08bdb9db6a": "list_projects_db.py",
+    "42fad9c5-af8f-4059-a906-ed6eedc6c571": "list_tasks_db.py",
+}
+
+
+def load_fixture_items(database_id):
+    """Cleaned items captured from a real query_database call (JSON or Python literal)."""
+    with open(os.path.join(FIXTURES_DIR, FIXTURE_FILES[database_id])) as f:
+        source = f.read()
+    source = source.replace("true", "True").replace("false", "False").replace("null", "None")
+    return ast.literal_eval(source)["items"]
+
+
+def _rich_text(text):
+    return [{"type": "text", "plain_text": text, "text": {"content": text}}]
+
+
+def _person(value):
+    return {"object": "user", "id": value, "name": value, "person": {"email": f"{value}@example.com"}}
+
+
+def raw_property(field_config, value):
+    """Rebuild the raw Notion property that the configured field would have been extracted from."""
+    field_type = field_config["type"]
+    if field_type == "title":
+        return {"type": "title", "title": _rich_text(value) if value else []}
+    if field_type == "created_by":
+        return {"type": "created_by", "created_by": _person(value)}
+    if field_type == "status":
+        return {"type": "status", "status": {"name": value} if value else None}
+    if field_type == "select":
+        return {"type": "select", "select": {"name": value} if value else None}
+    if field_type == "multi_select":
+        return {"type": "multi_select", "multi_select": [{"name": tag} for tag in value or []]}
+    if field_type == "people":
+        values = value if isinstance(value, list) else [value]
+        return {"type": "people", "people": [_person(v.get("name") if isinstance(v, dict) else v) for v in values if v]}
+    if field_type == "relation":
+        values = value if isinstance(value, list) else [value]
+        return {"type": "relation", "relation": [{"id": v} for v in values if v]}
+    if field_type == "relation_count":
+        return {"type": "relation", "relation": [{"id": str(i)} for i in range(value or 0)]}
+    if field_type == "url_property":
+        return {"type": "url", "url": value}
+    if field_type in ("date_start", "date_range"):
+        dates = value if isinstance(value, dict) else {"start": value, "end": None}
+        return {"type": "date", "date": dates if value else None}
+    if field_type == "unique_id":
+        prefix = "".join(itertools.takewhile(str.isalpha, value or ""))
+        number = value[len(prefix):] if value else None
+        return {"type": "unique_id", "unique_id": {"prefix": prefix or None, "number": int(number) if number else None}}
+    if field_type == "formula":
+        formula_type = field_config.get("formula_type", "string")
+        return {"type": "formula", "formula": {"type": formula_type, formula_type: value}}
+    return None
+
+
+def raw_page_from_item(item, db_config):
+    page = {"object": "page", "id": None, "url": None, "properties": {}}
+    for field_name, field_config in db_config["fields"].items():
+        if field_name not in item:
+            continue
+        value = item[field_name]
+        field_type = field_config["type"]
+        if field_type == "id":
+            page["id"] = value
+        elif field_type == "url":
+            page["url"] = value
+        elif field_type == "timestamp":
+            page[field_config["property"]] = value
+        else:
+            prop = raw_property(field_config, value)
+            existing = page["properties"].get(field_config["property"])
+            # Several fields can read the same property (e.g. people name and id); keep the first rebuild
+            if prop is not None and existing is None:
+                page["properties"][field_config["property"]] = prop
+    return page
+
+
+def synthesize_pages(database_id, rows):
+    db_config = DATABASE_CONFIGS[database_id]
+    pages = [raw_page_from_item(item, db_config) for item in load_fixture_items(database_id)]
+    return list(itertools.islice(itertools.cycle(pages), rows))
+
+
+def rows_per_second(function, pages, database_id, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(pages, database_id)
+        best = min(best, time.perf_counter() - start)
+    return len(pages) / best
+
+
+def legacy_clean_notion_database_response(notion_response, database_id):
+    """Interpreting implementation used before configs were compiled (kept for comparison)."""
+    def extract_field_value(item, field_config):
+        """Extract field value based on the field configuration"""
+        field_type = field_config["type"]
+        
+        if field_type == "id":
+            return item.get("id")
+        
+        elif field_type == "url":
+            return item.get("url")
+        
+        elif field_type == "timestamp":
+            return item.get(field_config["property"])
+        
+        elif field_type == "title":
+            title_property = item.get("properties", {}).get(field_config["property"])
+            if title_property and title_property.get("type") == "title":
+                title_content = title_property.get("title", [])
+                if title_content and len(title_content) > 0:
+                    return title_content[0].get("plain_text")
+            return None
+        
+        elif field_type == "created_by":
+            created_by_property = item.get("properties", {}).get(field_config["property"])
+            if created_by_property and created_by_property.get("type") == "created_by":
+                created_by_data = created_by_property.get("created_by")
+                if created_by_data and created_by_data.get("object") == "user":
+                    extract_type = field_config.get("extract", "name")
+                    return created_by_data.get(extract_type)
+            return None
+        
+        elif field_type == "status":
+            status_property = item.get("properties", {}).get(field_config["property"])
+            if not status_property:
+                # Try generic encoded property names
+                encoded_names = [
+                    f"notion%3A%2F%2F{DATABASE_CONFIGS.get(database_id, {}).get('name', 'unknown')}%2Fstatus_property"
+                ]
+                for encoded_name in encoded_names:
+                    status_property = item.get("properties", {}).get(encoded_name)
+                    if status_property:
+                        break
+            
+            if status_property and status_property.get("type") == "status":
+                status_data = status_property.get("status")
+                if status_data:
+                    return status_data.get("name")
+            return None
+        
+        elif field_type == "select":
+            select_property = item.get("properties", {}).get(field_config["property"])
+            if select_property and select_property.get("type") == "select":
+                select_data = select_property.get("select")
+                if select_data:
+                    return select_data.get("name")
+            return None
+        
+        elif field_type == "multi_select":
+            multi_select_property = item.get("properties", {}).get(field_config["property"])
+            if multi_select_property and multi_select_property.get("type") == "multi_select":
+                multi_select_list = multi_select_property.get("multi_select", [])
+                return [tag.get("name") for tag in multi_select_list if tag.get("name")]
+            return []
+        
+        elif field_type == "people":
+            people_property = item.get("properties", {}).get(field_config["property"])
+            if people_property and people_property.get("type") == "people":
+                people_list = people_property.get("people", [])
+                if people_list:
+                    extract_type = field_config.get("extract", "name")
+                    is_single = field_config.get("single", False)
+                    
+                    if extract_type == "full":
+                        # Return full person objects with id, name, email
+                        result = []
+                        for person in people_list:
+                            person_info = {
+                                "id": person.get("id"),
+                                "name": person.get("name"),
+                                "email": person.get("person", {}).get("email") if person.get("person") else None
+                            }
+                            result.append(person_info)
+                        return result
+                    else:
+                        # Return just names or ids
+                        result = [person.get(extract_type) for person in people_list if person.get(extract_type)]
+                        return result[0] if is_single and result else result
+            return None if field_config.get("single") else []
+        
+        elif field_type == "relation":
+            relation_property = item.get("properties", {}).get(field_config["property"])
+            if relation_property and relation_property.get("type") == "relation":
+                relation_list = relation_property.get("relation", [])
+                relation_ids = [rel.get("id") for rel in relation_list if rel.get("id")]
+                is_single = field_config.get("single", False)
+                return relation_ids[0] if is_single and relation_ids else relation_ids
+            return None if field_config.get("single") else []
+        
+        elif field_type == "relation_count":
+            relation_property = item.get("properties", {}).get(field_config["property"])
+            if relation_property and relation_property.get("type") == "relation":
+                relation_list = relation_property.get("relation", [])
+                return len(relation_list)
+            return 0
+        
+        elif field_type == "url_property":
+            url_property = item.get("properties", {}).get(field_config["property"])
+            if url_property and url_property.get("type") == "url":
+                return url_property.get("url")
+            return None
+        
+        elif field_type == "date_start":
+            date_property = item.get("properties", {}).get(field_config["property"])
+            if date_property and date_property.get("type") == "date":
+                date_data = date_property.get("date")
+                if date_data:
+                    return date_data.get("start")
+            return None
+        
+        elif field_type == "date_range":
+            date_property = item.get("properties", {}).get(field_config["property"])
+            if date_property and date_property.get("type") == "date":
+                date_data = date_property.get("date")
+                if date_data:
+                    return {
+                        "start": date_data.get("start"),
+                        "end": date_data.get("end")
+                    }
+            return None
+        
+        elif field_type == "unique_id":
+            unique_id_property = item.get("properties", {}).get(field_config["property"])
+            if unique_id_property and unique_id_property.get("type") == "unique_id":
+                unique_id_data = unique_id_property.get("unique_id")
+                if unique_id_data:
+                    prefix = unique_id_data.get("prefix", "")
+                    number = unique_id_data.get("number")
+                    if number is not None:
+                        return f"{prefix}{number}" if prefix else str(number)
+            return None
+        
+        elif field_type == "formula":
+            formula_property = item.get("properties", {}).get(field_config["property"])
+            if formula_property and formula_property.get("type") == "formula":
+                formula_data = formula_property.get("formula")
+                expected_type = field_config.get("formula_type", "string")
+                if formula_data and formula_data.get("type") == expected_type:
+                    return formula_data.get(expected_type)
+            return None
+        
+        return None
+    
+    db_config = DATABASE_CONFIGS[database_id]
+    cleaned_data = []
+    
+    for item in notion_response:
+        extracted_item = {}
+        
+        # Extract each configured field
+        for field_name, field_config in db_config["fields"].items():
+            extracted_item[field_name] = extract_field_value(item, field_config)
+        
+        cleaned_data.append(extracted_item)
+    
+    return cleaned_data
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1000, help="Rows per database (default: 1000)")
+    parser.add_argument("--repeat", type=int, default=20, help="Timed runs per implementation; the best run is reported")
+    args = parser.parse_args()
+
+    print(f"{'database':<10} {'rows':>6} {'before rows/s':>15} {'after rows/s':>14} {'speedup':>8}")
+    for database_id in FIXTURE_FILES:
+        pages = synthesize_pages(database_id, args.rows)
+        assert clean_notion_database_response(pages, database_id) == legacy_clean_notion_database_response(pages, database_id)
+        before = rows_per_second(legacy_clean_notion_database_response, pages, database_id, args.repeat)
+        after = rows_per_second(clean_notion_database_response, pages, database_id, args.repeat)
+        name = DATABASE_CONFIGS[database_id]["name"]
+        print(f"{name:<10} {len(pages):>6} {before:>15,.0f} {after:>14,.0f} {after / before:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
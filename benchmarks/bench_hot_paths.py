@@ -0,0 +1,115 @@
+"""
+pytest-benchmark suite for the cleanup and serialization hot paths. Runs fully offline on
+synthetic payloads (benchmarks/payloads.py) and on pages rebuilt from the captured
+local_agency/local-tests/outputs fixtures.
+
+Besides timings, each benchmark records in extra_info its throughput (items_per_sec, with
+the item unit), the bytes still allocated by the result and the peak traced memory of one
+call. Record a run and compare it against the committed baseline:
+
+    python -m pytest benchmarks/bench_hot_paths.py --benchmark-json=.cache/bench.json
+    python benchmarks/compare_baseline.py .cache/bench.json
+
+Refresh the baseline with --benchmark-json=benchmarks/baseline.json.
+"""
+import os
+import sys
+import tracemalloc
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from payloads import (FIXTURE_DATABASE_IDS, fixture_pages, flatten_blocks, generate_block_tree, generate_database_pages,
+                      generate_generic_pages, generate_search_response, generate_tool_response)
+from utils.db_response_cleanup import (DATABASE_CONFIGS, _extract_generic_database_response, clean_notion_database_response,
+                                       clean_notion_search_response)
+from utils.helpers import limit_response_length
+from utils.page_blocks_cleanup import extract_text_from_block
+
+ROW_COUNTS = [1000, 10000]
+BLOCK_COUNTS = [500, 5000]
+TASKS_DB_ID = "42fad9c5-af8f-4059-a906-ed6eedc6c571"
+
+
+def run_benchmark(benchmark, function, *args, items: int, unit: str):
+    """Time function(*args), then trace one extra call to record throughput and memory in extra_info."""
+    result = benchmark(function, *args)
+
+    tracemalloc.start()
+    try:
+        baseline_bytes = tracemalloc.get_traced_memory()[0]
+        output = function(*args)
+        current_bytes, peak_bytes = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del output
+
+    benchmark.extra_info.update({
+        "items": items,
+        "unit": unit,
+        "allocated_bytes": current_bytes - baseline_bytes,
+        "peak_bytes": peak_bytes - baseline_bytes,
+    })
+    if benchmark.stats is not None:
+        benchmark.extra_info["items_per_sec"] = items / benchmark.stats.stats.median
+    return result
+
+
+@pytest.mark.parametrize("rows", ROW_COUNTS)
+@pytest.mark.parametrize("database_id", list(DATABASE_CONFIGS), ids=[config["name"] for config in DATABASE_CONFIGS.values()])
+def test_clean_database_response_synthetic(benchmark, database_id, rows):
+    pages = generate_database_pages(database_id, rows)
+    result = run_benchmark(benchmark, clean_notion_database_response, pages, database_id, items=rows, unit="rows")
+    assert len(result) == rows
+
+
+@pytest.mark.parametrize("database_id", FIXTURE_DATABASE_IDS, ids=[DATABASE_CONFIGS[db]["name"] for db in FIXTURE_DATABASE_IDS])
+def test_clean_database_response_fixtures(benchmark, database_id):
+    pages = fixture_pages(database_id, 1000)
+    result = run_benchmark(benchmark, clean_notion_database_response, pages, database_id, items=len(pages), unit="rows")
+    assert len(result) == len(pages)
+
+
+@pytest.mark.parametrize("rows", ROW_COUNTS)
+def test_extract_generic_database_response(benchmark, rows):
+    pages = generate_generic_pages(rows)
+    result = run_benchmark(benchmark, _extract_generic_database_response, pages, items=rows, unit="rows")
+    assert len(result) == rows
+
+
+@pytest.mark.parametrize("results", [100, 1000])
+def test_clean_search_response(benchmark, results):
+    response = generate_search_response(results)
+    result = run_benchmark(benchmark, clean_notion_search_response, response, items=results, unit="results")
+    assert result["items_length"] == results
+
+
+def _extract_all_text(blocks):
+    return [extract_text_from_block(block) for block in blocks]
+
+
+@pytest.mark.parametrize("blocks", BLOCK_COUNTS)
+def test_extract_text_from_block_tree(benchmark, blocks):
+    flat = flatten_blocks(generate_block_tree(blocks))
+    result = run_benchmark(benchmark, _extract_all_text, flat, items=len(flat), unit="blocks")
+    assert len(result) == blocks
+
+
+@pytest.mark.parametrize("characters", [20000, 1000000])
+def test_limit_response_length(benchmark, characters):
+    response = generate_tool_response(characters)
+    result = run_benchmark(benchmark, limit_response_length, response, items=len(response), unit="characters")
+    assert result.startswith("{")
+
+
+def test_limit_response_length_database_rows(benchmark):
+    """End-to-end serialization of a 10k-row cleaned Tasks query as NotionReadTool returns it."""
+    import json
+    cleaned = clean_notion_database_response(generate_database_pages(TASKS_DB_ID, 10000), TASKS_DB_ID)
+
+    def serialize(items):
+        return limit_response_length(json.dumps({"items": items, "items_length": len(items)}, indent=2))
+
+    run_benchmark(benchmark, serialize, cleaned, items=len(cleaned), unit="rows")
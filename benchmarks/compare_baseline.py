@@ -0,0 +1,67 @@
+"""
+Compare a pytest-benchmark JSON run of benchmarks/bench_hot_paths.py with the committed
+baseline and report regressions in throughput (items/sec), bytes allocated and peak memory.
+Exits with status 1 when any metric regresses by more than --threshold.
+
+    python benchmarks/compare_baseline.py .cache/bench.json --threshold 0.15
+"""
+import argparse
+import json
+import os
+import sys
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+# metric -> True when a larger value is better
+METRICS = {"items_per_sec": True, "allocated_bytes": False, "peak_bytes": False}
+
+
+def load_results(path):
+    with open(path) as f:
+        data = json.load(f)
+    return {bench["fullname"].split("::", 1)[-1]: bench["extra_info"] for bench in data["benchmarks"]}
+
+
+def compare(baseline, current, threshold):
+    """Return (rows, regressions): one row per benchmark and metric present in both runs."""
+    rows = []
+    regressions = []
+    for name in sorted(set(baseline) & set(current)):
+        for metric, higher_is_better in METRICS.items():
+            before = baseline[name].get(metric)
+            after = current[name].get(metric)
+            if not before or after is None:
+                continue
+            change = (after - before) / before
+            regressed = -change > threshold if higher_is_better else change > threshold
+            rows.append((name, metric, before, after, change, regressed))
+            if regressed:
+                regressions.append((name, metric))
+    return rows, regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("results", help="JSON written by --benchmark-json")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON (default: benchmarks/baseline.json)")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Allowed relative regression (default: 0.10)")
+    args = parser.parse_args()
+
+    baseline = load_results(args.baseline)
+    current = load_results(args.results)
+    rows, regressions = compare(baseline, current, args.threshold)
+
+    print(f"{'benchmark':<72} {'metric':<16} {'baseline':>14} {'current':>14} {'change':>8}")
+    for name, metric, before, after, change, regressed in rows:
+        flag = "  REGRESSION" if regressed else ""
+        print(f"{name:<72} {metric:<16} {before:>14,.0f} {after:>14,.0f} {change:>+7.1%}{flag}")
+    for name in sorted(set(baseline) - set(current)):
+        print(f"{name}: missing from this run")
+
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) above {args.threshold:.0%}")
+        sys.exit(1)
+    print("\nNo regressions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""
+Deterministic synthetic Notion payloads for the benchmark suite.
+
+Every generator takes a size and a seed and builds raw API-shaped objects offline, so
+benchmarks scale to 10k database rows or 5k-block trees without touching Notion.
+"""
+import json
+import os
+import random
+import sys
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from bench_database_cleanup import raw_property, synthesize_pages, FIXTURE_FILES
+from utils.db_response_cleanup import DATABASE_CONFIGS
+
+WORDS = ("agent", "deploy", "notion", "slack", "review", "sprint", "bug", "design", "client", "release",
+         "invoice", "onboarding", "roadmap", "meeting", "prompt", "backend", "frontend", "metrics")
+BLOCK_TYPES = ("paragraph", "heading_1", "heading_2", "bulleted_list_item", "numbered_list_item", "to_do",
+               "toggle", "quote", "callout", "code", "bookmark", "divider")
+
+
+def _sentence(rng, words=8):
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize()
+
+
+def _rich_text(text):
+    return [{"type": "text", "text": {"content": text, "link": None}, "annotations": {"bold": False, "code": False},
+             "plain_text": text, "href": None}]
+
+
+def _timestamp(rng):
+    moment = datetime(2024, 1, 1, tzinfo=timezone.utc) + timedelta(minutes=rng.randrange(0, 600 * 24 * 60))
+    return moment.strftime("%Y-%m-%dT%H:%M:00.000Z")
+
+
+def _uuid(rng):
+    return "%08x-%04x-%04x-%04x-%012x" % (rng.getrandbits(32), rng.getrandbits(16), rng.getrandbits(16),
+                                          rng.getrandbits(16), rng.getrandbits(48))
+
+
+def _field_value(rng, field_config):
+    """A plausible cleaned value for one configured field, turned into a raw property by raw_property."""
+    field_type = field_config["type"]
+    if field_type in ("title",):
+        return _sentence(rng, 5)
+    if field_type == "created_by":
+        return rng.choice(("Ana", "Bilal", "Chen", "Dara"))
+    if field_type in ("status", "select"):
+        return rng.choice(("Not started", "In progress", "Done", "High", "Low", None))
+    if field_type == "multi_select":
+        return rng.sample(WORDS, rng.randrange(0, 4))
+    if field_type == "people":
+        return [rng.choice(("Ana", "Bilal", "Chen", "Dara")) for _ in range(rng.randrange(0, 3))]
+    if field_type == "relation":
+        return [_uuid(rng) for _ in range(rng.randrange(0, 3))]
+    if field_type == "relation_count":
+        return rng.randrange(0, 20)
+    if field_type == "url_property":
+        return f"https://example.com/{rng.choice(WORDS)}"
+    if field_type in ("date_start", "date_range"):
+        return {"start": _timestamp(rng)[:10], "end": None} if rng.random() < 0.7 else None
+    if field_type == "unique_id":
+        return f"TASK{rng.randrange(1, 10000)}"
+    if field_type == "formula":
+        return rng.random() < 0.5 if field_config.get("formula_type") == "boolean" else _sentence(rng, 2)
+    return None
+
+
+def generate_database_pages(database_id, rows, seed=0):
+    """Raw databases.query results for one of the configured databases (see DATABASE_CONFIGS)."""
+    rng = random.Random(seed)
+    db_config = DATABASE_CONFIGS[database_id]
+    pages = []
+    for _ in range(rows):
+        created_time = _timestamp(rng)
+        page = {"object": "page", "id": _uuid(rng), "url": None, "created_time": created_time,
+                "last_edited_time": created_time, "archived": False, "in_trash": False, "properties": {}}
+        page["url"] = f"https://www.notion.so/{page['id'].replace('-', '')}"
+        for field_config in db_config["fields"].values():
+            if "property" not in field_config or field_config["type"] == "timestamp":
+                continue
+            prop = raw_property(field_config, _field_value(rng, field_config))
+            if prop is not None:
+                page["properties"].setdefault(field_config["property"], prop)
+        pages.append(page)
+    return pages
+
+
+def generate_generic_pages(rows, seed=0):
+    """Raw pages from an unconfigured database, covering the property types the generic extractor reads."""
+    rng = random.Random(seed)
+    pages = []
+    for _ in range(rows):
+        page_id = _uuid(rng)
+        user = {"object": "user", "id": _uuid(rng), "name": rng.choice(("Ana", "Bilal", "Chen"))}
+        pages.append({
+            "object": "page", "id": page_id, "url": f"https://www.notion.so/{page_id.replace('-', '')}",
+            "created_time": _timestamp(rng), "last_edited_time": _timestamp(rng), "archived": False, "in_trash": False,
+            "icon": {"type": "emoji", "emoji": "📄"}, "parent": {"type": "database_id", "database_id": _uuid(rng)},
+            "created_by": {"object": "user", "id": user["id"]}, "last_edited_by": {"object": "user", "id": user["id"]},
+            "properties": {
+                "Name": {"id": "title", "type": "title", "title": _rich_text(_sentence(rng, 4))},
+                "Notes": {"id": "n", "type": "rich_text", "rich_text": _rich_text(_sentence(rng, 20))},
+                "Tags": {"id": "t", "type": "multi_select", "multi_select": [{"name": w} for w in rng.sample(WORDS, 3)]},
+                "Category": {"id": "c", "type": "select", "select": {"name": rng.choice(WORDS)}},
+                "Status": {"id": "s", "type": "status", "status": {"name": rng.choice(("Todo", "Doing", "Done"))}},
+                "Owner": {"id": "o", "type": "people", "people": [user]},
+                "Done": {"id": "d", "type": "checkbox", "checkbox": rng.random() < 0.5},
+                "Due": {"id": "du", "type": "date", "date": {"start": _timestamp(rng)[:10], "end": None}},
+                "Link": {"id": "l", "type": "url", "url": "https://example.com"},
+                "Estimate": {"id": "e", "type": "number", "number": rng.randrange(1, 40)},
+                "Related": {"id": "r", "type": "relation", "relation": [{"id": _uuid(rng)}]},
+            },
+        })
+    return pages
+
+
+def generate_search_response(results, seed=0):
+    """A search endpoint response mixing pages (80%) and databases."""
+    rng = random.Random(seed)
+    items = []
+    for page in generate_generic_pages(results, seed):
+        if rng.random() < 0.8:
+            items.append(page)
+        else:
+            items.append({
+                "object": "database", "id": page["id"], "url": page["url"], "created_time": page["created_time"],
+                "last_edited_time": page["last_edited_time"], "archived": False, "in_trash": False,
+                "title": _rich_text(_sentence(rng, 3)), "description": _rich_text(_sentence(rng, 10)),
+                "parent": {"type": "page_id", "page_id": _uuid(rng)}, "properties": {k: {"type": v["type"]} for k, v in page["properties"].items()},
+            })
+    return {"object": "list", "results": items, "has_more": False, "next_cursor": None, "request_id": _uuid(rng)}
+
+
+def generate_block_tree(blocks, fanout=8, seed=0):
+    """
+    A page block tree with `blocks` blocks in get_blocks_recursive_full shape (children under
+    "children_blocks"), filled breadth-first with up to `fanout` children per block.
+    """
+    rng = random.Random(seed)
+
+    def make_block():
+        block_type = rng.choice(BLOCK_TYPES)
+        if block_type == "divider":
+            content = {}
+        elif block_type == "bookmark":
+            content = {"url": f"https://example.com/{rng.choice(WORDS)}", "caption": []}
+        else:
+            content = {"rich_text": _rich_text(_sentence(rng, rng.randrange(3, 30))), "color": "default"}
+        return {"object": "block", "id": _uuid(rng), "type": block_type, "has_children": False,
+                "created_time": _timestamp(rng), "last_edited_time": _timestamp(rng), block_type: content}
+
+    root = [make_block() for _ in range(min(blocks, fanout))]
+    queue = list(root)
+    remaining = blocks - len(root)
+    while remaining > 0 and queue:
+        parent = queue.pop(0)
+        children = [make_block() for _ in range(min(remaining, fanout))]
+        parent["has_children"] = True
+        parent["children_blocks"] = children
+        queue.extend(children)
+        remaining -= len(children)
+    return root
+
+
+def flatten_blocks(tree):
+    """Every block of a generate_block_tree tree in document order."""
+    blocks = []
+    stack = list(reversed(tree))
+    while stack:
+        block = stack.pop()
+        blocks.append(block)
+        stack.extend(reversed(block.get("children_blocks", [])))
+    return blocks
+
+
+def generate_tool_response(characters, seed=0):
+    """A pretty-printed JSON tool response of roughly `characters` characters, as passed to limit_response_length."""
+    rng = random.Random(seed)
+    items = []
+    size = 0
+    while size < characters:
+        item = {"id": _uuid(rng), "title": _sentence(rng, 6), "status": rng.choice(("Todo", "Done")), "tags": rng.sample(WORDS, 3)}
+        size += len(json.dumps(item, indent=2)) + 6
+        items.append(item)
+    return json.dumps({"items": items, "items_length": len(items), "has_more": False}, indent=2)
+
+
+def fixture_pages(database_id, rows):
+    """Raw pages rebuilt from the captured query_database outputs in local_agency/local-tests/outputs."""
+    return synthesize_pages(database_id, rows)
+
+
+FIXTURE_DATABASE_IDS = list(FIXTURE_FILES)
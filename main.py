@@ -1,39 +1,117 @@
+import hmac
+import json
 import os
-from flask import Flask, request, jsonify
-from agency_swarm.tools import ToolFactory
+import time
+from concurrent.futures import ThreadPoolExecutor
+from flask import Flask, Response, request, jsonify
 from dotenv import load_dotenv
 
+from utils.async_runner import iterate_sync
+from utils.compression import compress_body, compress_stream, is_compressible, min_size, negotiate, weak_etag
+from utils.batch import BatchValidationError, batch_concurrency, batch_item, parse_batch
+from utils.http_cache import RESPONSE_VALIDATORS, cache_control
+from utils.jobs import async_requested, get_job_runner
+from utils.metrics import CONTENT_TYPE, REGISTRY, observe_tool_call
+from utils.single_flight import TOOL_CALLS, is_read_only
+from utils.tracing import load_trace, start_trace, trace_headers, trace_requested
+from utils.tool_manifest import load_tool_manifest
+
 load_dotenv()
 
+boot_started_at = time.perf_counter()
+
 app = Flask(__name__)
 
 db_token = os.getenv("APP_TOKEN")
 
+def bearer_authorized(header, expected):
+    """Whether an Authorization header is "Bearer <expected>", compared in constant time."""
+    if not expected or not header or not header.startswith("Bearer "):
+        return False
+    return hmac.compare_digest(header[len("Bearer "):].encode(), expected.encode())
+
 def create_endpoint(route, tool_class):
     @app.route(route, methods=['POST'], endpoint=tool_class.__name__)
     def endpoint():
         print(f"Endpoint {route} called")  # Debug print
-        token = request.headers.get("Authorization").split("Bearer ")[1]
-        if token != db_token:
+        if not bearer_authorized(request.headers.get("Authorization"), db_token):
             return jsonify({"message": "Unauthorized"}), 401
 
+        started_at = time.perf_counter()
+        action, status = None, "error"
         try:
-            tool = tool_class(**request.get_json())
-            return jsonify({"response": tool.run()})
+            arguments = request.get_json()
+            tool = tool_class(**arguments)
+            action = arguments.get("action")
+            if async_requested(request.args.get("async")):
+                # Long calls run as a job; poll /jobs/<job_id> for progress and the result
+                job_id = get_job_runner().submit(tool_class.__name__, arguments, tool.run)
+                status = "queued"
+                return jsonify({"job_id": job_id, "status": "queued", "status_url": f"/jobs/{job_id}"}), 202
+            if wants_ndjson() and hasattr(tool, "astream"):
+                status = "streamed"
+                return Response(stream_ndjson(tool), mimetype="application/x-ndjson")
+            if trace_requested(request.headers.get("X-Trace"), request.args.get("trace")):
+                # Traced calls always execute, bypassing coalescing and revalidation
+                with start_trace(f"{tool_class.__name__} {action or ''}".strip(), tool=tool_class.__name__, action=action) as trace:
+                    response = jsonify({"response": tool.run()})
+                response.headers.update(trace_headers(trace))
+            elif is_read_only(tool_class):
+                response = run_read_tool(tool_class, tool, arguments)
+            else:
+                response = jsonify({"response": tool.run()})
+            status = "not_modified" if response.status_code == 304 else "ok"
+            return response
         except Exception as e:
             return jsonify({"Error": str(e)})
+        finally:
+            observe_tool_call(tool_class.__name__, action, status, time.perf_counter() - started_at)
+
+def wants_ndjson():
+    """Streaming is opt-in with Accept: application/x-ndjson."""
+    return "application/x-ndjson" in (request.headers.get("Accept") or "")
+
+def stream_ndjson(tool):
+    """One JSON record per line, sent as soon as the tool yields it."""
+    try:
+        for record in iterate_sync(tool.astream()):
+            yield json.dumps(record) + "\n"
+    except Exception as e:
+        yield json.dumps({"type": "error", "error": str(e)}) + "\n"
+
+def freshness_token(tool):
+    """The tool's cheap data version marker, or None if it has none or the check fails."""
+    try:
+        return tool.freshness_token() if hasattr(tool, "freshness_token") else None
+    except Exception as e:
+        print(f"Freshness check failed: {e}")
+        return None
+
+def run_read_tool(tool_class, tool, arguments):
+    """Run a read-only tool with coalescing, Cache-Control and ETag / If-None-Match revalidation."""
+    if_none_match = request.headers.get("If-None-Match")
+    headers = {"Cache-Control": cache_control(arguments.get("action"))}
+    validator_key, etag = RESPONSE_VALIDATORS.revalidate(tool_class.__name__, arguments, freshness_token(tool), if_none_match)
+    if etag:
+        return Response(status=304, headers=dict(headers, ETag=etag))
+
+    # Identical read calls already in flight share one execution
+    response = jsonify({"response": TOOL_CALLS.do(TOOL_CALLS.key(tool_class.__name__, arguments), tool.run)})
+    response.headers.update(headers)
+    etag, not_modified = RESPONSE_VALIDATORS.finish(validator_key, response.get_data(), if_none_match)
+    if etag:
+        response.headers["ETag"] = etag
+    if not_modified:
+        return Response(status=304, headers=dict(headers, ETag=etag))
+    return response
         
 def parse_all_tools():
-    tools_folder = './tools'
-    tools_dict = {}
-    for root, dirs, files in os.walk(tools_folder):
-        relative_path = os.path.relpath(root, tools_folder)
-        folder = relative_path if relative_path != '.' else 'root'
-        for filename in files:
-            if filename.endswith('.py'):
-                tool_path = os.path.join(root, filename)
-                tool_class = ToolFactory.from_file(tool_path)
-                tools_dict.setdefault(folder, []).append(tool_class)
+    """
+    Tools under ./tools grouped by folder, read from the cached tool manifest. Each tool is a
+    LazyTool whose module is only imported on its first call.
+    """
+    tools_dict, stats = load_tool_manifest('./tools')
+    print(f"Tool manifest: {stats['tools']} tools ({stats['cached']} cached, {stats['rebuilt']} rebuilt) in {stats['elapsed_ms']} ms")
     return tools_dict
 
 # create endpoints for each file in ./tools
@@ -45,17 +123,137 @@ for tool in tools:
     route = f"/{tool.__name__}"
     print(f"Creating endpoint for {route}")  # Debug print
     create_endpoint(route, tool)
+tools_by_name = {tool.__name__: tool for tool in tools}
+print(f"Registered {len(tools)} tool routes in {(time.perf_counter() - boot_started_at) * 1000:.0f} ms")  # Boot metrics
+
+# Keep the local mirror of the configured Notion databases current when enabled
+mirror_sync_interval = os.getenv("NOTION_MIRROR_SYNC_INTERVAL")
+if mirror_sync_interval:
+    from utils.notion_mirror import NOTION_MIRROR
+    NOTION_MIRROR.start_background_sync(float(mirror_sync_interval))
+
+# Keep the offline full-text index behind NotionReadTool search(source="local"|"hybrid") current when enabled
+search_index_interval = os.getenv("NOTION_SEARCH_INDEX_INTERVAL")
+if search_index_interval:
+    from utils.search_index import SEARCH_INDEX
+    SEARCH_INDEX.start_background_refresh(float(search_index_interval))
+
+# Keep the local Slack message store behind SlackMCPTool search/read current when enabled
+slack_store_interval = os.getenv("SLACK_STORE_SYNC_INTERVAL")
+if slack_store_interval:
+    from utils.slack_store import SLACK_STORE
+    SLACK_STORE.start_background_sync(float(slack_store_interval))
+
+# Load the Slack channel and user directories now rather than on the first Slack question
+if os.getenv("SLACK_DIRECTORY_PRELOAD", "").lower() in ("1", "true", "yes"):
+    from utils.slack_directory import SLACK_DIRECTORY
+    SLACK_DIRECTORY.start_background_load()
+
+# Start the Slack MCP server processes now rather than on the first Slack question
+if os.getenv("SLACK_MCP_WARMUP", "").lower() in ("1", "true", "yes"):
+    from tools.SlackAgent.SlackMCPTool import slack_mcp_pool, slack_server_env
+    slack_mcp_pool(slack_server_env()).start()
+
+@app.after_request
+def compress_response(response):
+    """
+    gzip / brotli / zstd negotiated from Accept-Encoding. Complete bodies are compressed from
+    COMPRESSION_MIN_BYTES on; streamed bodies are compressed chunk by chunk as they are sent.
+    """
+    encoding = negotiate(request.headers.get("Accept-Encoding"))
+    if encoding is None or response.status_code in (204, 304) or "Content-Encoding" in response.headers or not is_compressible(response.content_type):
+        return response
+    response.vary.add("Accept-Encoding")
+    if response.is_streamed:
+        response.response = compress_stream(response.iter_encoded(), encoding)
+        response.headers.pop("Content-Length", None)
+    else:
+        body = response.get_data()
+        if len(body) < min_size():
+            return response
+        response.set_data(compress_body(body, encoding))
+    response.headers["Content-Encoding"] = encoding
+    if "ETag" in response.headers:
+        response.headers["ETag"] = weak_etag(response.headers["ETag"])
+    return response
+
+@app.route("/notion/metrics", methods=['GET'])
+def notion_metrics():
+    """Retry and throttling counters of the shared Notion client."""
+    from utils.notion_api import get_client_metrics
+    if not bearer_authorized(request.headers.get("Authorization"), db_token):
+        return jsonify({"message": "Unauthorized"}), 401
+    return jsonify(dict(get_client_metrics(), single_flight=TOOL_CALLS.stats(), http_cache=RESPONSE_VALIDATORS.stats()))
+
+def run_batch_call(call):
+    started_at = time.perf_counter()
+    try:
+        if is_read_only(call.tool_class):
+            response = TOOL_CALLS.do(TOOL_CALLS.key(call.name, call.arguments), call.tool.run)
+        else:
+            response = call.tool.run()
+        item = batch_item(call, started_at, response=response)
+    except Exception as e:
+        item = batch_item(call, started_at, error=e)
+    observe_tool_call(call.name, call.arguments.get("action"), "error" if "Error" in item else "ok", time.perf_counter() - started_at)
+    return item
+
+@app.route("/batch", methods=['POST'])
+def batch_handler():
+    """
+    Run an array of {"tool", "args"} calls concurrently (at most ?max_concurrency at once) and
+    return their results in order. Nothing runs unless every call validates.
+    """
+    if not bearer_authorized(request.headers.get("Authorization"), db_token):
+        return jsonify({"message": "Unauthorized"}), 401
+    try:
+        calls = parse_batch(request.get_json(silent=True), tools_by_name)
+    except BatchValidationError as e:
+        return jsonify({"Error": str(e), "errors": e.errors}), 400
+
+    started_at = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=batch_concurrency(request.args.get("max_concurrency", type=int), len(calls))) as pool:
+        results = list(pool.map(run_batch_call, calls))
+    return jsonify({"results": results, "elapsed_ms": round((time.perf_counter() - started_at) * 1000, 1)})
+
+@app.route("/metrics", methods=['GET'])
+def metrics():
+    """Tool, Notion API and cache metrics in the Prometheus text format."""
+    if not bearer_authorized(request.headers.get("Authorization"), db_token):
+        return jsonify({"message": "Unauthorized"}), 401
+    return Response(REGISTRY.render(), content_type=CONTENT_TYPE)
+
+@app.route("/jobs/<job_id>", methods=['GET'])
+def get_job(job_id):
+    """Status, progress counters and, once finished, the result of a call made with ?async=1."""
+    if not bearer_authorized(request.headers.get("Authorization"), db_token):
+        return jsonify({"message": "Unauthorized"}), 401
+    job = get_job_runner().get(job_id)
+    if job is None:
+        return jsonify({"message": "Job not found"}), 404
+    return jsonify(job)
+
+@app.route("/traces/<trace_id>", methods=['GET'])
+def get_trace(trace_id):
+    """A trace saved for a request sent with X-Trace: 1, as Chrome trace-event JSON."""
+    if not bearer_authorized(request.headers.get("Authorization"), db_token):
+        return jsonify({"message": "Unauthorized"}), 401
+    trace = load_trace(trace_id)
+    if trace is None:
+        return jsonify({"message": "Trace not found"}), 404
+    return Response(trace, mimetype="application/json")
+
+@app.route("/slack/events", methods=['POST'])
+def slack_events():
+    """Slack Events API receiver; channel and user events keep the Slack directories current."""
+    from utils.slack_directory import handle_slack_event
+    status, body = handle_slack_event(request.get_data(), dict(request.headers))
+    return jsonify(body), status
 
 @app.route("/", methods=['POST'])
 def tools_handler():
     print("tools_handler called")  # Debug print
-    print(request.headers)  # Debug print
-    try:
-        token = request.headers.get("Authorization").split("Bearer ")[1]
-    except Exception:
-        return jsonify({"message": "Unauthorized"}), 401
-        
-    if token != db_token:
+    if not bearer_authorized(request.headers.get("Authorization"), db_token):
         return jsonify({"message": "Unauthorized"}), 401
 
     with app.request_context(request.environ):
@@ -1,5 +1,5 @@
 from main import parse_all_tools
-from agency_swarm.tools import ToolFactory
+from utils.tool_manifest import get_openapi_schema
 import inquirer
 import pyperclip
 
@@ -42,9 +42,9 @@ if __name__ == '__main__':
     for tool_folder_name in selected_tool_folder_names:
         selected_tools.extend(tools[tool_folder_name])
     if root_tools:
-        selected_tools.extend(answers['selected_root_tools'])
+        selected_tools.extend(tool for tool in tools['root'] if tool.__name__ in answers['selected_root_tools'])
 
-    schema = ToolFactory.get_openapi_schema(selected_tools, server_url)
+    schema = get_openapi_schema(selected_tools, server_url)
     print(schema)
 
     # Copy schema to clipboard
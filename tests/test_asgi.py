@@ -0,0 +1,96 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import asyncio
+import json
+import threading
+import time
+import pytest
+from pydantic import BaseModel
+from starlette.testclient import TestClient
+import asgi
+
+
+class SlowSyncTool(BaseModel):
+    seconds: float = 0.2
+
+    def run(self) -> str:
+        time.sleep(self.seconds)
+        return threading.current_thread().name
+
+
+class AsyncTool(BaseModel):
+    value: str
+
+    def run(self) -> str:
+        raise AssertionError("async tools must be awaited through arun()")
+
+    async def arun(self) -> str:
+        await asyncio.sleep(0)
+        return f"async {self.value}"
+
+
+class StreamingTool(BaseModel):
+    count: int
+
+    async def arun(self) -> str:
+        return "buffered"
+
+    async def astream(self):
+        for index in range(self.count):
+            yield {"type": "block", "index": index}
+        raise RuntimeError("listing failed")
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(asgi, "db_token", "secret")
+    app = asgi.create_app(workers=4, max_concurrency=8, max_queue=8, tool_classes=[SlowSyncTool, AsyncTool, StreamingTool])
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+AUTH = {"Authorization": "Bearer secret"}
+
+
+def test_requires_bearer_token(client):
+    assert client.post("/AsyncTool", json={"value": "x"}).status_code == 401
+    assert client.post("/AsyncTool", json={"value": "x"}, headers={"Authorization": "Bearer nope"}).status_code == 401
+    assert client.post("/AsyncTool", json={"value": "x"}, headers={"Authorization": "secret"}).status_code == 401
+    assert client.post("/AsyncTool", json={"value": "x"}, headers={"Authorization": "Basic Bearer secret"}).status_code == 401
+
+
+def test_async_tools_are_awaited_and_sync_tools_run_on_the_pool(client):
+    assert client.post("/AsyncTool", json={"value": "x"}, headers=AUTH).json() == {"response": "async x"}
+    assert client.post("/SlowSyncTool", json={"seconds": 0}, headers=AUTH).json()["response"].startswith("tool")
+
+
+def test_validation_errors_are_reported_like_flask(client):
+    assert "Error" in client.post("/AsyncTool", json={}, headers=AUTH).json()
+
+
+def test_slow_sync_calls_run_concurrently(client):
+    from concurrent.futures import ThreadPoolExecutor
+    start = time.monotonic()
+    with ThreadPoolExecutor(4) as pool:
+        responses = list(pool.map(lambda _: client.post("/SlowSyncTool", json={"seconds": 0.3}, headers=AUTH), range(4)))
+    assert all(response.status_code == 200 for response in responses)
+    assert time.monotonic() - start < 1.0
+
+
+def test_rejects_calls_beyond_the_queue(monkeypatch):
+    monkeypatch.setattr(asgi, "db_token", "secret")
+    app = asgi.create_app(workers=1, max_concurrency=1, max_queue=1, tool_classes=[AsyncTool])
+    app.state.runner._waiting = 1
+    with TestClient(app) as test_client:
+        response = test_client.post("/AsyncTool", json={"value": "x"}, headers=AUTH)
+    assert response.status_code == 503
+
+
+def test_ndjson_is_opt_in_and_streams_records(client):
+    assert client.post("/StreamingTool", json={"count": 2}, headers=AUTH).json() == {"response": "buffered"}
+
+    response = client.post("/StreamingTool", json={"count": 2}, headers=dict(AUTH, Accept="application/x-ndjson"))
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert records == [{"type": "block", "index": 0}, {"type": "block", "index": 1}, {"type": "error", "error": "listing failed"}]
@@ -0,0 +1,77 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import asyncio
+import time
+import pytest
+from pydantic import BaseModel
+from starlette.testclient import TestClient
+import asgi
+from utils.batch import BatchValidationError, batch_concurrency, parse_batch
+
+
+class EchoTool(BaseModel):
+    value: str
+    delay: float = 0.0
+
+    async def arun(self) -> str:
+        await asyncio.sleep(self.delay)
+        if self.value == "fail":
+            raise RuntimeError("tool failed")
+        return self.value
+
+
+TOOLS = {"EchoTool": EchoTool}
+AUTH = {"Authorization": "Bearer secret"}
+
+
+def test_parse_batch_validates_every_call_up_front():
+    calls = parse_batch([{"tool": "EchoTool", "args": {"value": "a"}}], TOOLS)
+    assert calls[0].name == "EchoTool" and calls[0].tool.value == "a"
+
+    with pytest.raises(BatchValidationError) as error:
+        parse_batch([{"tool": "EchoTool", "args": {"value": "a"}}, {"tool": "Missing"}, {"tool": "EchoTool", "args": {}}, "x", {"tool": ["EchoTool"]}], TOOLS)
+    assert [item["index"] for item in error.value.errors] == [1, 2, 3, 4]
+
+    for payload in (None, [], {"tool": "EchoTool"}):
+        with pytest.raises(BatchValidationError):
+            parse_batch(payload, TOOLS)
+
+
+def test_parse_batch_limits_batch_size(monkeypatch):
+    monkeypatch.setenv("BATCH_MAX_CALLS", "2")
+    with pytest.raises(BatchValidationError):
+        parse_batch([{"tool": "EchoTool", "args": {"value": "a"}}] * 3, TOOLS)
+
+
+def test_batch_concurrency_is_capped_by_the_server(monkeypatch):
+    monkeypatch.setenv("BATCH_MAX_CONCURRENCY", "4")
+    assert batch_concurrency(None, 10) == 4
+    assert batch_concurrency(2, 10) == 2
+    assert batch_concurrency(100, 10) == 4
+    assert batch_concurrency(None, 3) == 3
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(asgi, "db_token", "secret")
+    app = asgi.create_app(workers=2, max_concurrency=16, max_queue=16, tool_classes=[EchoTool])
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+def test_batch_runs_calls_concurrently_and_keeps_order(client):
+    calls = [{"tool": "EchoTool", "args": {"value": str(index), "delay": 0.2}} for index in range(5)] + [{"tool": "EchoTool", "args": {"value": "fail"}}]
+    start = time.monotonic()
+    body = client.post("/batch", json=calls, headers=AUTH).json()
+    assert time.monotonic() - start < 0.6
+    assert [item.get("response") for item in body["results"][:5]] == ["0", "1", "2", "3", "4"]
+    assert body["results"][5]["Error"] == "tool failed"
+    assert all("elapsed_ms" in item for item in body["results"])
+
+
+def test_batch_rejects_invalid_calls_without_running_any(client):
+    response = client.post("/batch", json=[{"tool": "EchoTool", "args": {"value": "a"}}, {"tool": "Nope", "args": {}}], headers=AUTH)
+    assert response.status_code == 400
+    assert response.json()["errors"] == [{"index": 1, "Error": "Unknown tool: Nope"}]
+    assert client.post("/batch", json=[], headers={"Authorization": "Bearer nope"}).status_code == 401
@@ -0,0 +1,95 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import pytest
+from unittest.mock import patch, MagicMock
+from utils.block_cache import BlockTreeCache
+from utils.block_tree_fetcher import get_blocks_concurrent_full
+from utils import page_blocks_cleanup
+
+
+def _block(block_id, has_children=False, version="2024-01-01T00:00:00.000Z"):
+    return {"id": block_id, "type": "paragraph", "has_children": has_children, "last_edited_time": version,
+            "paragraph": {"rich_text": [{"plain_text": block_id}]}}
+
+
+def test_block_cache_hit_requires_same_version():
+    cache = BlockTreeCache(path=":memory:")
+    cache.put_children("parent", "v1", [_block("a")])
+    assert cache.get_children("parent", "v1") == [_block("a")]
+    assert cache.get_children("parent", "v2") is None
+    assert cache.get_children("parent", None) is None
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+
+
+def test_block_cache_evicts_least_recently_used():
+    cache = BlockTreeCache(path=":memory:", max_bytes=300)
+    cache.put_children("first", "v1", [_block("a")])
+    cache.put_children("second", "v1", [_block("b")])
+    cache.get_children("first", "v1")
+    cache.put_children("third", "v1", [_block("c")])
+    assert cache.get_children("second", "v1") is None
+    assert cache.get_children("first", "v1") is not None
+    assert cache.stats()["evictions"] >= 1
+
+
+def test_get_blocks_recursive_full_serves_unchanged_subtrees_from_cache():
+    listings = {
+        "page": {"results": [_block("toggle", has_children=True, version="t1")], "has_more": False},
+        "toggle": {"results": [_block("child")], "has_more": False},
+    }
+    mock_notion = MagicMock()
+    mock_notion.blocks.children.list.side_effect = lambda block_id, **kwargs: listings[block_id]
+    with patch.object(page_blocks_cleanup, "notion", mock_notion), \
+            patch.object(page_blocks_cleanup, "BLOCK_CACHE", BlockTreeCache(path=":memory:")):
+        first = page_blocks_cleanup.get_blocks_recursive_full("page", depth=3, version="p1")
+        assert mock_notion.blocks.children.list.call_count == 2
+        second = page_blocks_cleanup.get_blocks_recursive_full("page", depth=3, version="p1")
+        assert mock_notion.blocks.children.list.call_count == 2
+        assert first == second
+        assert first[0]["children_blocks"][0]["id"] == "child"
+
+
+def test_grandchild_edit_is_seen_although_the_parent_version_is_unchanged():
+    listings = {
+        "page": {"results": [_block("toggle", has_children=True, version="t1")], "has_more": False},
+        "toggle": {"results": [_block("column", has_children=True, version="c1")], "has_more": False},
+        "column": {"results": [_block("before")], "has_more": False},
+    }
+    mock_notion = MagicMock()
+    mock_notion.blocks.children.list.side_effect = lambda block_id, **kwargs: listings[block_id]
+    with patch.object(page_blocks_cleanup, "notion", mock_notion), \
+            patch.object(page_blocks_cleanup, "BLOCK_CACHE", BlockTreeCache(path=":memory:")):
+        first = page_blocks_cleanup.get_blocks_recursive_full("page", depth=4, version="p1")
+        assert first[0]["children_blocks"][0]["children_blocks"][0]["id"] == "before"
+        # Editing the grandchild leaves toggle and column at t1 / c1; only the page's version moves
+        listings["column"] = {"results": [_block("after")], "has_more": False}
+        second = page_blocks_cleanup.get_blocks_recursive_full("page", depth=4, version="p2")
+        assert second[0]["children_blocks"][0]["children_blocks"][0]["id"] == "after"
+        assert get_blocks_concurrent_full("page", depth=4, version="p2", max_workers=2) == second
+        assert mock_notion.blocks.children.list.call_count == 6
+
+
+def test_get_blocks_recursive_full_keeps_error_blocks_uncached():
+    from notion_client.errors import APIResponseError
+    mock_notion = MagicMock()
+    mock_notion.blocks.children.list.side_effect = APIResponseError(MagicMock(), "denied", "restricted_resource")
+    with patch.object(page_blocks_cleanup, "notion", mock_notion), \
+            patch.object(page_blocks_cleanup, "BLOCK_CACHE", BlockTreeCache(path=":memory:")) as cache:
+        result = page_blocks_cleanup.get_blocks_recursive_full("page", depth=2, version="p1")
+        assert "error" in result[0]
+        assert cache.stats()["entries"] == 0
+
+
+def test_block_cache_hits_do_not_write_until_the_next_put():
+    cache = BlockTreeCache(path=":memory:")
+    cache.put_children("parent", "v1", [_block("a")])
+    changes = cache._conn.total_changes
+    for _ in range(5):
+        assert cache.get_children("parent", "v1") == [_block("a")]
+    assert cache._conn.total_changes == changes
+    cache.put_children("other", "v1", [_block("b")])
+    accessed = dict(cache._conn.execute("SELECT block_id, accessed_at FROM block_children").fetchall())
+    assert accessed["parent"] > cache._conn.execute("SELECT stored_at FROM block_children WHERE block_id = 'parent'").fetchone()[0]
@@ -0,0 +1,121 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import asyncio
+import time
+import pytest
+from unittest.mock import patch, MagicMock, AsyncMock
+from notion_client.errors import APIResponseError
+from utils import page_blocks_cleanup, async_block_fetcher
+from utils.async_block_fetcher import aget_blocks_full, aget_blocks_clean, aiter_blocks_full
+from utils.block_tree_fetcher import get_blocks_concurrent_full, get_blocks_concurrent_clean
+from utils.rate_limiter import TokenBucket
+
+
+def _block(block_id, block_type="paragraph", has_children=False):
+    return {"id": block_id, "type": block_type, "has_children": has_children, "last_edited_time": "v1",
+            block_type: {"rich_text": [{"plain_text": f"text {block_id}"}]}}
+
+
+# page -> [a (toggle, children), db (child_database), b], a -> [a1 (children), a2], a1 -> [a1x], broken -> error
+TREE = {
+    "page": [
+        [_block("a", "toggle", True), _block("db", "child_database")],
+        [_block("b"), _block("broken", "toggle", True)],
+    ],
+    "a": [[_block("a1", "toggle", True), _block("a2")]],
+    "a1": [[_block("a1x")]],
+}
+
+
+def _fake_notion():
+    notion = MagicMock()
+
+    def children_list(block_id, start_cursor=None, page_size=100):
+        if block_id not in TREE:
+            raise APIResponseError(MagicMock(), "no access", "restricted_resource")
+        pages = TREE[block_id]
+        index = int(start_cursor or 0)
+        has_more = index + 1 < len(pages)
+        return {"results": pages[index], "has_more": has_more, "next_cursor": str(index + 1) if has_more else None}
+
+    notion.blocks.children.list.side_effect = children_list
+    notion.databases.query.return_value = {
+        "results": [{"id": "row1", "url": "https://notion.so/row1", "properties": {"Name": {"type": "title", "title": [{"plain_text": "Row"}]}}}],
+        "has_more": False,
+    }
+    return notion
+
+
+def _fake_async_notion():
+    sync_notion = _fake_notion()
+    notion = MagicMock()
+    notion.blocks.children.list = AsyncMock(side_effect=sync_notion.blocks.children.list.side_effect)
+    notion.databases.query = AsyncMock(return_value=sync_notion.databases.query.return_value)
+    return notion
+
+
+@pytest.fixture
+def fake_notion():
+    with patch.object(page_blocks_cleanup, "notion", _fake_notion()), \
+            patch.object(async_block_fetcher, "notion", _fake_async_notion()), \
+            patch.object(page_blocks_cleanup, "BLOCK_CACHE", None):
+        yield
+
+
+@pytest.mark.parametrize("depth", [1, 2, 3, 10])
+def test_concurrent_full_matches_recursive(fake_notion, depth):
+    expected = page_blocks_cleanup.get_blocks_recursive_full("page", depth=depth)
+    assert get_blocks_concurrent_full("page", depth=depth, max_workers=4) == expected
+
+
+@pytest.mark.parametrize("depth", [1, 2, 3, 10])
+def test_concurrent_clean_matches_recursive(fake_notion, depth):
+    expected = page_blocks_cleanup.get_blocks_recursive_clean("page", depth=depth)
+    assert get_blocks_concurrent_clean("page", depth=depth, max_workers=4) == expected
+
+
+@pytest.mark.parametrize("depth", [1, 2, 3, 10])
+def test_async_walkers_match_recursive(fake_notion, depth):
+    assert asyncio.run(aget_blocks_full("page", depth=depth, max_concurrency=2)) == page_blocks_cleanup.get_blocks_recursive_full("page", depth=depth)
+    assert asyncio.run(aget_blocks_clean("page", depth=depth, max_concurrency=2)) == page_blocks_cleanup.get_blocks_recursive_clean("page", depth=depth)
+
+
+async def _rebuild_tree(root_id, depth):
+    """Nest aiter_blocks_full records the way aget_blocks_full returns them."""
+    children_of = {root_id: []}
+    async for parent_id, block in aiter_blocks_full(root_id, depth=depth, max_concurrency=2):
+        if "error" not in block and block.get("has_children"):
+            block = dict(block, children_blocks=children_of.setdefault(block["id"], []))
+        children_of[parent_id].append(block)
+    return children_of[root_id]
+
+
+@pytest.mark.parametrize("depth", [0, 1, 2, 3, 10])
+def test_streaming_walker_matches_tree(fake_notion, depth):
+    assert asyncio.run(_rebuild_tree("page", depth)) == asyncio.run(aget_blocks_full("page", depth=depth))
+
+
+def test_streaming_walker_cancels_listings_when_closed_early(fake_notion):
+    async def first_record():
+        records = aiter_blocks_full("page", depth=10)
+        first = await records.__anext__()
+        await records.aclose()
+        return first
+
+    assert asyncio.run(first_record())[0] == "page"
+
+
+def test_token_bucket_reserve_does_not_block():
+    bucket = TokenBucket(rate=10, capacity=1)
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == pytest.approx(0.1, abs=0.01)
+    assert bucket.reserve() == pytest.approx(0.2, abs=0.01)
+
+
+def test_token_bucket_limits_rate():
+    bucket = TokenBucket(rate=50, capacity=1)
+    start = time.monotonic()
+    for _ in range(6):
+        bucket.acquire()
+    assert time.monotonic() - start >= 0.09
@@ -0,0 +1,118 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import gzip
+import json
+import zlib
+import pytest
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+from utils import compression
+from utils.compression import CompressionMiddleware, compress_body, compress_stream, negotiate
+from utils.metrics import COMPRESSION_INPUT_BYTES, COMPRESSION_RATIO
+
+
+@pytest.fixture
+def gzip_only(monkeypatch):
+    monkeypatch.setenv("COMPRESSION_ENCODINGS", "gzip")
+
+
+def test_negotiate_honours_q_values_and_server_preference(monkeypatch):
+    monkeypatch.setattr(compression, "brotli", object())
+    monkeypatch.setattr(compression, "zstandard", None)
+    assert negotiate("gzip, br") == "br"
+    assert negotiate("gzip;q=1.0, br;q=0.5") == "gzip"
+    assert negotiate("zstd") is None
+    assert negotiate("*") == "br"
+    assert negotiate("*, br;q=0") == "gzip"
+    assert negotiate("identity") is None
+    assert negotiate(None) is None
+
+
+def test_compress_body_round_trips():
+    body = json.dumps({"response": "x" * 5000}).encode()
+    assert gzip.decompress(compress_body(body, "gzip")) == body
+
+
+def test_compress_stream_flushes_every_chunk():
+    chunks = [json.dumps({"index": index}).encode() + b"\n" for index in range(3)]
+    decompressor = zlib.decompressobj(31)
+    decoded = []
+    stream = compress_stream(iter(chunks), "gzip")
+    for chunk in chunks:
+        # Each record is decodable as soon as it is sent, before the stream ends
+        decoded.append(decompressor.decompress(next(stream)))
+        assert decoded[-1] == chunk
+    decompressor.decompress(b"".join(stream))
+    assert decompressor.eof
+
+
+@pytest.mark.parametrize("module, encoding, decompress", [
+    ("brotli", "br", lambda module, data: module.decompress(data)),
+    ("zstandard", "zstd", lambda module, data: module.ZstdDecompressor().decompressobj().decompress(data)),
+])
+def test_optional_encodings_round_trip(module, encoding, decompress):
+    module = pytest.importorskip(module)
+    body = b"record\n" * 1000
+    assert decompress(module, compress_body(body, encoding)) == body
+
+
+def large(request):
+    return JSONResponse({"response": "x" * 4096}, headers={"ETag": '"abc"'})
+
+
+def small(request):
+    return JSONResponse({"response": "x"})
+
+
+def binary(request):
+    return Response(b"\0" * 4096, media_type="application/octet-stream")
+
+
+def stream(request):
+    async def records():
+        for index in range(3):
+            yield json.dumps({"index": index}) + "\n"
+    return StreamingResponse(records(), media_type="application/x-ndjson")
+
+
+def not_modified(request):
+    return PlainTextResponse("", status_code=304)
+
+
+@pytest.fixture
+def client(gzip_only):
+    routes = [Route(f"/{endpoint.__name__}", endpoint) for endpoint in (large, small, binary, stream, not_modified)]
+    app = Starlette(routes=routes, middleware=[Middleware(CompressionMiddleware)])
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+def test_middleware_compresses_large_bodies_and_weakens_etag(client):
+    before = COMPRESSION_INPUT_BYTES.values().get(("gzip",), 0)
+    response = client.get("/large", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.headers["etag"] == 'W/"abc"'
+    assert response.json() == {"response": "x" * 4096}
+    assert COMPRESSION_INPUT_BYTES.values()[("gzip",)] - before == len(response.content)
+    assert COMPRESSION_RATIO.values()[("gzip",)][-1] >= 1
+
+
+def test_middleware_skips_small_binary_and_unnegotiated_responses(client):
+    response = client.get("/small", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert "content-encoding" not in client.get("/binary", headers={"Accept-Encoding": "gzip"}).headers
+    assert "content-encoding" not in client.get("/large", headers={"Accept-Encoding": "identity"}).headers
+    assert client.get("/not_modified", headers={"Accept-Encoding": "gzip"}).status_code == 304
+
+
+def test_middleware_compresses_streams_without_buffering(client):
+    response = client.get("/stream", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    assert [json.loads(line) for line in response.text.splitlines()] == [{"index": index} for index in range(3)]
@@ -0,0 +1,79 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import asyncio
+from datetime import datetime, timedelta, timezone
+import pytest
+from unittest.mock import patch, MagicMock, AsyncMock
+from utils import database_scan
+from utils.database_scan import _filter_depth, afetch_all_pages, shard_boundaries
+from utils.notion_filters import matches_filter, sort_pages
+
+SCHEMA = {"Status": {"type": "status", "status": {"options": [{"name": "Todo"}, {"name": "Doing"}, {"name": "Done"}]}}}
+
+
+def _row(index):
+    created = datetime(2024, 1, 1, tzinfo=timezone.utc) + timedelta(hours=7 * index)
+    return {
+        "id": f"row{index}",
+        "created_time": created.strftime("%Y-%m-%dT%H:%M:00.000Z"),
+        "last_edited_time": (created + timedelta(days=index % 5)).strftime("%Y-%m-%dT%H:%M:00.000Z"),
+        "properties": {"Status": {"type": "status", "status": {"name": ["Todo", "Doing", "Done"][index % 3]}}},
+    }
+
+
+ROWS = [_row(index) for index in range(450)]
+
+
+def _fake_notion():
+    notion = MagicMock()
+
+    async def query(database_id, filter=None, sorts=None, start_cursor=None, page_size=100):
+        # Notion rejects compound filters nested more than two levels deep
+        assert filter is None or _filter_depth(filter) <= 2
+        pages = sort_pages([row for row in ROWS if matches_filter(row, filter)], sorts or [{"timestamp": "created_time", "direction": "ascending"}], SCHEMA)
+        offset = int(start_cursor or 0)
+        has_more = offset + page_size < len(pages)
+        return {"results": pages[offset:offset + page_size], "has_more": has_more, "next_cursor": str(offset + page_size) if has_more else None}
+
+    notion.databases.query = AsyncMock(side_effect=query)
+    notion.databases.retrieve = AsyncMock(return_value={"properties": SCHEMA})
+    return notion
+
+
+@pytest.mark.parametrize("shards", [1, 4, 16])
+def test_fetch_all_returns_every_row_in_requested_order(shards):
+    sorts = [{"property": "Status", "direction": "ascending"}, {"timestamp": "last_edited_time", "direction": "descending"}]
+    with patch.object(database_scan, "notion", _fake_notion()):
+        result = asyncio.run(afetch_all_pages("db", sorts=sorts, shards=shards))
+    assert result["total_count"] == len(ROWS)
+    assert result["shards"] == shards
+    assert result["results"] == sort_pages(ROWS, sorts, SCHEMA)
+
+
+def test_fetch_all_keeps_the_callers_filter():
+    notion_filter = {"property": "Status", "status": {"equals": "Done"}}
+    with patch.object(database_scan, "notion", _fake_notion()):
+        result = asyncio.run(afetch_all_pages("db", notion_filter=notion_filter, shards=4))
+    assert result["total_count"] == len([row for row in ROWS if matches_filter(row, notion_filter)])
+
+
+@pytest.mark.parametrize("notion_filter, shards", [
+    ({"or": [{"and": [{"property": "Status", "status": {"equals": "Done"}}, {"timestamp": "last_edited_time", "last_edited_time": {"after": "2024-02-01T00:00:00.000Z"}}]},
+             {"property": "Status", "status": {"equals": "Todo"}}]}, 4),
+    ({"or": [{"or": [{"property": "Status", "status": {"equals": "Done"}}, {"property": "Status", "status": {"equals": "Doing"}}]},
+             {"timestamp": "created_time", "created_time": {"before": "2024-01-05T00:00:00.000Z"}}]}, 1),
+])
+def test_nested_filters_stay_within_notions_depth_limit(notion_filter, shards):
+    notion = _fake_notion()
+    with patch.object(database_scan, "notion", notion):
+        result = asyncio.run(afetch_all_pages("db", notion_filter=notion_filter, shards=4))
+    assert result["shards"] == shards
+    assert {page["id"] for page in result["results"]} == {row["id"] for row in ROWS if matches_filter(row, notion_filter)}
+    assert all(_filter_depth(call.kwargs.get("filter") or {}) <= 2 for call in notion.databases.query.call_args_list)
+
+
+def test_shard_boundaries_are_increasing_minutes_inside_the_span():
+    boundaries = shard_boundaries("2024-01-01T00:00:00.000Z", "2024-01-01T00:03:00.000Z", 8)
+    assert boundaries == ["2024-01-01T00:01:00.000Z", "2024-01-01T00:02:00.000Z", "2024-01-01T00:03:00.000Z"]
+    assert shard_boundaries("2024-01-01T00:00:00.000Z", "2024-01-01T00:00:00.000Z", 8) == []
@@ -0,0 +1,68 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import pytest
+from utils import db_response_cleanup
+from utils.db_response_cleanup import clean_notion_database_response, register_database_config, DATABASE_CONFIGS
+
+TASKS_DB_ID = "42fad9c5-af8f-4059-a906-ed6eedc6c571"
+
+
+def _task():
+    return {
+        "id": "task-1",
+        "url": "https://notion.so/task-1",
+        "created_time": "2024-01-01T00:00:00.000Z",
+        "last_edited_time": "2024-01-02T00:00:00.000Z",
+        "properties": {
+            "Created by": {"type": "created_by", "created_by": {"object": "user", "id": "u1", "name": "Ada"}},
+            "Task name": {"type": "title", "title": [{"plain_text": "Ship it"}]},
+            # Status keyed by Notion's encoded internal name instead of "Status"
+            "notion%3A%2F%2Ftasks%2Fstatus_property": {"type": "status", "status": {"name": "Done"}},
+            "Task ID": {"type": "unique_id", "unique_id": {"prefix": "DEV", "number": 42}},
+            "Project": {"type": "relation", "relation": [{"id": "p1"}, {"id": "p2"}]},
+            "Assignee": {"type": "people", "people": [{"id": "u2", "name": "Grace"}]},
+            "Tags": {"type": "multi_select", "multi_select": [{"name": "backend"}, {"name": None}]},
+            "Over Due": {"type": "formula", "formula": {"type": "boolean", "boolean": True}},
+            "Due": {"type": "date", "date": {"start": "2024-02-01", "end": None}},
+        },
+    }
+
+
+def test_compiled_tasks_config_extracts_every_field_type():
+    item = clean_notion_database_response([_task()], TASKS_DB_ID)[0]
+    assert list(item) == list(DATABASE_CONFIGS[TASKS_DB_ID]["fields"])
+    assert item["created_by_user_name"] == "Ada"
+    assert item["title"] == "Ship it"
+    assert item["status"] == "Done"
+    assert item["task_id"] == "DEV42"
+    assert item["project_id"] == "p1"
+    assert item["assignee_name"] == "Grace"
+    assert item["tags"] == ["backend"]
+    assert item["over_due"] is True
+    assert item["execution_time"] is None
+    assert item["due_date"] == "2024-02-01"
+    assert item["priority"] is None
+    assert item["last_edited_time"] == "2024-01-02T00:00:00.000Z"
+
+
+def test_register_database_config_at_runtime(monkeypatch):
+    monkeypatch.setattr(db_response_cleanup, "DATABASE_CONFIGS", dict(DATABASE_CONFIGS))
+    monkeypatch.setattr(db_response_cleanup, "COMPILED_DATABASE_CONFIGS", dict(db_response_cleanup.COMPILED_DATABASE_CONFIGS))
+    register_database_config("team-db", {
+        "name": "team",
+        "title_property": "Name",
+        "fields": {
+            "id": {"type": "id"},
+            "members": {"type": "people", "property": "Assignee", "extract": "full"},
+            "unknown": {"type": "not_a_type", "property": "X"},
+        },
+    })
+    item = clean_notion_database_response([_task()], "team-db")[0]
+    assert item == {"id": "task-1", "members": [{"id": "u2", "name": "Grace", "email": None}], "unknown": None}
+
+
+def test_unconfigured_database_uses_generic_extraction():
+    item = clean_notion_database_response([_task()], "unknown-db")[0]
+    assert item["page_id"] == "task-1"
+    assert item["title"] == "Ship it"
@@ -0,0 +1,51 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import pytest
+from unittest.mock import patch
+from utils import helpers
+from utils.helpers import limit_response_length, get_stored_page
+from utils.result_store import ResultStore
+
+
+@pytest.fixture(autouse=True)
+def small_pages(monkeypatch):
+    monkeypatch.setenv("NOTION_TOOL_PAGE_LENGTH", "10")
+    with patch.object(helpers, "RESULT_STORE", ResultStore()):
+        yield
+
+
+def test_single_page_response_has_no_handle():
+    assert limit_response_length("short") == "short\n\n[Page 1/1. Showing characters 1-5 of 5 characters. End of content.]"
+
+
+def test_stored_pages_match_recomputed_pages():
+    response = "abcdefghij" * 3
+    first = limit_response_length(response)
+    handle = first.split("result_handle=")[1].rstrip("]")
+    assert get_stored_page(handle, page_number=2).startswith("abcdefghij\n\n[Page 2/3.")
+    assert get_stored_page(handle, page_number=3).endswith("End of content.]")
+    assert get_stored_page(handle, page_number=2).split("result_handle")[0] == limit_response_length(response, page_number=2).split("result_handle")[0]
+
+
+def test_unknown_handle_returns_none():
+    assert get_stored_page("missing") is None
+
+
+def test_result_store_expires_and_bounds_memory():
+    store = ResultStore(max_bytes=10, ttl=0)
+    handle = store.put("abc")
+    assert store.get(handle) is None
+    store = ResultStore(max_bytes=10, ttl=60)
+    first = store.put("123456")
+    second = store.put("789012")
+    assert store.get(first) is None
+    assert store.get(second) == "789012"
+    assert store.put("x" * 11) is None
+
+
+def test_result_store_only_returns_results_to_their_owner():
+    store = ResultStore()
+    handle = store.put("abc", owner="NotionReadTool:{\"block_id\":\"a\"}")
+    assert store.get(handle, owner="NotionReadTool:{\"block_id\":\"b\"}") is None
+    assert store.get(handle, owner="NotionReadTool:{\"block_id\":\"a\"}") == "abc"
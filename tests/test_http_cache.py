@@ -0,0 +1,82 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from typing import ClassVar
+from pydantic import BaseModel
+from starlette.testclient import TestClient
+import asgi
+from utils.http_cache import ResponseValidators, cache_control, etag_matches, parse_max_ages
+
+
+def test_cache_control_per_action():
+    max_ages = parse_max_ages("search=30, retrieve_block=0, default=5")
+    assert cache_control("search", max_ages) == "private, max-age=30"
+    assert cache_control("retrieve_block", max_ages) == "private, no-cache"
+    assert cache_control("other", max_ages) == "private, max-age=5"
+    assert cache_control("other", {}) == "private, no-cache"
+
+
+def test_etag_matching():
+    assert etag_matches('"a", "b"', '"b"')
+    assert etag_matches('W/"b"', '"b"')
+    assert etag_matches("*", '"b"')
+    assert not etag_matches('"a"', '"b"')
+    assert not etag_matches(None, '"b"')
+
+
+def test_validators_depend_on_freshness_token_and_body():
+    validators = ResponseValidators()
+    key = validators.validator_key("Tool", {"a": 1, "b": 2}, "page:1")
+    assert key == validators.validator_key("Tool", {"b": 2, "a": 1}, "page:1")
+    assert key != validators.validator_key("Tool", {"a": 1, "b": 2}, "page:2")
+
+    assert validators.current_etag(key) is None
+    etag = validators.etag_for(key, b"body")
+    assert validators.current_etag(key) == etag
+    assert validators.etag_for(key, b"other body") != etag
+
+
+def test_revalidate_without_token_never_answers_304():
+    validators = ResponseValidators()
+    assert validators.revalidate("Tool", {}, None, "*") == (None, None)
+    assert validators.finish(None, b"body", "*") == (None, False)
+
+
+class VersionedTool(BaseModel):
+    read_only: ClassVar[bool] = True
+    action: str = "retrieve_block"
+    runs: ClassVar[int] = 0
+    version: ClassVar[str] = "1"
+
+    async def afreshness_token(self):
+        return f"block:{VersionedTool.version}"
+
+    async def arun(self) -> str:
+        VersionedTool.runs += 1
+        return f"content v{VersionedTool.version}"
+
+
+AUTH = {"Authorization": "Bearer secret"}
+
+
+def test_asgi_endpoint_answers_304_without_running_the_tool(monkeypatch):
+    monkeypatch.setattr(asgi, "db_token", "secret")
+    monkeypatch.setattr(asgi, "RESPONSE_VALIDATORS", ResponseValidators())
+    app = asgi.create_app(workers=2, max_concurrency=4, max_queue=4, tool_classes=[VersionedTool])
+    with TestClient(app) as client:
+        first = client.post("/VersionedTool", json={"action": "retrieve_block"}, headers=AUTH)
+        assert first.status_code == 200
+        assert first.headers["Cache-Control"] == cache_control("retrieve_block")
+        etag = first.headers["ETag"]
+
+        runs = VersionedTool.runs
+        cached = client.post("/VersionedTool", json={"action": "retrieve_block"}, headers=dict(AUTH, **{"If-None-Match": etag}))
+        assert cached.status_code == 304
+        assert cached.headers["ETag"] == etag
+        assert VersionedTool.runs == runs
+
+        VersionedTool.version = "2"
+        changed = client.post("/VersionedTool", json={"action": "retrieve_block"}, headers=dict(AUTH, **{"If-None-Match": etag}))
+        assert changed.status_code == 200
+        assert changed.json() == {"response": "content v2"}
+        assert changed.headers["ETag"] != etag
@@ -0,0 +1,136 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import sqlite3
+import subprocess
+import threading
+import time
+import pytest
+from pydantic import BaseModel
+from starlette.testclient import TestClient
+import asgi
+from utils import jobs
+from utils.jobs import FAILED, RUNNING, SUCCEEDED, JobRunner, JobStore, report_progress
+
+
+def _wait_for(runner, job_id, status, timeout=5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = runner.get(job_id)
+        if job["status"] == status:
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"job {job_id} did not reach {status}: {runner.get(job_id)}")
+
+
+def test_job_reports_live_progress_and_stores_the_result(tmp_path):
+    runner = JobRunner(JobStore(str(tmp_path / "jobs.sqlite3")), workers=2)
+    release = threading.Event()
+
+    def run():
+        report_progress(blocks=100)
+        report_progress(blocks=50, pages=3)
+        release.wait(5)
+        return "result"
+
+    job_id = runner.submit("Tool", {"action": "x"}, run)
+    job = _wait_for(runner, job_id, RUNNING)
+    deadline = time.monotonic() + 5
+    while job["progress"] != {"blocks": 150, "pages": 3} and time.monotonic() < deadline:
+        job = runner.get(job_id)
+    assert job["progress"] == {"blocks": 150, "pages": 3}
+    release.set()
+    job = _wait_for(runner, job_id, SUCCEEDED)
+    assert job["result"] == "result"
+    assert job["progress"] == {"blocks": 150, "pages": 3}
+
+
+def test_failed_jobs_keep_the_error(tmp_path):
+    runner = JobRunner(JobStore(str(tmp_path / "jobs.sqlite3")))
+
+    def run():
+        raise RuntimeError("Notion is down")
+
+    job = _wait_for(runner, runner.submit("Tool", {}, run), FAILED)
+    assert job["error"] == "Notion is down"
+
+
+def test_finished_jobs_survive_a_restart_and_unfinished_ones_fail(tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+    runner = JobRunner(JobStore(path))
+    done_id = runner.submit("Tool", {}, lambda: "kept")
+    _wait_for(runner, done_id, SUCCEEDED)
+    stuck_id = runner.store.create("Tool", {})
+    # The previous run had the same pid, as a restarted container would
+    runner.store.update(stuck_id, owner_process_id="previous-run")
+
+    restarted = JobRunner(JobStore(path))
+    assert restarted.get(done_id)["result"] == "kept"
+    assert restarted.get(stuck_id)["status"] == FAILED
+    assert restarted.get("missing") is None
+
+
+def test_only_jobs_of_dead_owners_fail_on_startup(tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+    store = JobStore(path)
+    own_id = store.create("Tool", {})
+    other_id = store.create("Tool", {})
+    store.update(other_id, owner_pid=os.getppid(), owner_process_id="other-worker")
+    exited = subprocess.Popen([sys.executable, "-c", "pass"])
+    exited.wait()
+    dead_id = store.create("Tool", {})
+    store.update(dead_id, owner_pid=exited.pid, owner_process_id="exited-worker")
+    rebooted_id = store.create("Tool", {})
+    store.update(rebooted_id, owner_pid=os.getppid(), owner_boot_id="previous-boot")
+
+    reopened = JobStore(path)
+    assert reopened.get(own_id)["status"] == jobs.QUEUED
+    assert reopened.get(other_id)["status"] == jobs.QUEUED
+    assert reopened.get(dead_id)["status"] == FAILED
+    assert reopened.get(rebooted_id)["status"] == FAILED
+
+
+def test_jobs_without_an_owner_from_an_older_store_fail_on_startup(tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE jobs (job_id TEXT PRIMARY KEY, tool TEXT NOT NULL, arguments TEXT NOT NULL, status TEXT NOT NULL, "
+        "progress TEXT NOT NULL, result TEXT, error TEXT, created_at REAL NOT NULL, started_at REAL, finished_at REAL)"
+    )
+    conn.execute("INSERT INTO jobs (job_id, tool, arguments, status, progress, created_at) VALUES ('old', 'Tool', '{}', 'running', '{}', ?)", (time.time(),))
+    conn.commit()
+    conn.close()
+
+    store = JobStore(path)
+    assert store.get("old")["status"] == FAILED
+    assert store.get(store.create("Tool", {}))["status"] == jobs.QUEUED
+
+
+def test_report_progress_outside_a_job_is_a_noop():
+    report_progress(blocks=1)
+
+
+class SlowTool(BaseModel):
+    value: str
+
+    def run(self) -> str:
+        report_progress(pages=1)
+        return self.value.upper()
+
+
+def test_async_query_parameter_returns_a_job(monkeypatch, tmp_path):
+    monkeypatch.setattr(jobs, "_job_runner", JobRunner(JobStore(str(tmp_path / "jobs.sqlite3"))))
+    monkeypatch.setattr(asgi, "db_token", "secret")
+    auth = {"Authorization": "Bearer secret"}
+    app = asgi.create_app(workers=1, max_concurrency=2, max_queue=2, tool_classes=[SlowTool])
+    with TestClient(app) as client:
+        response = client.post("/SlowTool?async=1", json={"value": "done"}, headers=auth)
+        assert response.status_code == 202
+        job_id = response.json()["job_id"]
+        _wait_for(jobs._job_runner, job_id, SUCCEEDED)
+        job = client.get(response.json()["status_url"], headers=auth).json()
+        assert client.get("/jobs/unknown", headers=auth).status_code == 404
+        assert client.get(f"/jobs/{job_id}").status_code == 401
+    assert job["status"] == SUCCEEDED
+    assert job["result"] == "DONE"
+    assert job["progress"] == {"pages": 1}
@@ -0,0 +1,131 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from utils.metrics import MCP_CALLS, MCP_SPAWNS
+from utils.mcp_pool import MCPServerPool
+
+
+class FakeSession:
+    def __init__(self, server):
+        self.server = server
+
+    async def send_ping(self):
+        if self.server.dead:
+            raise ConnectionError("process exited")
+
+
+class FakeServer:
+    """Stands in for MCPServerStdio: one instance per spawned process."""
+    instances = []
+
+    def __init__(self, fail_calls=0):
+        self.connected = False
+        self.closed = False
+        self.dead = False
+        self.fail_calls = fail_calls
+        self.session = FakeSession(self)
+        self.loop_thread = None
+        FakeServer.instances.append(self)
+
+    async def connect(self):
+        await asyncio.sleep(0.01)
+        self.connected = True
+        self.loop_thread = threading.current_thread().name
+
+    async def cleanup(self):
+        self.closed = True
+
+    async def list_tools(self):
+        return ["slack_list_channels"]
+
+    async def call_tool(self, tool_name, arguments):
+        assert threading.current_thread().name == self.loop_thread
+        if self.fail_calls:
+            self.fail_calls -= 1
+            raise ConnectionError("broken pipe")
+        await asyncio.sleep(0.01)
+        return f"{tool_name} {arguments}"
+
+
+@pytest.fixture
+def make_pool():
+    FakeServer.instances = []
+    pools = []
+
+    def make(name="fake", **kwargs):
+        factory = kwargs.pop("factory", FakeServer)
+        pool = MCPServerPool(name, factory, **kwargs)
+        pools.append(pool)
+        return pool
+    yield make
+    for pool in pools:
+        pool.close(timeout=1)
+
+
+def test_calls_from_many_threads_share_the_pooled_processes(make_pool):
+    pool = make_pool(size=2)
+    server = pool.server()
+
+    def call(index):
+        # Each call runs on its own event loop, like agency_swarm's MCP tool callbacks
+        async def run():
+            await server.connect()
+            result = await server.call_tool("slack_list_channels", {"index": index})
+            await server.cleanup()
+            return result
+        return asyncio.run(run())
+
+    with ThreadPoolExecutor(8) as executor:
+        results = list(executor.map(call, range(20)))
+    assert results == [f"slack_list_channels {{'index': {index}}}" for index in range(20)]
+    assert len(FakeServer.instances) == 2
+    assert not any(instance.closed for instance in FakeServer.instances)
+    assert asyncio.run(server.list_tools()) == ["slack_list_channels"]
+    assert pool.stats() == {"size": 2, "ready": 2, "in_flight": 0, "restarts": 0}
+
+
+def test_a_server_failing_a_call_is_restarted(make_pool):
+    pool = make_pool(size=1, factory=lambda: FakeServer(fail_calls=1 if not FakeServer.instances else 0))
+    before = MCP_CALLS.values().get(("fake", "slack_post_message", "error"), 0)
+    with pytest.raises(ConnectionError):
+        asyncio.run(pool.server().call_tool("slack_post_message", {}))
+    assert MCP_CALLS.values()[("fake", "slack_post_message", "error")] == before + 1
+
+    assert asyncio.run(pool.server().call_tool("slack_post_message", {})) == "slack_post_message {}"
+    assert len(FakeServer.instances) == 2
+    assert FakeServer.instances[0].closed
+    assert pool.stats()["restarts"] == 1
+
+
+def test_health_check_replaces_a_dead_server(make_pool):
+    pool = make_pool(size=1, health_interval=0.02)
+    assert pool.warm_up(timeout=5)
+    FakeServer.instances[0].dead = True
+    deadline = time.monotonic() + 5
+    while len(FakeServer.instances) < 2 or pool.stats()["ready"] < 1:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    assert FakeServer.instances[0].closed
+    assert pool.stats()["restarts"] == 1
+
+
+def test_failed_spawns_are_counted_and_retried(make_pool):
+    attempts = []
+
+    class FailingFirstServer(FakeServer):
+        async def connect(self):
+            attempts.append(self)
+            if len(attempts) == 1:
+                raise FileNotFoundError("npx")
+            await super().connect()
+
+    before = MCP_SPAWNS.values().get(("failing", "error"), 0)
+    pool = make_pool("failing", size=1, factory=FailingFirstServer)
+    assert pool.warm_up(timeout=5)
+    assert MCP_SPAWNS.values()[("failing", "error")] == before + 1
+    assert len(attempts) == 2
@@ -0,0 +1,88 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import threading
+import pytest
+from pydantic import BaseModel
+from starlette.testclient import TestClient
+import asgi
+from utils.helpers import limit_response_length
+from utils.metrics import RESPONSE_PAGES, Counter, Histogram, MetricsRegistry, notion_endpoint
+
+
+def test_counter_merges_thread_shards_including_finished_threads():
+    counter = Counter("calls_total", "Calls.", ("tool",))
+
+    def record():
+        for _ in range(1000):
+            counter.inc("a")
+
+    threads = [threading.Thread(target=record) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    counter.inc("b", amount=2)
+    assert counter.values() == {("a",): 4000, ("b",): 2}
+    # Shards of exited threads are folded into one, without losing counts
+    assert counter.values() == {("a",): 4000, ("b",): 2}
+    assert len(counter._shards._shards) == 1
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("latency_seconds", "Latency.", ("tool",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 5.0):
+        histogram.observe(value, "x")
+    text = registry.render()
+    assert 'latency_seconds_bucket{tool="x",le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{tool="x",le="1.0"} 3' in text
+    assert 'latency_seconds_bucket{tool="x",le="+Inf"} 4' in text
+    assert 'latency_seconds_count{tool="x"} 4' in text
+    assert 'latency_seconds_sum{tool="x"} 6.05' in text
+
+
+@pytest.mark.parametrize("method,path,endpoint", [
+    ("POST", "search", "search"),
+    ("POST", "databases/db1/query", "databases.query"),
+    ("GET", "databases/db1", "databases.retrieve"),
+    ("GET", "blocks/b1/children", "blocks.children.list"),
+    ("PATCH", "blocks/b1/children", "blocks.children.append"),
+    ("GET", "pages/p1", "pages.retrieve"),
+    ("PATCH", "pages/p1", "pages.update"),
+    ("POST", "pages", "pages.create"),
+    ("DELETE", "blocks/b1", "blocks.delete"),
+    ("GET", "pages/p1/properties/title", "pages.properties.retrieve"),
+])
+def test_notion_endpoint_names(method, path, endpoint):
+    assert notion_endpoint(method, path) == endpoint
+
+
+def test_limit_response_length_records_pages(monkeypatch):
+    monkeypatch.setenv("NOTION_TOOL_PAGE_LENGTH", "10")
+    before = sum(state[-1] for state in RESPONSE_PAGES.values().values())
+    limit_response_length("x" * 25)
+    assert sum(state[-1] for state in RESPONSE_PAGES.values().values()) == before + 1
+
+
+class MeteredTool(BaseModel):
+    action: str
+
+    async def arun(self) -> str:
+        return "done"
+
+
+def test_metrics_endpoint_reports_tool_calls(monkeypatch):
+    monkeypatch.setattr(asgi, "db_token", "secret")
+    app = asgi.create_app(workers=1, max_concurrency=2, max_queue=2, tool_classes=[MeteredTool])
+    auth = {"Authorization": "Bearer secret"}
+    with TestClient(app) as client:
+        client.post("/MeteredTool", json={"action": "search"}, headers=auth)
+        client.post("/MeteredTool", json={}, headers=auth)
+        assert client.get("/metrics").status_code == 401
+        response = client.get("/metrics", headers=auth)
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'tool_requests_total{tool="MeteredTool",action="search",status="ok"}' in response.text
+    assert 'tool_requests_total{tool="MeteredTool",action="",status="error"}' in response.text
+    assert 'tool_request_duration_seconds_count{tool="MeteredTool",action="search"}' in response.text
+    assert 'cache_hit_ratio{cache="result_store"}' in response.text
@@ -0,0 +1,150 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import httpx
+import pytest
+from unittest.mock import patch, AsyncMock
+from notion_client.errors import APIResponseError
+from utils import notion_api
+from utils.notion_api import NotionClientMetrics, RateLimitedClient, is_read_request, retry_delay
+from utils.rate_limiter import TokenBucket
+
+
+def _client(responses, **kwargs):
+    """Client whose transport replays the given (status, headers) pairs and records each request."""
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        status, headers = responses[min(len(requests), len(responses)) - 1]
+        body = {"object": "list", "results": []} if status == 200 else {"object": "error", "code": "rate_limited", "message": "slow down"}
+        return httpx.Response(status, json=body, headers=headers)
+
+    metrics = NotionClientMetrics()
+    client = RateLimitedClient(auth="secret", limiter=TokenBucket(rate=0), metrics=metrics,
+                               transport=httpx.MockTransport(handler), **kwargs)
+    return client, requests, metrics
+
+
+@pytest.fixture(autouse=True)
+def no_sleep():
+    with patch.object(notion_api.time, "sleep") as sleep:
+        yield sleep
+
+
+def test_retries_429_honouring_retry_after(no_sleep):
+    client, requests, metrics = _client([(429, {"Retry-After": "2"}), (200, {})])
+    assert client.blocks.children.list(block_id="b1") == {"object": "list", "results": []}
+    assert len(requests) == 2
+    assert 2 <= no_sleep.call_args[0][0] <= 2.5
+    snapshot = metrics.snapshot()
+    assert snapshot["requests"] == 2
+    assert snapshot["retries"] == 1
+    assert snapshot["rate_limited_responses"] == 1
+    assert snapshot["throttled_seconds"] >= 2
+
+
+def test_attempts_are_counted_per_endpoint_and_status():
+    from utils.metrics import NOTION_REQUESTS
+    before = NOTION_REQUESTS.values()
+    client, _, _ = _client([(429, {}), (200, {})])
+    client.blocks.children.list(block_id="b1")
+    after = NOTION_REQUESTS.values()
+    for labels in (("blocks.children.list", "429"), ("blocks.children.list", "200")):
+        assert after[labels] == before.get(labels, 0) + 1
+
+
+def test_gives_up_after_max_retries():
+    client, requests, _ = _client([(429, {})], max_retries=2)
+    with pytest.raises(APIResponseError):
+        client.search(query="x")
+    assert len(requests) == 3
+
+
+def test_server_errors_only_retried_for_reads():
+    client, requests, _ = _client([(503, {}), (200, {})])
+    client.databases.query(database_id="db1")
+    assert len(requests) == 2
+
+    client, requests, _ = _client([(503, {}), (200, {})])
+    with pytest.raises(Exception):
+        client.blocks.children.append(block_id="b1", children=[])
+    assert len(requests) == 1
+
+
+def test_every_attempt_takes_a_rate_limiter_token():
+    client, _, _ = _client([(429, {}), (200, {})])
+    with patch.object(client.limiter, "acquire", return_value=0.25) as acquire:
+        client.users.me()
+    assert acquire.call_count == 2
+    assert client.metrics.snapshot()["throttled_seconds"] >= 0.5
+
+
+def test_retry_delay_backs_off_exponentially():
+    assert 0.25 <= retry_delay(None, 0, 0.5, 30) <= 0.5
+    assert 2 <= retry_delay(None, 3, 0.5, 30) <= 4
+    assert 15 <= retry_delay(None, 10, 0.5, 30) <= 30
+
+
+def test_is_read_request():
+    assert is_read_request("GET", "blocks/b1/children")
+    assert is_read_request("POST", "search")
+    assert is_read_request("POST", "databases/db1/query")
+    assert not is_read_request("PATCH", "blocks/b1/children")
+    assert not is_read_request("POST", "pages")
+
+
+def test_shared_client_is_reused():
+    assert notion_api.get_notion_client() is notion_api.get_notion_client()
+
+
+def test_async_client_retries_429_and_reuses_pool_per_loop(no_sleep):
+    import asyncio
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        if len(calls) == 1:
+            return httpx.Response(429, json={"object": "error", "code": "rate_limited", "message": "slow down"}, headers={"Retry-After": "1"})
+        return httpx.Response(200, json={"object": "list", "results": []})
+
+    client = notion_api.AsyncRateLimitedClient(auth="secret", limiter=TokenBucket(rate=0), metrics=NotionClientMetrics(),
+                                               transport=httpx.MockTransport(handler))
+
+    async def query_twice():
+        await client.databases.query(database_id="db1")
+        first_pool = client.client
+        await client.databases.query(database_id="db1")
+        return first_pool is client.client
+
+    with patch.object(notion_api.asyncio, "sleep", AsyncMock()) as sleep:
+        assert asyncio.run(query_twice())
+    assert len(calls) == 3
+    assert calls[0].headers["Authorization"] == "Bearer secret"
+    assert sleep.await_args[0][0] >= 1
+    assert client.metrics.snapshot()["rate_limited_responses"] == 1
+
+
+def test_async_client_gives_each_loop_its_own_pool_under_concurrency():
+    import asyncio
+    import threading
+    client = notion_api.AsyncRateLimitedClient(auth="secret", limiter=TokenBucket(rate=0), metrics=NotionClientMetrics(),
+                                               transport=httpx.MockTransport(lambda request: httpx.Response(200, json={})))
+    start = threading.Barrier(8)
+    pools = []
+
+    async def first_pool():
+        start.wait()
+        pool = client.client
+        await asyncio.sleep(0)
+        return pool, pool is client.client
+
+    threads = [threading.Thread(target=lambda: pools.append(asyncio.run(first_pool()))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert all(stable for _, stable in pools)
+    assert len({id(pool) for pool, _ in pools}) == 8
+    assert all(pool.headers["Authorization"] == "Bearer secret" for pool, _ in pools)
+    assert len(client._clients) == 1
@@ -0,0 +1,107 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import pytest
+from unittest.mock import patch, MagicMock
+from utils import notion_mirror
+from utils.notion_mirror import NotionMirror
+from utils.notion_filters import matches_filter, sort_pages, UnsupportedFilterError
+
+
+def _page(page_id, title, status, edited, priority=None):
+    return {
+        "id": page_id,
+        "created_time": "2024-01-01T00:00:00.000Z",
+        "last_edited_time": edited,
+        "properties": {
+            "Task name": {"type": "title", "title": [{"plain_text": title}]},
+            "Status": {"type": "status", "status": {"name": status}},
+            "Priority": {"type": "select", "select": {"name": priority} if priority else None},
+        },
+    }
+
+
+SCHEMA = {"Priority": {"type": "select", "select": {"options": [{"name": "P0"}, {"name": "P1"}, {"name": "P2"}]}}}
+
+
+@pytest.fixture
+def fake_notion():
+    notion = MagicMock()
+    notion.databases.retrieve.return_value = {"properties": SCHEMA}
+    with patch.object(notion_mirror, "notion", notion):
+        yield notion
+
+
+def test_sync_is_incremental_after_first_full_sync(fake_notion):
+    mirror = NotionMirror(path=":memory:")
+    fake_notion.databases.query.return_value = {
+        "results": [_page("a", "Alpha", "Done", "2024-02-01T10:00:00.000Z"), _page("b", "Beta", "In Progress", "2024-02-02T10:00:00.000Z")],
+        "has_more": False,
+    }
+    assert mirror.sync("db")["mode"] == "full"
+
+    fake_notion.databases.query.return_value = {
+        "results": [_page("b", "Beta v2", "Done", "2024-02-03T10:00:00.000Z")],
+        "has_more": False,
+    }
+    summary = mirror.sync("db")
+    assert summary["mode"] == "incremental"
+    sent_filter = fake_notion.databases.query.call_args.kwargs["filter"]
+    assert sent_filter == {"timestamp": "last_edited_time", "last_edited_time": {"on_or_after": "2024-02-02T10:00:00.000Z"}}
+
+    result = mirror.query("db", notion_filter={"property": "Status", "status": {"equals": "Done"}}, max_staleness=3600)
+    assert [page["id"] for page in result["results"]] == ["b", "a"]
+    assert result["synced_at"] is not None
+
+
+def test_full_resync_drops_removed_pages(fake_notion):
+    mirror = NotionMirror(path=":memory:")
+    fake_notion.databases.query.return_value = {"results": [_page("a", "A", "Done", "2024-02-01T10:00:00.000Z")], "has_more": False}
+    mirror.sync("db")
+    fake_notion.databases.query.return_value = {"results": [], "has_more": False}
+    assert mirror.sync("db", full=True)["pages_removed"] == 1
+    assert mirror.query("db", max_staleness=3600)["total_count"] == 0
+
+
+def test_local_query_paginates_with_offset_cursor(fake_notion):
+    mirror = NotionMirror(path=":memory:")
+    fake_notion.databases.query.return_value = {
+        "results": [_page(str(i), f"Task {i}", "Done", f"2024-02-0{i}T10:00:00.000Z") for i in range(1, 6)],
+        "has_more": False,
+    }
+    first = mirror.query("db", page_size=2)
+    second = mirror.query("db", page_size=2, start_cursor=first["next_cursor"])
+    assert [page["id"] for page in first["results"]] == ["5", "4"]
+    assert [page["id"] for page in second["results"]] == ["3", "2"]
+    assert fake_notion.databases.query.call_count == 1
+
+
+def test_matches_filter_compound_and_text_conditions():
+    page = _page("a", "Deploy agency", "In Progress", "2024-02-01T10:00:00.000Z", "P1")
+    assert matches_filter(page, {"and": [
+        {"property": "Task name", "title": {"contains": "deploy"}},
+        {"or": [{"property": "Priority", "select": {"equals": "P0"}}, {"property": "Priority", "select": {"equals": "P1"}}]},
+    ]})
+    assert not matches_filter(page, {"timestamp": "last_edited_time", "last_edited_time": {"after": "2024-03-01"}})
+    with pytest.raises(UnsupportedFilterError):
+        matches_filter(page, {"timestamp": "last_edited_time", "last_edited_time": {"past_week": {}}})
+
+
+def test_sort_pages_uses_select_option_order_and_puts_empty_last():
+    pages = [_page("low", "x", "Done", "t", "P2"), _page("none", "x", "Done", "t"), _page("high", "x", "Done", "t", "P0")]
+    ordered = sort_pages(pages, [{"property": "Priority", "direction": "ascending"}], SCHEMA)
+    assert [page["id"] for page in ordered] == ["high", "low", "none"]
+
+
+def test_sort_pages_orders_mixed_value_types_without_errors():
+    def scored(page_id, formula):
+        page = _page(page_id, "x", "Done", "t")
+        page["properties"]["Score"] = {"type": "formula", "formula": formula}
+        return page
+
+    pages = [scored("text", {"type": "string", "string": "High"}), scored("empty", None),
+             scored("number", {"type": "number", "number": 3}), scored("flag", {"type": "boolean", "boolean": True})]
+    ordered = sort_pages(pages, [{"property": "Score", "direction": "ascending"}])
+    assert [page["id"] for page in ordered] == ["flag", "number", "text", "empty"]
+    ordered = sort_pages(pages, [{"property": "Score", "direction": "descending"}])
+    assert [page["id"] for page in ordered] == ["text", "number", "flag", "empty"]
@@ -2,8 +2,10 @@ import sys
 import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 import pytest
+from unittest.mock import patch, AsyncMock
 from tools.NotionAgent.NotionReadTool import NotionReadTool
 from tools.NotionAgent.NotionUpdateTool import NotionUpdateTool
+from utils.async_runner import iterate_sync
 
 # NotionReadTool tests
 @pytest.mark.parametrize("action,params,should_raise", [
@@ -28,7 +30,7 @@ def test_notion_readtool_validation(action, params, should_raise):
         tool = NotionReadTool(**params)
         assert tool.action == action
 
-@patch("tools.NotionAgent.NotionReadTool.NOTION_CLIENT")
+@patch("tools.NotionAgent.NotionReadTool.NOTION_CLIENT", new_callable=AsyncMock)
 def test_notion_readtool_run_search(mock_client):
     tool = NotionReadTool(action="search", query="test")
     mock_client.search.return_value = {"results": []}
@@ -36,14 +38,29 @@ def test_notion_readtool_run_search(mock_client):
         result = tool.run()
         assert "Page" in result
 
-@patch("tools.NotionAgent.NotionReadTool.NOTION_CLIENT")
+@patch("tools.NotionAgent.NotionReadTool.NOTION_CLIENT", new_callable=AsyncMock)
 def test_notion_readtool_run_retrieve_full_page(mock_client):
     tool = NotionReadTool(action="retrieve_full_page", page_id="page123")
     mock_client.pages.retrieve.return_value = {"id": "page123"}
-    with patch("tools.NotionAgent.NotionReadTool.get_blocks_recursive_full", return_value=[{"block": 1}]):
+    with patch("tools.NotionAgent.NotionReadTool.aget_blocks_full", return_value=[{"block": 1}]):
         result = tool.run()
         assert "Page" in result or "page" in result
 
+@patch("tools.NotionAgent.NotionReadTool.NOTION_CLIENT", new_callable=AsyncMock)
+def test_notion_readtool_astream_yields_page_then_blocks(mock_client):
+    async def fake_walker(block_id, depth, version=None):
+        yield "page123", {"id": "a", "has_children": True}
+        yield "a", {"id": "a1"}
+        yield "a", {"error": "no access"}
+
+    tool = NotionReadTool(action="retrieve_full_page", page_id="page123")
+    mock_client.pages.retrieve.return_value = {"id": "page123", "last_edited_time": "v1"}
+    with patch("tools.NotionAgent.NotionReadTool.aiter_blocks_full", fake_walker):
+        records = list(iterate_sync(tool.astream()))
+    assert [record["type"] for record in records] == ["page", "block", "block", "error", "end"]
+    assert records[2] == {"type": "block", "parent_id": "a", "block": {"id": "a1"}}
+    assert records[-1] == {"type": "end", "blocks": 2}
+
 # NotionUpdateTool tests
 @pytest.mark.parametrize("action,params,should_raise", [
     ("update_page_properties", {"page_id": "page123", "property_updates": {"Status": {"select": {"name": "Done"}}}}, False),
@@ -74,4 +91,42 @@ def test_notion_updatetool_run_append_block(mock_client):
     tool = NotionUpdateTool(action="append_block", page_id="page123", new_blocks=[{"object": "block", "type": "paragraph", "paragraph": {"text": [{"type": "text", "text": {"content": "Hello"}}]}}])
     mock_client.blocks.children.append.return_value = {"results": [{"object": "block", "id": "block123"}]}
     result = tool.run()
-    assert "block" in result or "block123" in result 
\ No newline at end of file
+    assert "block" in result or "block123" in result 
+
+@patch("tools.NotionAgent.NotionReadTool.NOTION_CLIENT", new_callable=AsyncMock)
+def test_notion_readtool_result_handle_serves_later_pages_without_notion_calls(mock_client, monkeypatch):
+    monkeypatch.setenv("NOTION_TOOL_PAGE_LENGTH", "100")
+    mock_client.blocks.retrieve.return_value = {"id": "block123", "text": "x" * 500}
+    first = NotionReadTool(action="retrieve_block", block_id="block123").run()
+    assert "result_handle=" in first
+    handle = first.split("result_handle=")[1].rstrip("]")
+    second = NotionReadTool(action="retrieve_block", block_id="block123", page_number=2, result_handle=handle).run()
+    assert "[Page 2/" in second
+    assert mock_client.blocks.retrieve.call_count == 1
+
+@patch("tools.NotionAgent.NotionReadTool.NOTION_CLIENT", new_callable=AsyncMock)
+def test_notion_readtool_ignores_result_handle_of_another_call(mock_client, monkeypatch):
+    monkeypatch.setenv("NOTION_TOOL_PAGE_LENGTH", "100")
+    mock_client.blocks.retrieve.side_effect = lambda block_id: {"id": block_id, "text": block_id * 100}
+    first = NotionReadTool(action="retrieve_block", block_id="aaa").run()
+    handle = first.split("result_handle=")[1].rstrip("]")
+    other = NotionReadTool(action="retrieve_block", block_id="bbb", page_number=2, result_handle=handle).run()
+    assert "aaa" not in other and "bbb" in other
+    assert mock_client.blocks.retrieve.call_count == 2
+
+def test_notion_readtool_query_database_fetch_all_returns_total_count():
+    scan = {"results": [{"id": "row1"}, {"id": "row2"}], "total_count": 2, "shards": 2}
+    with patch("tools.NotionAgent.NotionReadTool.afetch_all_pages", return_value=scan) as fetch_all, \
+            patch("tools.NotionAgent.NotionReadTool.clean_notion_database_response", side_effect=lambda rows, db: rows):
+        result = NotionReadTool(action="query_database", database_id="db1", fetch_all=True).run()
+    fetch_all.assert_awaited_once()
+    assert '"total_count":2' in result
+    assert '"has_more":false' in result
+
+@patch("tools.NotionAgent.NotionReadTool.NOTION_CLIENT", new_callable=AsyncMock)
+def test_notion_readtool_local_fallback_rejects_local_cursor(mock_client):
+    from utils.notion_filters import UnsupportedFilterError
+    with patch("tools.NotionAgent.NotionReadTool.clean_local_query", side_effect=UnsupportedFilterError("past_week")):
+        with pytest.raises(ValueError, match="local cursor"):
+            NotionReadTool(action="query_database", database_id="db1", source="local", start_cursor="50").run()
+    mock_client.databases.query.assert_not_called()
@@ -0,0 +1,106 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import pytest
+from unittest.mock import patch, MagicMock
+from utils import search_index
+from utils.search_index import BM25Index, LocalSearchIndex, fuse_search_results
+from utils.db_response_cleanup import clean_notion_search_response
+
+
+def _page(page_id, title, edited="2024-01-01T00:00:00.000Z", tags=()):
+    return {
+        "object": "page", "id": page_id, "url": f"https://notion.so/{page_id}", "last_edited_time": edited,
+        "properties": {
+            "Name": {"type": "title", "title": [{"plain_text": title}]},
+            "Tags": {"type": "multi_select", "multi_select": [{"name": tag} for tag in tags]},
+        },
+    }
+
+
+def _paragraph(text):
+    return {"id": text, "type": "paragraph", "paragraph": {"rich_text": [{"plain_text": text}]}}
+
+
+def test_bm25_ranks_title_matches_above_body_matches():
+    index = BM25Index()
+    index.add("body", "Weekly update", "we deploy the agency on cloud run every friday")
+    index.add("title", "Deploy agency on Cloud Run", "steps")
+    index.add("other", "Lunch menu", "pizza")
+    ranked = [doc_id for doc_id, _ in index.search("deploy cloud run")]
+    assert ranked == ["title", "body"]
+    index.remove("title")
+    assert [doc_id for doc_id, _ in index.search("deploy")] == ["body"]
+
+
+def test_local_search_indexes_block_text_and_keeps_search_response_shape():
+    index = LocalSearchIndex(path=":memory:")
+    index.index_item(_page("p1", "Playbook", tags=["ops"]), blocks=[_paragraph("rotate the API keys monthly")])
+    index.index_item(_page("p2", "Hiring"), blocks=[_paragraph("interview loop")])
+    result = index.search("api keys")
+    assert [item["id"] for item in result["results"]] == ["p1"]
+    cleaned = clean_notion_search_response(result)
+    assert cleaned["items"][0]["title"] == "Playbook"
+    assert cleaned["items"][0]["tags"] == ["ops"]
+
+
+def test_refresh_only_fetches_pages_edited_since_last_refresh():
+    notion = MagicMock()
+    notion.search.return_value = {"results": [_page("p2", "New", "2024-01-02T00:00:00.000Z"), _page("p1", "Old")], "has_more": False}
+    with patch.object(search_index, "notion", notion), \
+            patch.object(search_index, "get_blocks_concurrent_full", return_value=[_paragraph("body")]) as fetch_blocks:
+        index = LocalSearchIndex(path=":memory:")
+        assert index.refresh()["indexed"] == 2
+        notion.search.return_value = {"results": [_page("p3", "Newest", "2024-01-03T00:00:00.000Z"), _page("p2", "New", "2024-01-02T00:00:00.000Z")], "has_more": False}
+        summary = index.refresh()
+        assert summary == {"mode": "incremental", "indexed": 1, "removed": 0, "documents": 3}
+        assert fetch_blocks.call_count == 3
+
+
+def test_interrupted_refresh_is_redone_by_the_next_pass():
+    notion = MagicMock()
+    notion.search.return_value = {"results": [_page("p1", "Old"), _page("p0", "Older", "2023-12-01T00:00:00.000Z")], "has_more": False}
+    pages = {
+        None: {"results": [_page("p3", "Newest", "2024-01-05T00:00:00.000Z"), _page("p2", "Newer", "2024-01-04T00:00:00.000Z")], "has_more": True, "next_cursor": "c2"},
+        "c2": {"results": [_page("p1", "Changed", "2024-01-03T00:00:00.000Z"), _page("p0", "Older", "2023-12-01T00:00:00.000Z")], "has_more": False},
+    }
+    with patch.object(search_index, "notion", notion), \
+            patch.object(search_index, "get_blocks_concurrent_full", return_value=[_paragraph("body")]) as fetch_blocks:
+        index = LocalSearchIndex(path=":memory:")
+        assert index.refresh()["indexed"] == 2
+
+        def search_failing_on_page_two(start_cursor=None, **params):
+            if start_cursor:
+                raise ConnectionError("Notion is down")
+            return pages[start_cursor]
+
+        notion.search.side_effect = search_failing_on_page_two
+        with pytest.raises(ConnectionError):
+            index.refresh()
+
+        notion.search.side_effect = lambda start_cursor=None, **params: pages[start_cursor]
+        summary = index.refresh()
+        assert summary == {"mode": "incremental", "indexed": 1, "removed": 0, "documents": 4}
+        assert [call.args[0] for call in fetch_blocks.call_args_list] == ["p1", "p0", "p3", "p2", "p1"]
+        assert index.search("changed")["results"][0]["id"] == "p1"
+
+
+def test_page_indexed_from_error_blocks_is_fetched_again():
+    notion = MagicMock()
+    notion.search.return_value = {"results": [_page("p1", "Flaky")], "has_more": False}
+    blocks = [_paragraph("first"), {"id": "b2", "type": "toggle", "children_blocks": [{"error": "rate limited"}]}]
+    with patch.object(search_index, "notion", notion), \
+            patch.object(search_index, "get_blocks_concurrent_full", side_effect=[blocks, [_paragraph("complete")]]) as fetch_blocks:
+        index = LocalSearchIndex(path=":memory:")
+        assert index.refresh()["indexed"] == 1
+        assert index.search("first")["results"][0]["id"] == "p1"
+        assert index.refresh()["indexed"] == 1
+        assert fetch_blocks.call_count == 2
+        assert index.search("complete")["results"][0]["id"] == "p1"
+        assert index.refresh()["indexed"] == 0
+
+
+def test_fuse_search_results_deduplicates_and_prefers_items_in_both_lists():
+    local = [{"id": "a"}, {"id": "b"}]
+    remote = [{"id": "c"}, {"id": "b"}]
+    assert [item["id"] for item in fuse_search_results(local, remote, limit=3)] == ["b", "a", "c"]
@@ -0,0 +1,75 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from utils.single_flight import SingleFlight, is_read_only
+from tools.NotionAgent.NotionReadTool import NotionReadTool
+from tools.NotionAgent.NotionUpdateTool import NotionUpdateTool
+
+
+def test_key_ignores_argument_order():
+    assert SingleFlight.key("T", {"a": 1, "b": {"c": 2, "d": 3}}) == SingleFlight.key("T", {"b": {"d": 3, "c": 2}, "a": 1})
+    assert SingleFlight.key("T", {"a": 1}) != SingleFlight.key("U", {"a": 1})
+
+
+def test_concurrent_identical_calls_share_one_execution():
+    flights = SingleFlight()
+    calls = []
+
+    def slow_query():
+        calls.append(threading.current_thread().name)
+        time.sleep(0.2)
+        return "rows"
+
+    with ThreadPoolExecutor(5) as pool:
+        results = list(pool.map(lambda _: flights.do("k", slow_query), range(5)))
+    assert results == ["rows"] * 5
+    assert len(calls) == 1
+    assert flights.stats() == {"executions": 1, "coalesced": 4, "in_flight": 0}
+
+    # Finished calls are not cached
+    assert flights.do("k", lambda: "fresh") == "fresh"
+
+
+def test_followers_receive_the_leaders_exception():
+    flights = SingleFlight()
+    started = threading.Event()
+
+    def failing():
+        started.set()
+        time.sleep(0.3)
+        raise RuntimeError("notion down")
+
+    with ThreadPoolExecutor(2) as pool:
+        leader = pool.submit(flights.do, "k", failing)
+        started.wait()
+        follower = pool.submit(flights.do, "k", lambda: "never")
+        for future in (leader, follower):
+            with pytest.raises(RuntimeError):
+                future.result()
+
+
+def test_async_calls_are_coalesced():
+    flights = SingleFlight()
+    calls = []
+
+    async def query():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "rows"
+
+    async def main():
+        return await asyncio.gather(*(flights.ado("k", query) for _ in range(4)), flights.ado("other", query))
+
+    assert asyncio.run(main()) == ["rows"] * 5
+    assert len(calls) == 2
+    assert flights.stats()["coalesced"] == 3
+
+
+def test_only_read_tools_are_coalesced():
+    assert is_read_only(NotionReadTool)
+    assert not is_read_only(NotionUpdateTool)
@@ -0,0 +1,147 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import json
+import time
+import pytest
+from slack_sdk.signature import SignatureVerifier
+from utils import slack_directory
+from utils.slack_directory import SlackDirectory, handle_slack_event
+
+
+class FakeSlackClient:
+    def __init__(self):
+        self.calls = []
+        self.channels = [{"id": "C001GENERAL", "name": "general"}, {"id": "C002RANDOM", "name": "random"}]
+        self.users = [{"id": "U001", "name": "ada", "real_name": "Ada Lovelace", "profile": {"display_name": "ada.l"}}]
+        self.fail = False
+
+    def conversations_list(self, cursor=None, **kwargs):
+        self.calls.append(("conversations_list", cursor, kwargs))
+        if self.fail:
+            raise ConnectionError("Slack is down")
+        # Two pages, one channel each
+        if cursor is None:
+            return {"channels": self.channels[:1], "response_metadata": {"next_cursor": "page2"}}
+        return {"channels": self.channels[1:], "response_metadata": {"next_cursor": ""}}
+
+    def users_list(self, cursor=None, **kwargs):
+        self.calls.append(("users_list", cursor, kwargs))
+        return {"members": self.users}
+
+
+@pytest.fixture
+def client():
+    return FakeSlackClient()
+
+
+@pytest.fixture
+def directory(client):
+    return SlackDirectory(client=client)
+
+
+def test_directories_page_through_with_limit_1000_once(directory, client):
+    assert directory.channel_id("#general") == "C001GENERAL"
+    assert directory.channel_id("<#C002RANDOM|random>") == "C002RANDOM"
+    assert directory.channel_id("RANDOM") == "C002RANDOM"
+    assert directory.channel_id("missing") is None
+    assert [call[1] for call in client.calls] == [None, "page2"]
+    assert client.calls[0][2] == {"types": "public_channel,private_channel", "limit": 1000}
+
+    for reference in ("@ada", "Ada Lovelace", "ada.l", "<@U001>"):
+        assert directory.user_id(reference) == "U001"
+    assert directory.user_names(["U001", "U404", None]) == {"U001": "ada.l"}
+    assert [call[0] for call in client.calls].count("users_list") == 1
+    assert client.calls[-1][2] == {"limit": 1000}
+    assert directory.channels.stats()["hits"] == 2 and directory.channels.stats()["misses"] == 1
+
+
+def test_expired_directory_is_reloaded_and_kept_when_the_reload_fails(client):
+    directory = SlackDirectory(ttl=0.05, client=client)
+    assert directory.channel_id("general") == "C001GENERAL"
+    client.channels.append({"id": "C003LAUNCH", "name": "launch"})
+    assert directory.channel_id("launch") is None
+    time.sleep(0.06)
+    assert directory.channel_id("launch") == "C003LAUNCH"
+
+    client.fail = True
+    time.sleep(0.06)
+    assert directory.channel_id("launch") == "C003LAUNCH"
+    with pytest.raises(ConnectionError):
+        SlackDirectory(client=client).channel_id("general")
+
+
+def test_events_update_the_directories_without_a_reload(directory, client):
+    directory.channels.all()
+    directory.users.all()
+    calls = len(client.calls)
+
+    assert directory.apply_event({"type": "channel_created", "channel": {"id": "C003LAUNCH", "name": "launch"}})
+    assert directory.channel_id("launch") == "C003LAUNCH"
+    directory.apply_event({"type": "channel_rename", "channel": {"id": "C003LAUNCH", "name": "launch-2"}})
+    assert directory.channel_id("launch") is None and directory.channel_id("launch-2") == "C003LAUNCH"
+    directory.apply_event({"type": "channel_archive", "channel": "C002RANDOM", "user": "U001"})
+    assert directory.channels.get("C002RANDOM")["is_archived"] is True
+    directory.apply_event({"type": "channel_unarchive", "channel": "C002RANDOM", "user": "U001"})
+    assert directory.channels.get("C002RANDOM")["is_archived"] is False
+    directory.apply_event({"type": "channel_deleted", "channel": "C001GENERAL"})
+    assert directory.channel_id("general") is None
+
+    directory.apply_event({"type": "team_join", "user": {"id": "U002", "name": "grace", "real_name": "Grace Hopper"}})
+    directory.apply_event({"type": "user_change", "user": {"id": "U001", "name": "ada", "profile": {"display_name": "countess"}}})
+    assert directory.user_names(["U001", "U002"]) == {"U001": "countess", "U002": "Grace Hopper"}
+    assert directory.user_id("ada.l") is None
+    assert not directory.apply_event({"type": "message", "text": "hi"})
+    assert len(client.calls) == calls
+
+    directory.channels.invalidate()
+    directory.channel_id("general")
+    assert len(client.calls) == calls + 2
+
+
+def test_events_during_a_reload_are_not_lost(directory, client):
+    directory.channels.all()
+    fetch = directory.channels._fetch
+
+    def fetch_with_event():
+        channels = list(fetch())
+        # Slack listed the channels before this one was created
+        directory.apply_event({"type": "channel_created", "channel": {"id": "C003LAUNCH", "name": "launch"}})
+        return channels
+
+    directory.channels._fetch = fetch_with_event
+    directory.channels.refresh()
+    assert directory.channel_id("launch") == "C003LAUNCH"
+
+
+def test_prompt_summary_is_capped_per_kind(directory, client):
+    client.channels = [{"id": f"C{index:03d}CHANNEL", "name": f"channel-{index:03d}"} for index in range(60)]
+    summary = directory.prompt_summary()
+    assert "#channel-049: C049CHANNEL" in summary and "channel-050" not in summary
+    assert "(10 more channels not listed)" in summary
+    assert "@ada / ada.l: U001" in summary
+    assert directory.prompt_summary(limit=0) == ""
+
+
+def signed(body: dict, secret: str = "shh", timestamp: int = None) -> tuple:
+    raw = json.dumps(body).encode()
+    timestamp = str(timestamp or int(time.time()))
+    signature = SignatureVerifier(secret).generate_signature(timestamp=timestamp, body=raw)
+    return raw, {"X-Slack-Request-Timestamp": timestamp, "X-Slack-Signature": signature, "Content-Type": "application/json"}
+
+
+def test_event_endpoint_verifies_signatures_and_applies_events(directory, monkeypatch):
+    monkeypatch.setattr(slack_directory, "SLACK_DIRECTORY", directory)
+    directory.load()
+    monkeypatch.delenv("SLACK_SIGNING_SECRET", raising=False)
+    assert handle_slack_event(*signed({"type": "url_verification", "challenge": "abc"}))[0] == 503
+
+    monkeypatch.setenv("SLACK_SIGNING_SECRET", "shh")
+    assert handle_slack_event(*signed({"type": "url_verification", "challenge": "abc"})) == (200, {"challenge": "abc"})
+    assert handle_slack_event(*signed({"type": "url_verification", "challenge": "abc"}, secret="wrong"))[0] == 401
+    assert handle_slack_event(*signed({"type": "url_verification", "challenge": "abc"}, timestamp=int(time.time()) - 3600))[0] == 401
+
+    event = {"type": "event_callback", "event": {"type": "channel_created", "channel": {"id": "C003LAUNCH", "name": "launch"}}}
+    assert handle_slack_event(*signed(event)) == (200, {"ok": True, "applied": True})
+    assert directory.channel_id("#launch") == "C003LAUNCH"
+    assert handle_slack_event(*signed({"type": "event_callback", "event": {"type": "channel_deleted"}})) == (200, {"ok": True, "applied": False})
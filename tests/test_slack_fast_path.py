@@ -0,0 +1,121 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import pytest
+from unittest.mock import patch
+from slack_sdk.errors import SlackApiError
+from tools.SlackAgent.SlackMCPTool import SlackMCPTool
+from utils import slack_fast_path
+from utils.metrics import SLACK_QUERIES
+from utils.slack_directory import SlackDirectory
+from utils.slack_fast_path import SlackIntent, parse_intent, run_intent, try_fast_path
+
+
+class FakeSlackClient:
+    def __init__(self):
+        self.calls = []
+        self.channels = [
+            {"id": "C001GENERAL", "name": "general", "num_members": 12, "topic": {"value": "Company wide"}},
+            {"id": "C002RANDOM", "name": "random", "purpose": {"value": "Anything"}},
+        ]
+
+    def conversations_list(self, cursor=None, **kwargs):
+        self.calls.append(("conversations_list", cursor))
+        # Two pages, one channel each
+        if cursor is None:
+            return {"channels": self.channels[:1], "response_metadata": {"next_cursor": "page2"}}
+        return {"channels": self.channels[1:], "response_metadata": {"next_cursor": ""}}
+
+    def conversations_info(self, channel, **kwargs):
+        self.calls.append(("conversations_info", channel))
+        for item in self.channels:
+            if item["id"] == channel:
+                return {"channel": item}
+        raise SlackApiError("channel_not_found", {"ok": False, "error": "channel_not_found"})
+
+    def users_list(self, **kwargs):
+        return {"members": [{"id": "U1", "name": "ada", "profile": {"display_name": "Ada"}}]}
+
+    def conversations_history(self, channel, limit):
+        self.calls.append(("conversations_history", channel, limit))
+        return {"messages": [{"ts": "2.0", "user": "U1", "text": "hello", "reply_count": 2}, {"ts": "1.0", "bot_id": "B1", "text": "deployed"}]}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    fake = FakeSlackClient()
+    monkeypatch.setattr(slack_fast_path, "get_slack_client", lambda: fake)
+    monkeypatch.setattr(slack_fast_path, "SLACK_DIRECTORY", SlackDirectory(client=fake))
+    monkeypatch.delenv("SLACK_CHANNEL_IDS", raising=False)
+    return fake
+
+
+@pytest.mark.parametrize("query, intent", [
+    ("list channels", SlackIntent("list_channels")),
+    ("Please list all Slack channels.", SlackIntent("list_channels")),
+    ("get channel info for #general", SlackIntent("channel_info", "#general")),
+    ("info about the random channel", SlackIntent("channel_info", "random")),
+    ("latest messages in #general", SlackIntent("channel_history", "#general")),
+    ("show the last 5 messages from <#C001GENERAL|general>", SlackIntent("channel_history", "<#C001GENERAL|general>", 5)),
+    ("search for messages about the launch", None),
+    ("send message to general saying hi", None),
+    ("latest messages in #general about the launch", None),
+])
+def test_parse_intent_only_matches_whole_simple_queries(query, intent):
+    assert parse_intent(query) == intent
+
+
+def test_list_channels_follows_pagination(client):
+    result = run_intent(SlackIntent("list_channels"))
+    assert [channel["name"] for channel in result["channels"]] == ["general", "random"]
+    assert result["channels"][0]["topic"] == "Company wide"
+
+
+def test_list_channels_uses_configured_channel_ids(client, monkeypatch):
+    monkeypatch.setenv("SLACK_CHANNEL_IDS", "C002RANDOM")
+    assert [channel["id"] for channel in run_intent(SlackIntent("list_channels"))["channels"]] == ["C002RANDOM"]
+    # Served from the channel directory; conversations_info only for channels missing from it
+    assert ("conversations_info", "C002RANDOM") not in client.calls
+    monkeypatch.setenv("SLACK_CHANNEL_IDS", "C003PRIVATE")
+    with pytest.raises(SlackApiError):
+        run_intent(SlackIntent("list_channels"))
+    assert client.calls[-1] == ("conversations_info", "C003PRIVATE")
+
+
+def test_channels_outside_the_configured_ids_go_to_the_agent(client, monkeypatch):
+    monkeypatch.setenv("SLACK_CHANNEL_IDS", "C002RANDOM")
+    assert try_fast_path("latest messages in #random")["channel"] == "C002RANDOM"
+    calls = len(client.calls)
+    assert try_fast_path("latest messages in #general") is None
+    assert try_fast_path("channel info <#C001GENERAL|general>") is None
+    assert len(client.calls) == calls
+
+
+def test_history_resolves_channel_names_and_caps_the_limit(client):
+    result = run_intent(SlackIntent("channel_history", "#random", 500))
+    assert client.calls[-1] == ("conversations_history", "C002RANDOM", 100)
+    assert result["messages"] == [
+        {"ts": "2.0", "user": "U1", "user_name": "Ada", "text": "hello", "reply_count": 2},
+        {"ts": "1.0", "user": "B1", "text": "deployed"},
+    ]
+
+
+def test_fast_path_routes_are_counted(client):
+    before = dict(SLACK_QUERIES.values())
+    assert try_fast_path("channel info #general")["channel"]["name"] == "general"
+    assert try_fast_path("latest messages in #missing") is None
+    assert try_fast_path("summarise yesterday's discussion") is None
+    after = SLACK_QUERIES.values()
+    for labels in (("fast_path", "channel_info"), ("fallback", "channel_history"), ("llm", "")):
+        assert after[labels] == before.get(labels, 0) + 1
+    assert 0 < slack_fast_path.fast_path_stats()["hit_ratio"] < 1
+
+
+@patch("tools.SlackAgent.SlackMCPTool.Agency")
+def test_tool_answers_simple_queries_without_the_agent(mock_agency, client, monkeypatch):
+    monkeypatch.setenv("SLACK_BOT_TOKEN", "xoxb-test")
+    monkeypatch.setenv("SLACK_TEAM_ID", "T123")
+    monkeypatch.setenv("SLACK_FAST_PATH", "1")
+    result = SlackMCPTool(query="list channels").run()
+    assert result["count"] == 2
+    mock_agency.assert_not_called()
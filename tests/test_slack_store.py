@@ -0,0 +1,145 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import time
+import pytest
+from tools.SlackAgent import SlackMCPTool as SlackMCPTool_module
+from tools.SlackAgent.SlackMCPTool import SlackMCPTool
+from utils import slack_store
+from utils.slack_directory import SlackDirectory
+from utils.slack_store import SlackMessageStore, fts_query
+
+
+def ts(offset: float) -> str:
+    return f"{time.time() - 3600 + offset:.6f}"
+
+
+class FakeSlackClient:
+    def __init__(self):
+        self.calls = []
+        self.history = []
+        self.replies = {}
+
+    def conversations_list(self, **kwargs):
+        return {"channels": [{"id": "C1", "name": "general"}, {"id": "C2", "name": "random"}]}
+
+    def users_list(self, **kwargs):
+        return {"members": [{"id": "U1", "name": "ada", "real_name": "Ada Lovelace"}]}
+
+    def conversations_info(self, channel):
+        return {"channel": {"id": channel, "name": "general"}}
+
+    def conversations_history(self, channel, oldest, limit, cursor=None):
+        self.calls.append(("history", oldest, cursor))
+        messages = sorted((m for m in self.history if m["ts"] > oldest), key=lambda m: m["ts"], reverse=True)
+        # One message per page, to exercise the cursor
+        index = int(cursor or 0)
+        more = index + 1 < len(messages)
+        return {"messages": messages[index:index + 1], "response_metadata": {"next_cursor": str(index + 1) if more else ""}}
+
+    def conversations_replies(self, channel, ts, oldest, limit):
+        self.calls.append(("replies", ts, oldest))
+        parent = next(m for m in self.history if m["ts"] == ts)
+        return {"messages": [parent] + [m for m in self.replies.get(ts, []) if m["ts"] > oldest]}
+
+    def post(self, text, offset, thread_ts=None):
+        message = {"ts": ts(offset), "user": "U1", "text": text}
+        if thread_ts:
+            message["thread_ts"] = thread_ts
+            self.replies.setdefault(thread_ts, []).append(message)
+            parent = next(m for m in self.history if m["ts"] == thread_ts)
+            parent.update(thread_ts=thread_ts, reply_count=len(self.replies[thread_ts]), latest_reply=message["ts"])
+        else:
+            self.history.append(message)
+        return message["ts"]
+
+
+@pytest.fixture
+def client(monkeypatch):
+    fake = FakeSlackClient()
+    directory = SlackDirectory(client=fake)
+    monkeypatch.setattr(slack_store, "SLACK_DIRECTORY", directory)
+    monkeypatch.setattr(SlackMCPTool_module, "SLACK_DIRECTORY", directory)
+    return fake
+
+
+@pytest.fixture
+def store():
+    return SlackMessageStore(path=":memory:")
+
+
+def test_fts_query_quotes_words():
+    assert fts_query('deploy "prod" OR NEAR(x)') == '"deploy" "prod" "OR" "NEAR" "x"'
+
+
+def test_sync_is_incremental_and_picks_up_new_thread_replies(store, client):
+    parent = client.post("Release checklist for the launch", 1)
+    client.post("Lunch at noon?", 2)
+    client.post("First item: migrate the database", 3, thread_ts=parent)
+
+    first = store.sync("C1", client=client)
+    assert (first["mode"], first["messages_fetched"], first["replies_fetched"]) == ("backfill", 2, 1)
+
+    client.calls.clear()
+    client.post("Second item: update the launch notes", 4, thread_ts=parent)
+    client.post("Launch moved to Friday", 5)
+    second = store.sync("C1", client=client)
+    assert (second["mode"], second["messages_fetched"], second["replies_fetched"]) == ("incremental", 1, 1)
+    # Only messages newer than the stored ones are requested
+    history_oldest = {oldest for kind, oldest, _ in client.calls if kind == "history"}
+    assert history_oldest == {client.history[1]["ts"]}
+
+    thread = store.read("C1", thread_ts=parent)
+    assert [message["text"] for message in thread] == [
+        "Release checklist for the launch", "First item: migrate the database", "Second item: update the launch notes",
+    ]
+    assert thread[0]["reply_count"] == 2
+    assert [message["text"] for message in store.read("C1", limit=2)] == ["Launch moved to Friday", "Lunch at noon?"]
+
+
+def test_search_ranks_matches_and_filters_channels(store, client):
+    client.post("The launch is on Friday", 1)
+    client.post("Launch review: launch checklist and launch notes", 2)
+    client.post("Nothing to see here", 3)
+    store.sync("C1", client=client)
+
+    results = store.search("launch")
+    assert [result["text"] for result in results] == ["Launch review: launch checklist and launch notes", "The launch is on Friday"]
+    assert "*Launch*" in results[0]["snippet"]
+    assert store.search("launch friday")[0]["text"] == "The launch is on Friday"
+    assert store.search("launch", channel_ids=["C2"]) == []
+    assert store.search("!!!") == []
+
+
+def test_freshness_and_channel_resolution(store, client):
+    client.post("hello", 1)
+    store.sync("C1", client=client)
+    assert store.resolve_channel("#General") == "C1"
+    assert store.resolve_channel("C1") == "C1"
+    assert store.resolve_channel("random") is None
+    freshness = store.freshness(["C1", "C2"])
+    assert freshness["C1"]["channel_name"] == "general"
+    assert freshness["C1"]["staleness_seconds"] < 5
+    assert freshness["C2"]["synced_at"] is None
+
+
+def test_tool_reads_and_searches_the_store(store, client, monkeypatch):
+    monkeypatch.setenv("SLACK_BOT_TOKEN", "xoxb-test")
+    monkeypatch.setenv("SLACK_TEAM_ID", "T123")
+    client.post("Incident postmortem is published", 1)
+    store.sync("C1", client=client)
+    monkeypatch.setattr(SlackMCPTool_module, "SLACK_STORE", store)
+    monkeypatch.setattr(slack_store, "get_slack_client", lambda: client)
+    monkeypatch.setenv("SLACK_CHANNEL_IDS", "C1")
+
+    result = SlackMCPTool(action="search", query="postmortem").run()
+    assert [message["text"] for message in result["messages"]] == ["Incident postmortem is published"]
+    assert result["freshness"]["C1"]["synced_at"] is not None
+
+    result = SlackMCPTool(action="read", channel="#general", limit=5).run()
+    assert result["channel"] == "C1" and len(result["messages"]) == 1
+    assert result["messages"][0]["user_name"] == "Ada Lovelace"
+
+    assert "error" in SlackMCPTool(action="read", channel="#random").run()
+    with pytest.raises(ValueError):
+        SlackMCPTool(action="read")
@@ -2,8 +2,10 @@ import sys
 import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 import pytest
+from tools.SlackAgent import SlackMCPTool as SlackMCPTool_module
 from tools.SlackAgent.SlackMCPTool import SlackMCPTool
 from unittest.mock import patch, MagicMock
+from utils.slack_directory import SlackDirectory
 
 # Example: SlackMCPTool may have actions like send_message, get_channel_info, etc.
 # Adjust the test cases below to match the actual interface of SlackMCPTool.
@@ -12,15 +14,59 @@ def test_slackmcptool_instantiation():
     tool = SlackMCPTool(query="list channels")
     assert tool.query == "list channels"
 
+def completion(result):
+    """Stands in for Thread.get_completion, a generator returning the final answer."""
+    def get_completion(**kwargs):
+        return result
+        yield
+    return get_completion
+
+@pytest.fixture(autouse=True)
+def no_cached_agencies(monkeypatch):
+    monkeypatch.setattr(SlackMCPTool_module, "_agencies", {})
+    monkeypatch.setenv("SLACK_BOT_TOKEN", "xoxb-test")
+    monkeypatch.setenv("SLACK_TEAM_ID", "T123")
+    directory_client = MagicMock(**{
+        "conversations_list.return_value": {"channels": [{"id": "C001GENERAL", "name": "general"}]},
+        "users_list.return_value": {"members": [{"id": "U001", "name": "ada", "real_name": "Ada Lovelace"}]},
+    })
+    monkeypatch.setattr(SlackMCPTool_module, "SLACK_DIRECTORY", SlackDirectory(client=directory_client))
+    # These tests cover the agent path; the Web API fast path is tested in test_slack_fast_path
+    monkeypatch.setenv("SLACK_FAST_PATH", "0")
+
+@patch("tools.SlackAgent.SlackMCPTool.Thread")
 @patch("tools.SlackAgent.SlackMCPTool.MCPServerStdio")
 @patch("tools.SlackAgent.SlackMCPTool.Agent")
 @patch("tools.SlackAgent.SlackMCPTool.Agency")
-def test_slackmcptool_run_list_channels(mock_agency, mock_agent, mock_mcp):
-    mock_agency_instance = MagicMock()
-    mock_agency.return_value = mock_agency_instance
-    mock_agency_instance.get_completion.return_value = {"result": "channels listed"}
+def test_slackmcptool_run_list_channels(mock_agency, mock_agent, mock_mcp, mock_thread):
+    mock_thread.return_value.get_completion.side_effect = completion({"result": "channels listed"})
     tool = SlackMCPTool(query="list channels")
     result = tool.run()
     assert "channels" in str(result)
 
+@patch("tools.SlackAgent.SlackMCPTool.Thread")
+@patch("tools.SlackAgent.SlackMCPTool.Agent")
+@patch("tools.SlackAgent.SlackMCPTool.Agency")
+def test_slackmcptool_reuses_the_agency_with_a_thread_per_call(mock_agency, mock_agent, mock_thread):
+    mock_thread.return_value.get_completion.side_effect = completion("done")
+    assert SlackMCPTool(query="list channels").run() == "done"
+    assert SlackMCPTool(query="search for launch").run() == "done"
+    assert mock_agency.call_count == 1
+    assert mock_thread.call_count == 2
+    agency = mock_agency.return_value
+    mock_thread.assert_called_with(agency.user, agency.ceo)
+    # The agent is told the known channel and user ids instead of having to list them
+    instructions = mock_thread.return_value.get_completion.call_args.kwargs["additional_instructions"]
+    assert "#general: C001GENERAL" in instructions and "@ada / Ada Lovelace: U001" in instructions
+
+@patch("tools.SlackAgent.SlackMCPTool.Thread")
+@patch("tools.SlackAgent.SlackMCPTool.Agent")
+@patch("tools.SlackAgent.SlackMCPTool.Agency")
+def test_slackmcptool_builds_one_agency_per_configuration(mock_agency, mock_agent, mock_thread, monkeypatch):
+    mock_thread.return_value.get_completion.side_effect = completion("done")
+    SlackMCPTool(query="list channels").run()
+    monkeypatch.setenv("SLACK_CHANNEL_IDS", "C1,C2")
+    SlackMCPTool(query="list channels").run()
+    assert mock_agency.call_count == 2
+
 # Add more tests for other actions as needed, following the above pattern. 
\ No newline at end of file
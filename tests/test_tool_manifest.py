@@ -0,0 +1,74 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import json
+import pytest
+from unittest.mock import patch
+from agency_swarm.tools import ToolFactory
+from utils.tool_manifest import load_tool_manifest, get_openapi_schema
+
+TOOL_SOURCE = '''
+from agency_swarm.tools import BaseTool
+from pydantic import Field
+
+
+class EchoTool(BaseTool):
+    """Echo the given text."""
+    text: str = Field(..., description="Text to echo")
+
+    def run(self):
+        return "{prefix}" + self.text
+'''
+
+
+@pytest.fixture
+def tools_folder(tmp_path, monkeypatch):
+    # ToolFactory.from_file imports tools by their path relative to the working directory
+    monkeypatch.chdir(tmp_path)
+    folder = tmp_path / "manifest_tools" / "Demo"
+    folder.mkdir(parents=True)
+    (folder / "EchoTool.py").write_text(TOOL_SOURCE.format(prefix="echo: "))
+    yield "./manifest_tools"
+    for name in [name for name in sys.modules if name.startswith("manifest_tools")]:
+        del sys.modules[name]
+
+
+def test_manifest_is_reused_without_importing_tools(tools_folder):
+    tools, stats = load_tool_manifest(tools_folder, "manifest.json")
+    assert stats["rebuilt"] == 1
+    assert [tool.__name__ for tool in tools["Demo"]] == ["EchoTool"]
+
+    with patch.object(ToolFactory, "from_file", side_effect=AssertionError("tool was imported")):
+        tools, stats = load_tool_manifest(tools_folder, "manifest.json")
+    assert stats == {"tools": 1, "cached": 1, "rebuilt": 0, "elapsed_ms": stats["elapsed_ms"]}
+    assert not tools["Demo"][0].loaded
+
+    # A touched but unchanged file is recognised by its hash
+    path = os.path.join(tools_folder, "Demo", "EchoTool.py")
+    os.utime(path, ns=(0, 0))
+    with patch.object(ToolFactory, "from_file", side_effect=AssertionError("tool was imported")):
+        _, stats = load_tool_manifest(tools_folder, "manifest.json")
+    assert stats["cached"] == 1
+    assert json.load(open("manifest.json"))["tools"][path]["mtime_ns"] == 0
+
+
+def test_changed_tool_file_is_rebuilt(tools_folder):
+    load_tool_manifest(tools_folder, "manifest.json")
+    path = os.path.join(tools_folder, "Demo", "EchoTool.py")
+    with open(path, "a") as f:
+        f.write("\n# changed\n")
+    _, stats = load_tool_manifest(tools_folder, "manifest.json")
+    assert stats["rebuilt"] == 1
+
+
+def test_lazy_tool_imports_on_first_call(tools_folder):
+    tools, _ = load_tool_manifest(tools_folder, "manifest.json")
+    echo = tools["Demo"][0]
+    assert echo(text="hi").run() == "echo: hi"
+    assert echo.loaded
+
+
+def test_openapi_schema_matches_agency_swarm(tools_folder):
+    tools, _ = load_tool_manifest(tools_folder, "manifest.json")
+    expected = ToolFactory.get_openapi_schema([tools["Demo"][0].load()], "https://example.com")
+    assert get_openapi_schema(tools["Demo"], "https://example.com") == expected
@@ -0,0 +1,125 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import asyncio
+import json
+import time
+import pytest
+from unittest.mock import patch, MagicMock, AsyncMock
+from pydantic import BaseModel
+from starlette.testclient import TestClient
+import asgi
+from utils import async_block_fetcher, page_blocks_cleanup
+from utils.tracing import current_span, prune_traces, save_trace, span, start_trace
+
+# page -> [a (children), b], a -> [a1 (children)], a1 -> [a1x]
+TREE = {
+    "page": [{"id": "a", "has_children": True}, {"id": "b", "has_children": False}],
+    "a": [{"id": "a1", "has_children": True}],
+    "a1": [{"id": "a1x", "has_children": False}],
+}
+
+
+def _children(block_id, start_cursor=None, page_size=100):
+    return {"results": TREE.get(block_id, []), "has_more": False}
+
+
+@pytest.fixture
+def fake_notion():
+    async_notion = MagicMock()
+    async_notion.blocks.children.list = AsyncMock(side_effect=_children)
+    sync_notion = MagicMock()
+    sync_notion.blocks.children.list.side_effect = _children
+    with patch.object(async_block_fetcher, "notion", async_notion), \
+            patch.object(page_blocks_cleanup, "notion", sync_notion), \
+            patch.object(page_blocks_cleanup, "BLOCK_CACHE", None):
+        yield
+
+
+def _parent_blocks(trace, name):
+    """block_id of each span called name -> block_id of its parent span."""
+    by_id = {s.span_id: s for s in trace.spans}
+    return {s.args["block_id"]: by_id[s.parent_id].args.get("block_id") for s in trace.spans if s.name == name}
+
+
+def test_spans_are_noops_without_a_trace():
+    with span("outside") as outside:
+        outside.set(x=1)
+        assert current_span() is outside
+
+
+def test_async_walker_spans_mirror_the_block_tree(fake_notion):
+    async def walk():
+        with start_trace("walk") as trace:
+            await async_block_fetcher.aget_blocks_full("page", depth=10)
+        return trace
+
+    trace = asyncio.run(walk())
+    assert _parent_blocks(trace, "list_children") == {"page": None, "a": "page", "a1": "a"}
+
+
+def test_sync_walker_spans_nest_per_subtree(fake_notion):
+    with start_trace("walk") as trace:
+        page_blocks_cleanup.get_blocks_recursive_full("page", depth=10)
+    assert _parent_blocks(trace, "subtree") == {"page": None, "a": "page", "a1": "a"}
+
+
+def test_chrome_trace_lanes_never_overlap(fake_notion):
+    async def walk():
+        with start_trace("walk") as trace:
+            await async_block_fetcher.aget_blocks_full("page", depth=10)
+        return trace
+
+    events = [event for event in asyncio.run(walk()).to_chrome_trace()["traceEvents"] if event["ph"] == "X"]
+    assert len(events) == 4  # root + 3 listings
+    by_lane = {}
+    for event in events:
+        by_lane.setdefault(event["tid"], []).append((event["ts"], event["ts"] + event["dur"]))
+    for intervals in by_lane.values():
+        intervals.sort()
+        open_ends = []
+        for start, end in intervals:
+            open_ends = [open_end for open_end in open_ends if open_end > start]
+            # Spans on one lane either follow each other or nest
+            assert all(end <= open_end for open_end in open_ends)
+            open_ends.append(end)
+
+
+class TracedTool(BaseModel):
+    action: str = "walk"
+
+    async def arun(self) -> str:
+        with span("work", step=1):
+            await asyncio.sleep(0)
+        return "done"
+
+
+def test_traced_request_saves_and_serves_the_trace(monkeypatch, tmp_path):
+    monkeypatch.setenv("TRACE_DIR", str(tmp_path))
+    monkeypatch.setattr(asgi, "db_token", "secret")
+    auth = {"Authorization": "Bearer secret"}
+    app = asgi.create_app(workers=1, max_concurrency=2, max_queue=2, tool_classes=[TracedTool])
+    with TestClient(app) as client:
+        assert "X-Trace-Id" not in client.post("/TracedTool", json={}, headers=auth).headers
+        response = client.post("/TracedTool", json={"action": "walk"}, headers=dict(auth, **{"X-Trace": "1"}))
+        trace_id = response.headers["X-Trace-Id"]
+        assert "X-Trace-File" not in response.headers
+        assert os.path.exists(tmp_path / f"{trace_id}.json")
+        trace = client.get(f"/traces/{trace_id}", headers=auth).json()
+        assert client.get("/traces/../../etc", headers=auth).status_code == 404
+    names = [event["name"] for event in trace["traceEvents"] if event["ph"] == "X"]
+    assert names == ["TracedTool walk", "work"]
+
+
+def test_saved_traces_are_capped_by_count_and_age(monkeypatch, tmp_path):
+    monkeypatch.setenv("TRACE_MAX_FILES", "3")
+    trace_ids = []
+    for index in range(5):
+        with start_trace(f"call {index}") as trace:
+            pass
+        path = save_trace(trace, str(tmp_path))
+        os.utime(path, (time.time() - 100 + index, time.time() - 100 + index))
+        trace_ids.append(trace.trace_id)
+    assert sorted(os.listdir(tmp_path)) == sorted(f"{trace_id}.json" for trace_id in trace_ids[2:])
+    assert prune_traces(str(tmp_path), max_files=10, ttl=50) == 3
+    assert os.listdir(tmp_path) == []
@@ -1,22 +1,31 @@
+import asyncio
 import json
 import os
 import sys
 from dotenv import load_dotenv
-from notion_client import Client
 from agency_swarm.tools import BaseTool
-from pydantic import Field, model_validator
-from typing import Any, Dict, Optional
+from pydantic import Field, PrivateAttr, model_validator
+from typing import Any, AsyncIterator, ClassVar, Dict, Optional
 
 # Add parent directory to path for utils imports
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
-from utils.page_blocks_cleanup import get_blocks_recursive_full
+from utils.async_block_fetcher import aget_blocks_full, aiter_blocks_full
+from utils.async_runner import run_sync
+from utils.database_scan import afetch_all_pages
 from utils.db_response_cleanup import clean_notion_database_response, clean_notion_search_response
-from utils.helpers import limit_response_length
+from utils.helpers import limit_response_length, get_stored_page
+from utils.jobs import report_progress
+from utils.notion_api import get_async_notion_client
+from utils.notion_filters import UnsupportedFilterError
+from utils.notion_mirror import clean_local_query, local_query_version
+from utils.result_store import RESULT_STORE
+from utils.single_flight import SingleFlight
+from utils.search_index import SEARCH_INDEX, fuse_search_results
 
 load_dotenv()
 
-NOTION_CLIENT = Client(auth=os.getenv("NOTION_API_KEY"))
+NOTION_CLIENT = get_async_notion_client()
 
 
 class NotionReadTool(BaseTool):
@@ -25,6 +34,9 @@ class NotionReadTool(BaseTool):
     retrieve_block_children, and query_database. Each action has specific required parameters
     that are validated automatically.
     """
+    # Never modifies Notion, so identical concurrent calls can share one execution
+    read_only: ClassVar[bool] = True
+
     action: str = Field(
         ..., 
         description="The read action to perform",
@@ -44,10 +56,20 @@ class NotionReadTool(BaseTool):
     page_size: Optional[int] = Field(50, description="Number of items per page (default: 50)")
     start_cursor: Optional[str] = Field(None, description="Pagination cursor for continuing from previous query")
     page_number: Optional[int] = Field(1, description="Page number for paginated output (default: 1)")
+    result_handle: Optional[str] = Field(None, description="result_handle returned with page 1 of a multi-page output. Pass it together with page_number to read the next pages without re-running the query")
     
     # Database query parameters
     filter: Optional[Dict[str, Any]] = Field(None, description="Filter object for database queries")
     sorts: Optional[list] = Field(None, description="Sort criteria for database queries")
+    fetch_all: Optional[bool] = Field(False, description="query_database with source='remote' only: return every matching row in one result (with total_count) instead of one page. Ignores page_size and start_cursor; much faster than following next_cursor for large databases")
+    source: Optional[str] = Field(
+        "remote",
+        description="Where search and query_database read from: 'remote' queries Notion; 'local' answers from the synced local mirror (query_database) or the local full-text index over titles, properties and page content (search) in milliseconds; 'hybrid' (search only) merges local and Notion search results into one ranked page",
+        enum=["remote", "local", "hybrid"]
+    )
+
+    # Object fetched by afreshness_token(), reused by the action so it is not requested twice
+    _prefetched: Optional[dict] = PrivateAttr(default=None)
 
     @model_validator(mode='after')
     def validate_action_parameters(self):
@@ -77,6 +99,17 @@ class NotionReadTool(BaseTool):
         return self
 
     def run(self) -> str:
+        """Blocking entry point for the Flask endpoint and agents; runs arun() to completion."""
+        return run_sync(self.arun())
+
+    async def arun(self) -> str:
+        """Perform the action without blocking the event loop; every Notion call goes through the asyncio client."""
+        if self.result_handle:
+            # Later pages of a stored result need no Notion calls; fall through if the handle expired
+            # or was issued for a different call, so a stale handle never answers with another query's output
+            stored_page = get_stored_page(self.result_handle, page_number=self.page_number, owner=self._result_owner())
+            if stored_page is not None:
+                return stored_page
         dispatch = {
             "search": self._search,
             "retrieve_full_page": self._retrieve_full_page,
@@ -84,44 +117,147 @@ class NotionReadTool(BaseTool):
             "retrieve_block_children": self._retrieve_block_children,
             "query_database": self._query_database,
         }
-        return dispatch[self.action]()
+        return await dispatch[self.action]()
+
+    async def astream(self) -> AsyncIterator[dict]:
+        """
+        Records for a streamed (NDJSON) response. retrieve_full_page and retrieve_block_children
+        yield {"type": "page"} first (full page only), then one {"type": "block", "parent_id"} record
+        per block as soon as its parent has been listed, and a final {"type": "end"} record; the tree
+        is rebuilt from parent_id. Other actions yield their usual output as one {"type": "response"} record.
+        """
+        if self.action not in ("retrieve_full_page", "retrieve_block_children") or self.result_handle:
+            yield {"type": "response", "response": await self.arun()}
+            return
+
+        root_id, version = self.block_id, None
+        if self.action == "retrieve_full_page":
+            page_data = self._prefetched or await NOTION_CLIENT.pages.retrieve(page_id=self.page_id)
+            root_id, version = self.page_id, page_data.get("last_edited_time")
+            yield {"type": "page", "page": page_data}
+
+        block_count = 0
+        async for parent_id, block in aiter_blocks_full(root_id, depth=self.depth, version=version):
+            if "error" in block:
+                yield {"type": "error", "parent_id": parent_id, "error": block["error"]}
+            else:
+                block_count += 1
+                yield {"type": "block", "parent_id": parent_id, "block": block}
+        yield {"type": "end", "blocks": block_count}
+
+    def freshness_token(self) -> Optional[str]:
+        """Blocking wrapper around afreshness_token()."""
+        return run_sync(self.afreshness_token())
+
+    async def afreshness_token(self) -> Optional[str]:
+        """
+        Cheap version marker of this call's result, used to build HTTP validators: the same token
+        means the same underlying Notion data. Only actions where one lightweight lookup covers
+        every change have a token (a page's last_edited_time changes with any edit to its content);
+        returns None otherwise.
+        """
+        if self.result_handle and RESULT_STORE.get(self.result_handle, owner=self._result_owner()) is not None:
+            # Stored results never change
+            return f"handle:{self.result_handle}"
+        if self.action == "retrieve_full_page":
+            self._prefetched = await NOTION_CLIENT.pages.retrieve(page_id=self.page_id)
+            return f"page:{self._prefetched.get('last_edited_time')}"
+        if self.action == "retrieve_block":
+            self._prefetched = await NOTION_CLIENT.blocks.retrieve(block_id=self.block_id)
+            return f"block:{self._prefetched.get('last_edited_time')}"
+        if self.action == "query_database" and self.source == "local":
+            synced_at = local_query_version(self.database_id)
+            return f"mirror:{synced_at}" if synced_at else None
+        return None
+
+    def _result_owner(self) -> str:
+        """The call a stored result belongs to: tool name and canonical arguments, minus the paging ones."""
+        return SingleFlight.key(type(self).__name__, self.model_dump(exclude={"result_handle", "page_number"}))
+
+    def _paged(self, response: str) -> str:
+        return limit_response_length(response, page_number=self.page_number, owner=self._result_owner())
 
-    def _search(self) -> str:
+    async def _search(self) -> str:
+        if self.source in ("local", "hybrid") and len(SEARCH_INDEX) == 0:
+            # The index has not been built yet (background refresh disabled or still running)
+            print("Local search index is empty, searching Notion instead")
+        elif self.source == "local":
+            result = SEARCH_INDEX.search(self.query, page_size=self.page_size, start_cursor=self.start_cursor, object_type=self._search_object_type())
+            return self._paged(json.dumps(clean_notion_search_response(result), indent=2))
+        elif self.source == "hybrid":
+            local_result = SEARCH_INDEX.search(self.query, page_size=self.page_size, object_type=self._search_object_type())
+            remote_result = await NOTION_CLIENT.search(**self._search_params())
+            fused = fuse_search_results(local_result["results"], remote_result.get("results", []), limit=self.page_size)
+            result = {"results": fused, "has_more": False, "next_cursor": None, "request_id": remote_result.get("request_id")}
+            return self._paged(json.dumps(clean_notion_search_response(result), indent=2))
+
+        result = await NOTION_CLIENT.search(**self._search_params())
+        # Clean the search response using the new cleanup function
+        cleaned_result = clean_notion_search_response(result)
+        return self._paged(json.dumps(cleaned_result, indent=2))
+
+    def _search_params(self) -> dict:
         search_params = {"query": self.query}
         if self.filter:
             search_params["filter"] = self.filter
         if self.page_size:
             search_params["page_size"] = self.page_size
-        if self.start_cursor:
+        if self.start_cursor and self.source == "remote":
             search_params["start_cursor"] = self.start_cursor
-        
-        result = NOTION_CLIENT.search(**search_params)
-        # Clean the search response using the new cleanup function
-        cleaned_result = clean_notion_search_response(result)
-        return limit_response_length(json.dumps(cleaned_result, indent=2), page_number=self.page_number)
+        return search_params
 
+    def _search_object_type(self) -> Optional[str]:
+        # Notion search only filters on the object type: {"property": "object", "value": "page"}
+        if self.filter and self.filter.get("property") == "object":
+            return self.filter.get("value")
+        return None
 
-    def _retrieve_full_page(self) -> str:
+    async def _retrieve_full_page(self) -> str:
         # Retrieve full page data
-        page_data = NOTION_CLIENT.pages.retrieve(page_id=self.page_id)
-        # Use shared full block extraction
-        blocks = get_blocks_recursive_full(self.page_id, depth=self.depth)
+        page_data = self._prefetched or await NOTION_CLIENT.pages.retrieve(page_id=self.page_id)
+        # Use shared full block extraction; the page version lets unchanged subtrees come from the block cache
+        blocks = await aget_blocks_full(self.page_id, depth=self.depth, version=page_data.get("last_edited_time"))
         result = {
             "page": page_data,
             "blocks": blocks
         }
-        return limit_response_length(json.dumps(result, indent=2), page_number=self.page_number)
+        return self._paged(json.dumps(result, indent=2))
 
-    def _retrieve_block(self) -> str:
-        result = NOTION_CLIENT.blocks.retrieve(block_id=self.block_id)
-        return limit_response_length(json.dumps(result, indent=2), page_number=self.page_number)
+    async def _retrieve_block(self) -> str:
+        result = self._prefetched or await NOTION_CLIENT.blocks.retrieve(block_id=self.block_id)
+        return self._paged(json.dumps(result, indent=2))
 
-    def _retrieve_block_children(self) -> str:
+    async def _retrieve_block_children(self) -> str:
         # Use shared clean block extraction for children
-        result = get_blocks_recursive_full(self.block_id, depth=self.depth)
-        return limit_response_length(json.dumps(result, indent=2), page_number=self.page_number)
+        result = await aget_blocks_full(self.block_id, depth=self.depth)
+        return self._paged(json.dumps(result, indent=2))
+
+    async def _query_database(self) -> str:
+        if self.source == "local":
+            try:
+                # The mirror may need to sync with Notion first, which blocks, so keep it off the event loop
+                result = await asyncio.to_thread(
+                    clean_local_query,
+                    self.database_id,
+                    notion_filter=self.filter,
+                    sorts=self.sorts,
+                    page_size=self.page_size,
+                    start_cursor=self.start_cursor,
+                )
+                return self._paged(json.dumps(result, indent=2))
+            except UnsupportedFilterError as e:
+                # Filters the mirror cannot evaluate are answered by Notion instead
+                print(f"Local query fallback to Notion: {e}")
+                if self.start_cursor and self.start_cursor.isdigit():
+                    # Local cursors are offsets into the mirror's result and mean nothing to Notion
+                    raise ValueError(f"start_cursor '{self.start_cursor}' is a local cursor, but this query is answered by Notion; repeat it without start_cursor")
+
+        if self.fetch_all:
+            scan = await afetch_all_pages(self.database_id, notion_filter=self.filter, sorts=self.sorts)
+            cleaned_results = clean_notion_database_response(scan["results"], self.database_id)
+            result = {"items": cleaned_results, "items_length": len(cleaned_results), "total_count": scan["total_count"], "has_more": False, "next_cursor": None}
+            return self._paged(json.dumps(result, indent=2))
 
-    def _query_database(self) -> str:
         # Prepare query parameters
         query_params = {
             "page_size": self.page_size,
@@ -137,8 +273,9 @@ class NotionReadTool(BaseTool):
             query_params["start_cursor"] = self.start_cursor
 
         # Query database once
-        raw_page = NOTION_CLIENT.databases.query(database_id=self.database_id, **query_params)
+        raw_page = await NOTION_CLIENT.databases.query(database_id=self.database_id, **query_params)
         results = raw_page.get("results", [])
+        report_progress(pages=len(results))
         
         # Use the new general cleanup function
         cleaned_results = clean_notion_database_response(results, self.database_id)
@@ -148,7 +285,7 @@ class NotionReadTool(BaseTool):
         
         # Return items plus pagination metadata
         result = {"items": cleaned_results, "items_length": len(cleaned_results), "has_more": has_more, "next_cursor": next_cursor}
-        return limit_response_length(json.dumps(result, indent=2), page_number=self.page_number)
+        return self._paged(json.dumps(result, indent=2))
 
 if __name__ == "__main__":
     # Inline tests for NotionReadTool - replace IDs with real ones before running
@@ -4,18 +4,18 @@ import sys
 from datetime import datetime
 from typing import Any, Dict, Optional, List
 from dotenv import load_dotenv
-from notion_client import Client
 from agency_swarm.tools import BaseTool
 from pydantic import Field, model_validator
 
 # Add parent directory to path for utils imports
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
 
+from utils.notion_api import get_notion_client
 from utils.page_blocks_cleanup import get_blocks_recursive_full
 
 load_dotenv()
 
-NOTION_CLIENT = Client(auth=os.getenv("NOTION_API_KEY"))
+NOTION_CLIENT = get_notion_client()
 
 
 class NotionUpdateTool(BaseTool):
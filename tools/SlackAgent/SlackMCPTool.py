@@ -1,15 +1,126 @@
 import os
+import threading
 from dotenv import load_dotenv
-from typing import Any
+import time
+from typing import Any, Dict, Optional, Tuple
 from agency_swarm.tools.mcp import MCPServerStdio
 from agency_swarm.tools import BaseTool
-from pydantic import Field
+from pydantic import Field, model_validator
 from agency_swarm import Agent
 from agency_swarm.agency import Agency
+from agency_swarm.threads import Thread
+
+from utils.mcp_pool import MCPServerPool, get_mcp_pool
+from utils.slack_directory import SLACK_DIRECTORY
+from utils.slack_fast_path import fast_path_enabled, try_fast_path
+from utils.slack_api import configured_channel_ids
+from utils.slack_store import SLACK_STORE
 
 load_dotenv()
 
 
+def slack_server_env() -> dict:
+    """Environment for the Slack MCP server; SLACK_CHANNEL_IDS is only passed when set."""
+    env_vars = {
+        "SLACK_BOT_TOKEN": os.getenv("SLACK_BOT_TOKEN"),
+        "SLACK_TEAM_ID": os.getenv("SLACK_TEAM_ID"),
+    }
+    slack_channel_ids = os.getenv("SLACK_CHANNEL_IDS", "")
+    if slack_channel_ids:
+        env_vars["SLACK_CHANNEL_IDS"] = slack_channel_ids
+    return env_vars
+
+
+def slack_mcp_pool(env_vars: dict) -> MCPServerPool:
+    """The shared pool of `npx @modelcontextprotocol/server-slack` processes for this environment."""
+    return get_mcp_pool("slack", env_vars, lambda: MCPServerStdio(
+        name="slack",
+        params={
+            "env": env_vars,
+            "command": "npx",
+            "args": ["-y", "@modelcontextprotocol/server-slack"],
+        },
+        cache_tools_list=True
+    ))
+
+
+def _new_slack_agency(env_vars: dict) -> Agency:
+    # Agent that handles Slack queries through the pooled Slack MCP server
+    class _SlackAgent(Agent):
+        def __init__(self):
+            super().__init__(
+                name="SlackAgent",
+                description="Agent for Slack MCP queries, shared by every SlackMCPTool call.",
+                instructions="""You are a Slack interface agent. Use the available Slack MCP tools to:
+
+1. If asked to list channels or operations, use the appropriate MCP tools to discover them
+2. If asked to send messages, use the messaging tools
+3. If asked to search or read, use the search/read tools
+4. Always provide clear, structured responses
+5. If channel IDs are needed but not known, first list channels to find the right ones
+6. Handle errors gracefully and suggest alternatives
+
+Available operations you can perform:
+- List channels and get their IDs
+- Send messages to channels
+- Read messages from channels
+- Search for messages
+- Get channel information
+- List all available Slack MCP tools
+
+Respond in a clear, structured format showing what was found or accomplished.""",
+                mcp_servers=[slack_mcp_pool(env_vars).server()],
+                temperature=0.3,
+                max_prompt_tokens=25000,
+                model="gpt-4o-mini"
+            )
+
+        def response_validator(self, message):
+            return message
+
+    return Agency([_SlackAgent()])
+
+
+_agencies: Dict[Tuple, Agency] = {}
+_agencies_lock = threading.Lock()
+
+
+def get_slack_agency(env_vars: dict) -> Agency:
+    """
+    The Slack agent and its one-agent Agency for this token / team / channel configuration, built
+    once per process: assistant sync and MCP tool discovery are paid by the first call only.
+    """
+    key = tuple(sorted(env_vars.items()))
+    with _agencies_lock:
+        agency = _agencies.get(key)
+        if agency is None:
+            agency = _agencies[key] = _new_slack_agency(env_vars)
+        return agency
+
+
+def get_completion(agency: Agency, message: str) -> str:
+    """
+    Agency.get_completion on a new conversation thread rather than the agency's main thread, so
+    callers sharing the cached agency never see (or race on) each other's messages. The known
+    channels and users are passed along so the agent can skip listing them to find an id.
+    """
+    thread = Thread(agency.user, agency.ceo)
+    chain_id = agency.tracking_manager.start_chain(message, "Agency: chain start")
+    try:
+        messages = thread.get_completion(
+            message=message, yield_messages=False, parent_run_id=chain_id, additional_instructions=SLACK_DIRECTORY.prompt_summary() or None
+        )
+        while True:
+            try:
+                next(messages)
+            except StopIteration as e:
+                agency.tracking_manager.end_chain(e.value, chain_id)
+                return e.value
+    except Exception as e:
+        agency.tracking_manager.track_chain_error(e, chain_id)
+        raise
+
+
 # This is a workaround for enabling the use of MCP tools in agencii.ai
 # TODO: Refactor this once MCP integration in agencii.ai is complete
 class SlackMCPTool(BaseTool):
@@ -25,15 +136,34 @@ class SlackMCPTool(BaseTool):
     - List available Slack operations/tools
     
     If SLACK_CHANNEL_IDS is not set, the tool will first attempt to discover channels.
+
+    action='search' and action='read' answer from the local copy of the SLACK_CHANNEL_IDS
+    channels in milliseconds, with when each channel was last synced.
     """
-    query: str = Field(..., description="The query for retrieving information from Slack (the agent will decide how to handle it). Examples: 'list channels', 'list available operations', 'send message to general', 'search for messages about project'")
+    action: Optional[str] = Field(
+        "query",
+        description="'query' (default) lets the Slack agent handle the query. 'search' (full-text search of messages) and 'read' (latest messages of a channel, or one thread) answer from the local copy of the configured channels in milliseconds, with freshness metadata",
+        enum=["query", "search", "read"]
+    )
+    query: Optional[str] = Field(None, description="The query for retrieving information from Slack (required for query and search; for query the agent will decide how to handle it). Examples: 'list channels', 'list available operations', 'send message to general', 'search for messages about project'")
+    channel: Optional[str] = Field(None, description="Channel ID or name (required for read; narrows search to one channel)")
+    thread_ts: Optional[str] = Field(None, description="read only: ts of a thread's parent message, to read that thread")
+    limit: Optional[int] = Field(20, description="Maximum number of messages returned by search and read (default: 20)")
+
+    @model_validator(mode='after')
+    def validate_action_parameters(self):
+        """Validate that required parameters are provided for each action"""
+        if self.action in ("query", "search") and not self.query:
+            raise ValueError(f"query is required for {self.action} action")
+        if self.action == "read" and not self.channel:
+            raise ValueError("channel is required for read action")
+        return self
 
     def run(self) -> Any:
         try:
             # Check for required environment variables
             slack_bot_token = os.getenv("SLACK_BOT_TOKEN")
             slack_team_id = os.getenv("SLACK_TEAM_ID")
-            slack_channel_ids = os.getenv("SLACK_CHANNEL_IDS", "")  # Default to empty string
             
             if not slack_bot_token:
                 return {"error": "SLACK_BOT_TOKEN environment variable is required but not set"}
@@ -41,66 +171,18 @@ class SlackMCPTool(BaseTool):
             if not slack_team_id:
                 return {"error": "SLACK_TEAM_ID environment variable is required but not set"}
             
-            # Setup MCPServer for Slack with fallback for missing SLACK_CHANNEL_IDS
-            env_vars = {
-                "SLACK_BOT_TOKEN": slack_bot_token,
-                "SLACK_TEAM_ID": slack_team_id,
-            }
-            
-            # Only add SLACK_CHANNEL_IDS if it's not empty
-            if slack_channel_ids:
-                env_vars["SLACK_CHANNEL_IDS"] = slack_channel_ids
-            
-            slack_server = MCPServerStdio(
-                name="slack",
-                params={
-                    "env": env_vars,
-                    "command": "npx",
-                    "args": ["-y", "@modelcontextprotocol/server-slack"],
-                },
-                cache_tools_list=True
-            )
-            
-            # Create a temporary agent with specific instructions for handling Slack queries
-            class _SlackAgent(Agent):
-                def __init__(self):
-                    super().__init__(
-                        name="SlackAgent",
-                        description="Temporary agent for Slack MCP queries.",
-                        instructions="""You are a Slack interface agent. Use the available Slack MCP tools to:
+            if self.action in ("search", "read"):
+                return self._from_store()
 
-1. If asked to list channels or operations, use the appropriate MCP tools to discover them
-2. If asked to send messages, use the messaging tools
-3. If asked to search or read, use the search/read tools
-4. Always provide clear, structured responses
-5. If channel IDs are needed but not known, first list channels to find the right ones
-6. Handle errors gracefully and suggest alternatives
+            # Simple operations (list channels, channel info, latest messages) go straight to the Web API
+            if fast_path_enabled():
+                result = try_fast_path(self.query)
+                if result is not None:
+                    return result
 
-Available operations you can perform:
-- List channels and get their IDs
-- Send messages to channels
-- Read messages from channels
-- Search for messages
-- Get channel information
-- List all available Slack MCP tools
-
-Respond in a clear, structured format showing what was found or accomplished.""",
-                        mcp_servers=[slack_server],
-                        temperature=0.3,
-                        max_prompt_tokens=25000,
-                        model="gpt-4o-mini"
-                    )
-                def response_validator(self, message):
-                    return message
-            
-            agent = _SlackAgent()
-            
-            # Create a minimal Agency with this agent as CEO
-            agency = Agency([agent])
-            
-            # Use the agency to get a completion from the agent
-            result = agency.get_completion(self.query)
-            return result
+            # Cached agent and agency; the Slack MCP server behind it comes from the shared pool
+            agency = get_slack_agency(slack_server_env())
+            return get_completion(agency, self.query)
             
         except Exception as e:
             return {
@@ -108,6 +190,34 @@ Respond in a clear, structured format showing what was found or accomplished."""
                 "suggestion": "Check your Slack bot token and team ID. If SLACK_CHANNEL_IDS is missing, try querying 'list channels' first to discover available channels."
             }
 
+    def _from_store(self) -> dict:
+        channel_ids = configured_channel_ids()
+        if not channel_ids:
+            return {"error": "SLACK_CHANNEL_IDS must be set to read or search the local message store"}
+        started_at = time.perf_counter()
+        SLACK_STORE.ensure_fresh(channel_ids, max_staleness=float(os.getenv("SLACK_STORE_MAX_STALENESS", 600)))
+        if self.channel:
+            channel_id = SLACK_STORE.resolve_channel(self.channel)
+            if channel_id is None:
+                try:
+                    channel_id = SLACK_DIRECTORY.channel_id(self.channel)
+                except Exception as e:
+                    print(f"Slack channel directory unavailable: {e}")
+            if channel_id not in channel_ids:
+                return {"error": f"Channel {self.channel} is not in the local store", "channels": SLACK_STORE.freshness(channel_ids)}
+            channel_ids = [channel_id]
+        if self.action == "search":
+            result = {"action": "search", "query": self.query, "messages": SLACK_STORE.search(self.query, channel_ids, limit=self.limit)}
+        else:
+            result = {"action": "read", "channel": channel_ids[0], "thread_ts": self.thread_ts, "messages": SLACK_STORE.read(channel_ids[0], thread_ts=self.thread_ts, limit=self.limit)}
+        user_names = SLACK_DIRECTORY.user_names(message.get("user") for message in result["messages"])
+        for message in result["messages"]:
+            if message.get("user") in user_names:
+                message["user_name"] = user_names[message["user"]]
+        result["freshness"] = SLACK_STORE.freshness(channel_ids)
+        result["elapsed_ms"] = round((time.perf_counter() - started_at) * 1000, 1)
+        return result
+
 if __name__ == "__main__":
     query = "list channels"
     print(f"\n=== Testing Query: {query} ===")
@@ -0,0 +1,235 @@
+import asyncio
+import os
+from collections import deque
+from typing import AsyncIterator, Optional, Tuple
+
+from dotenv import load_dotenv
+from notion_client.errors import APIResponseError
+
+from utils import page_blocks_cleanup
+from utils.block_cache import tree_version
+from utils.notion_api import get_async_notion_client
+from utils.jobs import report_progress
+from utils.page_blocks_cleanup import extract_text_from_block, process_page_clean
+from utils.tracing import current_span, span
+
+load_dotenv()
+
+notion = get_async_notion_client()
+
+DEFAULT_MAX_CONCURRENCY = int(os.getenv("NOTION_TREE_WORKERS", 8))
+
+
+async def alist_block_children(block_id: str, version: Optional[str] = None) -> tuple:
+    """asyncio equivalent of list_block_children, sharing the same block cache."""
+    block_cache = page_blocks_cleanup.BLOCK_CACHE
+    # The cache is SQLite behind a lock: keep it off the event loop (unversioned lookups always miss)
+    if block_cache is not None and version:
+        cached = await asyncio.to_thread(block_cache.get_children, block_id, version)
+        if cached is not None:
+            current_span().set(cached=True)
+            report_progress(blocks=len(cached))
+            return cached, None
+
+    children = []
+    cursor = None
+
+    while True:
+        try:
+            response = await notion.blocks.children.list(
+                block_id=block_id,
+                start_cursor=cursor,
+                page_size=100
+            )
+        except APIResponseError as e:
+            return children, f"Could not access blocks for block_id {block_id}: {str(e)}"
+
+        children.extend(response.get("results", []))
+        report_progress(blocks=len(response.get("results", [])))
+
+        if not response.get("has_more"):
+            break
+
+        cursor = response.get("next_cursor")
+
+    if block_cache is not None and version:
+        await asyncio.to_thread(block_cache.put_children, block_id, version, children)
+    return children, None
+
+
+async def aprocess_database_clean(database_id: str) -> list:
+    """asyncio equivalent of process_database_clean."""
+    entries = []
+    cursor = None
+
+    while True:
+        try:
+            response = await notion.databases.query(
+                database_id=database_id,
+                start_cursor=cursor,
+                page_size=100
+            )
+        except APIResponseError as e:
+            return [{"error": f"Could not query database {database_id}: {str(e)}"}]
+
+        report_progress(pages=len(response.get("results", [])))
+        for page in response.get("results", []):
+            entries.append(process_page_clean(page))
+
+        if not response.get("has_more"):
+            break
+
+        cursor = response.get("next_cursor")
+
+    return entries
+
+
+async def _bounded(semaphore: asyncio.Semaphore, coroutine):
+    async with semaphore:
+        return await coroutine
+
+
+async def _traced_listing(block_id: str, version: Optional[str], parent) -> tuple:
+    """
+    alist_block_children in a span whose parent is the listing of the parent block, so traces
+    mirror the block tree even though levels are listed breadth-first. Returns (children, error, span).
+    """
+    with span("list_children", parent=parent, block_id=block_id) as listing:
+        children, error = await alist_block_children(block_id, version)
+    return children, error, listing
+
+
+async def _traced_database(database_id: str, parent) -> list:
+    with span("process_database_clean", parent=parent, database_id=database_id):
+        return await aprocess_database_clean(database_id)
+
+
+async def _list_level(level: list, semaphore: asyncio.Semaphore) -> list:
+    # The last item of each node is the span of its parent's listing
+    return await asyncio.gather(*(_bounded(semaphore, _traced_listing(node[0], node[1], node[-1])) for node in level))
+
+
+async def aget_blocks_full(block_id: str, depth: int, version: Optional[str] = None, max_concurrency: Optional[int] = None) -> list:
+    """
+    asyncio equivalent of get_blocks_concurrent_full: each tree level is listed concurrently,
+    at most max_concurrency listings at a time. Output is identical to get_blocks_recursive_full.
+    """
+    if depth <= 0:
+        return []
+
+    version = tree_version(block_id, version)
+    semaphore = asyncio.Semaphore(max_concurrency or DEFAULT_MAX_CONCURRENCY)
+    root = []
+    # Each pending node is (block_id, version, remaining depth, list to fill with its children, parent listing span)
+    level = [(block_id, version, depth, root, None)]
+
+    while level:
+        listings = await _list_level(level, semaphore)
+        next_level = []
+        for (_, _, node_depth, sink, _), (children, error, listing) in zip(level, listings):
+            for block in children:
+                try:
+                    full_block = block.copy()
+                    if block.get("has_children"):
+                        full_block["children_blocks"] = []
+                        if node_depth - 1 > 0:
+                            next_level.append((block["id"], version, node_depth - 1, full_block["children_blocks"], listing))
+                    sink.append(full_block)
+                except Exception as e:
+                    sink.append({"error": f"Error processing block {block['id']}: {str(e)}"})
+            if error:
+                sink.append({"error": error})
+        level = next_level
+
+    return root
+
+
+async def aiter_blocks_full(block_id: str, depth: int, version: Optional[str] = None, max_concurrency: Optional[int] = None) -> AsyncIterator[Tuple[str, dict]]:
+    """
+    Streaming counterpart of aget_blocks_full: yields (parent_id, block) as soon as each listing
+    returns instead of building the nested tree, with at most max_concurrency listings in flight
+    and so at most that many unconsumed listings held in memory. A parent's children keep
+    Notion's order; children of different parents interleave in completion order. Blocks are
+    yielded as Notion returns them (no children_blocks); a failed listing yields
+    (parent_id, {"error": ...}).
+    """
+    if depth <= 0:
+        return
+
+    version = tree_version(block_id, version)
+    max_concurrency = max_concurrency or DEFAULT_MAX_CONCURRENCY
+    # Nodes still to list: (block_id, version, remaining depth, parent listing span)
+    waiting = deque([(block_id, version, depth, None)])
+    in_flight = {}
+    try:
+        while waiting or in_flight:
+            while waiting and len(in_flight) < max_concurrency:
+                node_id, node_version, node_depth, parent = waiting.popleft()
+                in_flight[asyncio.ensure_future(_traced_listing(node_id, node_version, parent))] = (node_id, node_depth)
+            done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                parent_id, node_depth = in_flight.pop(task)
+                children, error, listing = task.result()
+                for block in children:
+                    if block.get("has_children") and node_depth - 1 > 0:
+                        waiting.append((block["id"], version, node_depth - 1, listing))
+                    yield parent_id, block
+                if error:
+                    yield parent_id, {"error": error}
+    finally:
+        # The consumer stopped early (e.g. the client disconnected)
+        for task in in_flight:
+            task.cancel()
+
+
+async def aget_blocks_clean(block_id: str, depth: int, version: Optional[str] = None, max_concurrency: Optional[int] = None) -> list:
+    """
+    asyncio equivalent of get_blocks_concurrent_clean. Child databases found on a level are
+    queried concurrently with the next level's listings. Output is identical to get_blocks_recursive_clean.
+    """
+    if depth <= 0:
+        return []
+
+    version = tree_version(block_id, version)
+    semaphore = asyncio.Semaphore(max_concurrency or DEFAULT_MAX_CONCURRENCY)
+    root = []
+    level = [(block_id, version, depth, root, None)]
+    # (block_data, children list) pairs; "children" is attached once the whole tree is fetched
+    pending_children = []
+    database_jobs = []
+
+    while level:
+        listings = await _list_level(level, semaphore)
+        next_level = []
+        for (_, _, node_depth, sink, _), (children, error, listing) in zip(level, listings):
+            for block in children:
+                try:
+                    block_type = block["type"]
+                    if block_type == "child_database":
+                        block_data = {"type": "child_database", "content": None}
+                        task = asyncio.ensure_future(_bounded(semaphore, _traced_database(block["id"], listing)))
+                        database_jobs.append((sink, len(sink), block["id"], task))
+                    else:
+                        block_data = {block_type: extract_text_from_block(block)}
+                        if block.get("has_children") and node_depth - 1 > 0:
+                            block_children = []
+                            pending_children.append((block_data, block_children))
+                            next_level.append((block["id"], version, node_depth - 1, block_children, listing))
+                    sink.append(block_data)
+                except Exception as e:
+                    sink.append({"error": f"Error processing block {block['id']}: {str(e)}"})
+            if error:
+                sink.append({"error": error})
+        level = next_level
+
+    for sink, index, database_block_id, task in database_jobs:
+        try:
+            sink[index]["content"] = await task
+        except Exception as e:
+            sink[index] = {"error": f"Error processing block {database_block_id}: {str(e)}"}
+
+    for block_data, block_children in pending_children:
+        if block_children:
+            block_data["children"] = block_children
+
+    return root
@@ -0,0 +1,53 @@
+import asyncio
+import threading
+from typing import Any, AsyncIterator, Awaitable, Iterator, Optional
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
+
+
+def _runner_loop() -> asyncio.AbstractEventLoop:
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="notion-async-runner", daemon=True).start()
+        return _loop
+
+
+def run_sync(coroutine: Awaitable[Any]) -> Any:
+    """
+    Run a coroutine to completion from synchronous code and return its result.
+
+    Coroutines run on one long-lived event loop in a background thread, so the asyncio
+    Notion client keeps its connection pool between calls and this also works when the
+    caller is itself inside a running event loop (the caller's thread blocks until done).
+    """
+    loop = _runner_loop()
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is loop:
+        coroutine.close()
+        raise RuntimeError("run_sync cannot be called from the runner loop itself; await the coroutine instead")
+    return asyncio.run_coroutine_threadsafe(coroutine, loop).result()
+
+
+async def _anext(iterator: AsyncIterator[Any]) -> Any:
+    return await iterator.__anext__()
+
+
+def iterate_sync(iterator: AsyncIterator[Any]) -> Iterator[Any]:
+    """
+    Iterate an async generator from synchronous code, pulling one item at a time on the runner
+    loop. Closing the returned generator early also closes the async one.
+    """
+    try:
+        while True:
+            try:
+                yield run_sync(_anext(iterator))
+            except StopAsyncIteration:
+                return
+    finally:
+        run_sync(iterator.aclose())
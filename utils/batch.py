@@ -0,0 +1,82 @@
+import os
+import time
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+class BatchCall(NamedTuple):
+    name: str
+    tool_class: Any
+    arguments: dict
+    tool: Any
+
+
+class BatchValidationError(ValueError):
+    """Raised before anything runs when one or more calls of a batch are invalid."""
+
+    def __init__(self, errors: List[dict]):
+        super().__init__(f"{len(errors)} invalid call(s) in batch")
+        self.errors = errors
+
+
+def _max_calls() -> int:
+    return int(os.getenv("BATCH_MAX_CALLS", 50))
+
+
+def batch_concurrency(requested: Optional[int], call_count: int) -> int:
+    """Calls of one batch run at once: the client may ask for fewer than BATCH_MAX_CONCURRENCY, never more."""
+    limit = int(os.getenv("BATCH_MAX_CONCURRENCY", 8))
+    if requested and requested > 0:
+        limit = min(limit, requested)
+    return max(1, min(limit, call_count))
+
+
+def parse_batch(payload: Any, tools_by_name: Dict[str, Any]) -> List[BatchCall]:
+    """
+    Validate a batch payload, a JSON array of {"tool": name, "args": {...}}, and instantiate every
+    tool. All calls are checked before any runs; errors are reported per index in one exception.
+    """
+    if not isinstance(payload, list) or not payload:
+        raise BatchValidationError([{"index": None, "Error": "Batch must be a non-empty array of {tool, args} objects"}])
+    if len(payload) > _max_calls():
+        raise BatchValidationError([{"index": None, "Error": f"Batch has {len(payload)} calls, the limit is {_max_calls()}"}])
+
+    calls, errors = [], []
+    for index, item in enumerate(payload):
+        if not isinstance(item, dict) or not isinstance(item.get("tool"), str) or not isinstance(item.get("args", {}), dict):
+            errors.append({"index": index, "Error": "Each call must be an object {tool, args} with tool a name and args an object"})
+            continue
+        name, arguments = item.get("tool"), item.get("args", {})
+        tool_class = tools_by_name.get(name)
+        if tool_class is None:
+            errors.append({"index": index, "Error": f"Unknown tool: {name}"})
+            continue
+        try:
+            calls.append(BatchCall(name, tool_class, arguments, tool_class(**arguments)))
+        except Exception as e:
+            errors.append({"index": index, "Error": str(e)})
+    if errors:
+        raise BatchValidationError(errors)
+    return calls
+
+
+def requested_tools(payload: Any, tools_by_name: Dict[str, Any]) -> list:
+    """The known tools named in a batch payload, e.g. to import lazy tools before parse_batch."""
+    if not isinstance(payload, list):
+        return []
+    names = {item.get("tool") for item in payload if isinstance(item, dict) and isinstance(item.get("tool"), str)}
+    return [tools_by_name[name] for name in names if name in tools_by_name]
+
+
+def batch_item(call: BatchCall, started_at: float, response: Any = None, error: Optional[Exception] = None) -> dict:
+    """One entry of the batch result: the per-tool route's body plus the tool name and timing."""
+    item = {"tool": call.name}
+    if error is None:
+        item["response"] = response
+    else:
+        item["Error"] = str(error)
+    item["elapsed_ms"] = round((time.perf_counter() - started_at) * 1000, 1)
+    return item
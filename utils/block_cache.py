@@ -0,0 +1,173 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(__file__), "..", ".cache", "notion_block_cache.sqlite3")
+
+
+def tree_version(root_id: str, root_version: Optional[str]) -> Optional[str]:
+    """Cache version of every listing in a walk from root_id, given the root's last_edited_time."""
+    return f"{root_id}@{root_version}" if root_version else None
+
+
+class BlockTreeCache:
+    """
+    On-disk cache of raw `blocks.children.list` results, keyed by the parent block id.
+
+    Each entry is stored together with a version, and a lookup only hits when the caller
+    passes the same version. Notion does not bump a block's `last_edited_time` when one of
+    its descendants is edited, so walkers use tree_version(): the id and `last_edited_time`
+    of the page the walk started from, which changes with any edit on the page. Every
+    listing of a page is re-fetched after the page was edited.
+    Entries are evicted least-recently-used once the total payload exceeds max_bytes,
+    and entries older than ttl seconds are treated as misses as a safety net.
+    Access times of hits are kept in memory and written with the next put, so reads never
+    write to disk.
+    """
+
+    ACCESS_FLUSH_SIZE = 1000
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, max_bytes: int = 50 * 1024 * 1024, ttl: Optional[float] = None):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._accessed: Dict[str, float] = {}
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS block_children (
+                block_id TEXT PRIMARY KEY,
+                version TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                stored_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_block_children_accessed ON block_children (accessed_at)")
+        self._conn.commit()
+        self._total_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM block_children").fetchone()[0]
+
+    def get_children(self, block_id: str, version: Optional[str]) -> Optional[list]:
+        """Return the cached children of block_id if they were stored for this version, else None."""
+        if not version:
+            return None
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT version, payload, stored_at FROM block_children WHERE block_id = ?", (block_id,)
+            ).fetchone()
+            now = time.time()
+            if row is None or row[0] != version or (self.ttl is not None and now - row[2] > self.ttl):
+                self.misses += 1
+                return None
+            self._accessed[block_id] = now
+            self.hits += 1
+            if len(self._accessed) >= self.ACCESS_FLUSH_SIZE:
+                self._flush_accessed()
+                self._conn.commit()
+        return json.loads(row[1])
+
+    def put_children(self, block_id: str, version: Optional[str], children: list) -> None:
+        """Store the complete children listing of block_id for the given version."""
+        if not version:
+            return
+        payload = json.dumps(children, separators=(",", ":"))
+        size = len(payload)
+        if size > self.max_bytes:
+            return
+        now = time.time()
+        with self._lock:
+            previous = self._conn.execute("SELECT size FROM block_children WHERE block_id = ?", (block_id,)).fetchone()
+            if previous:
+                self._total_bytes -= previous[0]
+            self._conn.execute(
+                "INSERT OR REPLACE INTO block_children (block_id, version, payload, size, stored_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (block_id, version, payload, size, now, now),
+            )
+            self._accessed.pop(block_id, None)
+            self._total_bytes += size
+            self._flush_accessed()
+            self._evict()
+            self._conn.commit()
+
+    def _flush_accessed(self) -> None:
+        """Write the pending access times of hits in one batch. Caller holds the lock and commits."""
+        if self._accessed:
+            self._conn.executemany(
+                "UPDATE block_children SET accessed_at = ? WHERE block_id = ?",
+                [(accessed_at, block_id) for block_id, accessed_at in self._accessed.items()],
+            )
+            self._accessed.clear()
+
+    def _evict(self) -> None:
+        """Drop least recently used entries until the cache fits in max_bytes. Caller holds the lock."""
+        while self._total_bytes > self.max_bytes:
+            row = self._conn.execute(
+                "SELECT block_id, size FROM block_children ORDER BY accessed_at ASC LIMIT 1"
+            ).fetchone()
+            if row is None:
+                self._total_bytes = 0
+                break
+            self._conn.execute("DELETE FROM block_children WHERE block_id = ?", (row[0],))
+            self._total_bytes -= row[1]
+            self.evictions += 1
+
+    def invalidate(self, block_id: str) -> None:
+        """Forget the cached children of a single block."""
+        with self._lock:
+            self._accessed.pop(block_id, None)
+            row = self._conn.execute("SELECT size FROM block_children WHERE block_id = ?", (block_id,)).fetchone()
+            if row:
+                self._conn.execute("DELETE FROM block_children WHERE block_id = ?", (block_id,))
+                self._total_bytes -= row[0]
+                self._conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._accessed.clear()
+            self._conn.execute("DELETE FROM block_children")
+            self._conn.commit()
+            self._total_bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM block_children").fetchone()[0]
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": entries,
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+def _build_default_cache() -> Optional[BlockTreeCache]:
+    if os.getenv("NOTION_BLOCK_CACHE_ENABLED", "true").lower() in ("0", "false", "no"):
+        return None
+    ttl = os.getenv("NOTION_BLOCK_CACHE_TTL", 24 * 3600)
+    return BlockTreeCache(
+        path=os.getenv("NOTION_BLOCK_CACHE_PATH", DEFAULT_CACHE_PATH),
+        max_bytes=int(os.getenv("NOTION_BLOCK_CACHE_MAX_BYTES", 50 * 1024 * 1024)),
+        ttl=float(ttl) if ttl else None,
+    )
+
+
+BLOCK_CACHE = _build_default_cache()
@@ -0,0 +1,110 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from dotenv import load_dotenv
+from notion_client.errors import APIResponseError
+
+from utils.block_cache import tree_version
+from utils.page_blocks_cleanup import list_block_children, extract_text_from_block, process_database_clean
+
+load_dotenv()
+
+DEFAULT_MAX_WORKERS = int(os.getenv("NOTION_TREE_WORKERS", 8))
+
+
+def get_blocks_concurrent_full(block_id: str, depth: int, version: Optional[str] = None, max_workers: Optional[int] = None) -> list:
+    """
+    Breadth-first, level-parallel equivalent of get_blocks_recursive_full.
+    All `has_children` blocks of one tree level are listed concurrently on a bounded thread
+    pool; requests still go through the shared Notion rate limiter and block cache.
+    The returned structure (including child order and error blocks) is identical to
+    get_blocks_recursive_full.
+    """
+    if depth <= 0:
+        return []
+
+    version = tree_version(block_id, version)
+    root = []
+    # Each pending node is (block_id, version, remaining depth, list to fill with its children)
+    level = [(block_id, version, depth, root)]
+
+    with ThreadPoolExecutor(max_workers=max_workers or DEFAULT_MAX_WORKERS) as executor:
+        while level:
+            listings = list(executor.map(lambda node: list_block_children(node[0], node[1]), level))
+            next_level = []
+            for (_, _, node_depth, sink), (children, error) in zip(level, listings):
+                for block in children:
+                    try:
+                        full_block = block.copy()
+                        if block.get("has_children"):
+                            full_block["children_blocks"] = []
+                            if node_depth - 1 > 0:
+                                next_level.append((block["id"], version, node_depth - 1, full_block["children_blocks"]))
+                        sink.append(full_block)
+                    except Exception as e:
+                        sink.append({"error": f"Error processing block {block['id']}: {str(e)}"})
+                if error:
+                    sink.append({"error": error})
+            level = next_level
+
+    return root
+
+
+def _process_database_safe(database_id: str) -> list:
+    try:
+        return process_database_clean(database_id)
+    except APIResponseError as e:
+        return [{"error": f"Could not access database {database_id}: {str(e)}"}]
+
+
+def get_blocks_concurrent_clean(block_id: str, depth: int, version: Optional[str] = None, max_workers: Optional[int] = None) -> list:
+    """
+    Breadth-first, level-parallel equivalent of get_blocks_recursive_clean.
+    Child databases found on a level are queried on the same pool as the block listings.
+    Children of child_database blocks are not fetched because the clean output drops them.
+    """
+    if depth <= 0:
+        return []
+
+    version = tree_version(block_id, version)
+    root = []
+    level = [(block_id, version, depth, root)]
+    # (block_data, children list) pairs; "children" is attached once the whole tree is fetched
+    pending_children = []
+
+    with ThreadPoolExecutor(max_workers=max_workers or DEFAULT_MAX_WORKERS) as executor:
+        while level:
+            listings = list(executor.map(lambda node: list_block_children(node[0], node[1]), level))
+            next_level = []
+            database_jobs = []
+            for (_, _, node_depth, sink), (children, error) in zip(level, listings):
+                for block in children:
+                    try:
+                        block_type = block["type"]
+                        if block_type == "child_database":
+                            block_data = {"type": "child_database", "content": None}
+                            database_jobs.append((sink, len(sink), block["id"], executor.submit(_process_database_safe, block["id"])))
+                        else:
+                            block_data = {block_type: extract_text_from_block(block)}
+                            if block.get("has_children") and node_depth - 1 > 0:
+                                block_children = []
+                                pending_children.append((block_data, block_children))
+                                next_level.append((block["id"], version, node_depth - 1, block_children))
+                        sink.append(block_data)
+                    except Exception as e:
+                        sink.append({"error": f"Error processing block {block['id']}: {str(e)}"})
+                if error:
+                    sink.append({"error": error})
+            for sink, index, database_block_id, future in database_jobs:
+                try:
+                    sink[index]["content"] = future.result()
+                except Exception as e:
+                    sink[index] = {"error": f"Error processing block {database_block_id}: {str(e)}"}
+            level = next_level
+
+    for block_data, block_children in pending_children:
+        if block_children:
+            block_data["children"] = block_children
+
+    return root
@@ -0,0 +1,215 @@
+import os
+import time
+import zlib
+from typing import Iterable, Iterator, List, Optional
+
+from dotenv import load_dotenv
+
+from utils.metrics import COMPRESSION_CPU_SECONDS, COMPRESSION_INPUT_BYTES, COMPRESSION_OUTPUT_BYTES, COMPRESSION_RATIO
+
+load_dotenv()
+
+# brotli and zstd are optional; an encoding is only negotiated when its module is installed
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/")
+
+
+class _Encoder:
+    """
+    Incremental compressor for one response body. compress(sync=True) flushes everything
+    given so far so a streamed record reaches the client without waiting for the next one.
+    Bytes in and out and thread CPU time are recorded in the metrics when finish() is called.
+    """
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        self.input_bytes = 0
+        self.output_bytes = 0
+        self.cpu_seconds = 0.0
+        if encoding == "gzip":
+            self._compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+        elif encoding == "br":
+            self._compressor = brotli.Compressor(quality=4)
+        else:
+            self._compressor = zstandard.ZstdCompressor(level=3).compressobj()
+
+    def _process(self, data: bytes, sync: bool) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.process(data) + (self._compressor.flush() if sync else b"")
+        if self.encoding == "gzip":
+            return self._compressor.compress(data) + (self._compressor.flush(zlib.Z_SYNC_FLUSH) if sync else b"")
+        return self._compressor.compress(data) + (self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK) if sync else b"")
+
+    def _timed(self, function, *args) -> bytes:
+        started_at = time.thread_time()
+        output = function(*args)
+        self.cpu_seconds += time.thread_time() - started_at
+        self.output_bytes += len(output)
+        return output
+
+    def compress(self, data: bytes, sync: bool = False) -> bytes:
+        self.input_bytes += len(data)
+        return self._timed(self._process, data, sync)
+
+    def finish(self) -> bytes:
+        output = self._timed(self._compressor.finish if self.encoding == "br" else self._compressor.flush)
+        COMPRESSION_INPUT_BYTES.inc(self.encoding, amount=self.input_bytes)
+        COMPRESSION_OUTPUT_BYTES.inc(self.encoding, amount=self.output_bytes)
+        COMPRESSION_CPU_SECONDS.inc(self.encoding, amount=self.cpu_seconds)
+        if self.output_bytes:
+            COMPRESSION_RATIO.observe(self.input_bytes / self.output_bytes, self.encoding)
+        return output
+
+
+def available_encodings() -> List[str]:
+    """Encodings this server can produce, in order of preference (COMPRESSION_ENCODINGS)."""
+    installed = {"gzip": True, "br": brotli is not None, "zstd": zstandard is not None}
+    configured = os.getenv("COMPRESSION_ENCODINGS", "zstd,br,gzip")
+    return [encoding.strip() for encoding in configured.split(",") if installed.get(encoding.strip())]
+
+
+def min_size() -> int:
+    """Complete bodies smaller than this are sent uncompressed (COMPRESSION_MIN_BYTES)."""
+    return int(os.getenv("COMPRESSION_MIN_BYTES", 1024))
+
+
+def negotiate(accept_encoding: Optional[str]) -> Optional[str]:
+    """The encoding to use for an Accept-Encoding header: highest q-value, ties broken by server preference."""
+    if not accept_encoding:
+        return None
+    qualities = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[name.strip().lower()] = quality
+    best, best_quality = None, 0.0
+    for encoding in available_encodings():
+        quality = qualities.get(encoding, qualities.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def is_compressible(content_type: Optional[str]) -> bool:
+    return bool(content_type) and content_type.split(";")[0].strip().lower().startswith(COMPRESSIBLE_TYPES)
+
+
+def weak_etag(etag: Optional[str]) -> Optional[str]:
+    """A strong ETag must differ per content-coding; the compressed variant carries the weak form."""
+    if etag and not etag.startswith("W/"):
+        return "W/" + etag
+    return etag
+
+
+def compress_body(body: bytes, encoding: str) -> bytes:
+    encoder = _Encoder(encoding)
+    return encoder.compress(body) + encoder.finish()
+
+
+def compress_stream(chunks: Iterable[bytes], encoding: str) -> Iterator[bytes]:
+    """Compress a streamed body chunk by chunk, flushing after each so nothing is held back."""
+    encoder = _Encoder(encoding)
+    try:
+        for chunk in chunks:
+            if chunk:
+                compressed = encoder.compress(chunk, sync=True)
+                if compressed:
+                    yield compressed
+    finally:
+        tail = encoder.finish()
+    yield tail
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware applying the same negotiation. A response sent in one body message is
+    compressed whole when it reaches the size threshold; a streamed response is compressed
+    message by message as it passes through, never buffered.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = dict((key.lower(), value) for key, value in scope.get("headers", []))
+        encoding = negotiate(headers.get(b"accept-encoding", b"").decode("latin-1"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        state = {"start": None, "encoder": None, "passthrough": False}
+
+        async def send_compressed(message):
+            if message["type"] == "http.response.start":
+                response_headers = dict((key.lower(), value) for key, value in message.get("headers", []))
+                content_type = response_headers.get(b"content-type", b"").decode("latin-1")
+                if message["status"] in (204, 304) or b"content-encoding" in response_headers or not is_compressible(content_type):
+                    state["passthrough"] = True
+                    await send(message)
+                else:
+                    # Held until the first body message shows whether the body is streamed
+                    state["start"] = message
+                return
+            if message["type"] != "http.response.body" or state["passthrough"]:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            start = state.pop("start", None)
+            if start is not None:
+                if not more_body and len(body) < min_size():
+                    state["passthrough"] = True
+                    await send(_with_vary(start))
+                    await send(message)
+                    return
+                state["encoder"] = _Encoder(encoding)
+                await send(_with_encoding(start, encoding))
+
+            encoder = state["encoder"]
+            if more_body:
+                await send({"type": "http.response.body", "body": encoder.compress(body, sync=True), "more_body": True})
+            else:
+                await send({"type": "http.response.body", "body": encoder.compress(body) + encoder.finish(), "more_body": False})
+
+        await self.app(scope, receive, send_compressed)
+
+
+def _with_vary(start: dict) -> dict:
+    headers, vary = [], [b"Accept-Encoding"]
+    for key, value in start.get("headers", []):
+        if key.lower() == b"vary":
+            vary.insert(0, value)
+        else:
+            headers.append((key, value))
+    return dict(start, headers=headers + [(b"vary", b", ".join(vary))])
+
+
+def _with_encoding(start: dict, encoding: str) -> dict:
+    headers = []
+    for key, value in _with_vary(start)["headers"]:
+        if key.lower() == b"content-length":
+            continue
+        if key.lower() == b"etag":
+            value = weak_etag(value.decode("latin-1")).encode("latin-1")
+        headers.append((key, value))
+    return dict(start, headers=headers + [(b"content-encoding", encoding.encode())])
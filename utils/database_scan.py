@@ -0,0 +1,162 @@
+import asyncio
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from dotenv import load_dotenv
+
+from utils.jobs import report_progress
+from utils.notion_api import get_async_notion_client
+from utils.notion_filters import UnsupportedFilterError, sort_pages
+
+load_dotenv()
+
+notion = get_async_notion_client()
+
+DEFAULT_SHARDS = int(os.getenv("NOTION_SCAN_SHARDS", 8))
+DEFAULT_SORTS = [{"timestamp": "last_edited_time", "direction": "descending"}]
+
+
+def _parse_time(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).astimezone(timezone.utc)
+
+
+def _format_time(value: datetime) -> str:
+    return value.strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+
+def shard_boundaries(first_created: str, last_created: str, shards: int) -> list:
+    """
+    Split [first_created, last_created] into at most `shards` equal created_time ranges and return
+    their inner boundaries, rounded to whole minutes (Notion stores created_time per minute).
+    """
+    start = _parse_time(first_created)
+    end = _parse_time(last_created)
+    step = (end - start) / max(shards, 1)
+    boundaries = []
+    for index in range(1, shards):
+        boundary = (start + step * index).replace(second=0, microsecond=0) + timedelta(minutes=1)
+        if start < boundary <= end and (not boundaries or boundary > boundaries[-1]):
+            boundaries.append(boundary)
+    return [_format_time(boundary) for boundary in boundaries]
+
+
+def _range_filters(boundaries: list) -> list:
+    """Disjoint created_time conditions; the outer shards are open-ended so no row can fall outside all of them."""
+    edges = [None] + boundaries + [None]
+    ranges = []
+    for lower, upper in zip(edges, edges[1:]):
+        conditions = []
+        if lower:
+            conditions.append({"timestamp": "created_time", "created_time": {"on_or_after": lower}})
+        if upper:
+            conditions.append({"timestamp": "created_time", "created_time": {"before": upper}})
+        ranges.append(conditions)
+    return ranges
+
+
+MAX_FILTER_DEPTH = 2
+
+
+def _filter_depth(notion_filter: dict) -> int:
+    """Nesting depth of compound filters: 0 for a single condition, 1 for an and/or of conditions, ..."""
+    for key in ("and", "or"):
+        if key in notion_filter:
+            return 1 + max((_filter_depth(sub_filter) for sub_filter in notion_filter[key]), default=0)
+    return 0
+
+
+def _combine_filters(notion_filter: Optional[dict], conditions: list) -> Optional[dict]:
+    """
+    AND the created_time conditions of a shard into the caller's filter. Notion nests compound
+    filters at most two levels deep, so an "or" that cannot be wrapped gets the conditions added
+    to each branch instead; UnsupportedFilterError if neither fits.
+    """
+    if not conditions:
+        return notion_filter
+    if not notion_filter:
+        return {"and": conditions} if len(conditions) > 1 else conditions[0]
+    if "and" in notion_filter:
+        combined = {"and": notion_filter["and"] + conditions}
+    elif "or" in notion_filter and _filter_depth(notion_filter) >= MAX_FILTER_DEPTH:
+        combined = {"or": [_combine_filters(branch, conditions) for branch in notion_filter["or"]]}
+    else:
+        combined = {"and": [notion_filter] + conditions}
+    if _filter_depth(combined) > MAX_FILTER_DEPTH:
+        raise UnsupportedFilterError(f"Filter {notion_filter} is nested too deeply to add created_time ranges")
+    return combined
+
+
+async def _query_all(database_id: str, notion_filter: Optional[dict] = None, sorts: Optional[list] = None) -> list:
+    """Follow the cursor of one databases.query to the end."""
+    pages = []
+    cursor = None
+    while True:
+        params = {"database_id": database_id, "page_size": 100}
+        if notion_filter:
+            params["filter"] = notion_filter
+        if sorts:
+            params["sorts"] = sorts
+        if cursor:
+            params["start_cursor"] = cursor
+        response = await notion.databases.query(**params)
+        pages.extend(response.get("results", []))
+        report_progress(pages=len(response.get("results", [])))
+        if not response.get("has_more"):
+            return pages
+        cursor = response.get("next_cursor")
+
+
+async def _edge_row(database_id: str, notion_filter: Optional[dict], direction: str) -> Optional[dict]:
+    response = await notion.databases.query(
+        database_id=database_id,
+        page_size=1,
+        sorts=[{"timestamp": "created_time", "direction": direction}],
+        **({"filter": notion_filter} if notion_filter else {}),
+    )
+    results = response.get("results", [])
+    return results[0] if results else None
+
+
+async def afetch_all_pages(database_id: str, notion_filter: Optional[dict] = None, sorts: Optional[list] = None,
+                           shards: Optional[int] = None) -> dict:
+    """
+    Fetch every row of a database query. The created_time span between the oldest and newest
+    matching rows is cut into disjoint ranges that are paginated concurrently; the rows are then
+    de-duplicated by page id and merged in the requested sort order (see utils.notion_filters.sort_pages).
+    Sorts that cannot be evaluated locally, and filters too deeply nested to take the created_time
+    ranges, fall back to one sequential, Notion-sorted scan.
+    Returns {"results", "total_count", "shards"}.
+    """
+    sorts = sorts or DEFAULT_SORTS
+    first, last, database = await asyncio.gather(
+        _edge_row(database_id, notion_filter, "ascending"),
+        _edge_row(database_id, notion_filter, "descending"),
+        notion.databases.retrieve(database_id=database_id),
+    )
+    if first is None:
+        return {"results": [], "total_count": 0, "shards": 0}
+    schema = database.get("properties", {})
+
+    try:
+        sort_pages([first, last], sorts, schema)
+    except UnsupportedFilterError as e:
+        print(f"Sharded scan fallback to a sequential scan: {e}")
+        pages = await _query_all(database_id, notion_filter, sorts)
+        return {"results": pages, "total_count": len(pages), "shards": 1}
+
+    boundaries = shard_boundaries(first["created_time"], last["created_time"], shards or DEFAULT_SHARDS)
+    try:
+        shard_filters = [_combine_filters(notion_filter, conditions) for conditions in _range_filters(boundaries)]
+    except UnsupportedFilterError as e:
+        print(f"Sharded scan fallback to a sequential scan: {e}")
+        pages = await _query_all(database_id, notion_filter, sorts)
+        return {"results": pages, "total_count": len(pages), "shards": 1}
+    shard_results = await asyncio.gather(*(_query_all(database_id, shard_filter) for shard_filter in shard_filters))
+
+    unique_pages = {}
+    for pages in shard_results:
+        for page in pages:
+            unique_pages.setdefault(page["id"], page)
+    ordered = sort_pages(list(unique_pages.values()), sorts, schema)
+    return {"results": ordered, "total_count": len(ordered), "shards": len(shard_results)}
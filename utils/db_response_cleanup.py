@@ -1,7 +1,302 @@
+# Database-specific field configurations
+DATABASE_CONFIGS = {
+    "4542b3f7-39c3-47e0-9ecd-22c58437d812": {  # Notes DB
+        "name": "notes",
+        "title_property": "",  # Empty string is the title property for Notes
+        "fields": {
+            "page_id": {"type": "id"},
+            "created_by": {"type": "created_by", "property": "Created by", "extract": "name"},
+            "page_title": {"type": "title", "property": ""},
+            "page_url": {"type": "url"},
+            "status": {"type": "status", "property": "Status"},
+            "projects": {"type": "relation", "property": "Projects"},
+            "tags": {"type": "multi_select", "property": "Tags"}
+        }
+    },
+    "567db0a8-1efc-4123-9478-ef08bdb9db6a": {  # Projects DB
+        "name": "projects",
+        "title_property": "Project name",
+        "fields": {
+            "page_id": {"type": "id"},
+            "created_by_name": {"type": "created_by", "property": "Created by", "extract": "name"},
+            "created_by_id": {"type": "created_by", "property": "Created by", "extract": "id"},
+            "project_title": {"type": "title", "property": "Project name"},
+            "page_url": {"type": "url"},
+            "status": {"type": "status", "property": "Status"},
+            "priority": {"type": "select", "property": "Priority"},
+            "git_repo": {"type": "url_property", "property": "Git Repo"},
+            "project_manager_name": {"type": "people", "property": "Project Manager", "extract": "name", "single": True},
+            "project_manager_id": {"type": "people", "property": "Project Manager", "extract": "id", "single": True},
+            "project_type": {"type": "select", "property": "Project Type"},
+            "team_members": {"type": "people", "property": "People", "extract": "full"},
+            "production_url": {"type": "url_property", "property": "Production URL"},
+            "staging_url": {"type": "url_property", "property": "Staging URL "},
+            "tasks_count": {"type": "relation_count", "property": "Tasks"},
+            "project_dates": {"type": "date_range", "property": "Dates"},
+            "created_time": {"type": "timestamp", "property": "created_time"},
+            "last_edited_time": {"type": "timestamp", "property": "last_edited_time"}
+        }
+    },
+    "42fad9c5-af8f-4059-a906-ed6eedc6c571": {  # Tasks DB
+        "name": "tasks",
+        "title_property": "Task name",
+        "fields": {
+            "id": {"type": "id"},
+            "created_by_user_name": {"type": "created_by", "property": "Created by", "extract": "name"},
+            "created_by_user_id": {"type": "created_by", "property": "Created by", "extract": "id"},
+            "title": {"type": "title", "property": "Task name"},
+            "url": {"type": "url"},
+            "status": {"type": "status", "property": "Status"},
+            "priority": {"type": "select", "property": "Priority"},
+            "task_id": {"type": "unique_id", "property": "Task ID"},
+            "project_id": {"type": "relation", "property": "Project", "single": True},
+            "assignee_name": {"type": "people", "property": "Assignee", "extract": "name", "single": True},
+            "assignee_id": {"type": "people", "property": "Assignee", "extract": "id", "single": True},
+            "due_date": {"type": "date_start", "property": "Due"},
+            "urgency": {"type": "select", "property": "Urgency"},
+            "category": {"type": "select", "property": "Category"},
+            "tags": {"type": "multi_select", "property": "Tags"},
+            "execution_time": {"type": "formula", "property": "Execution time", "formula_type": "string"},
+            "over_due": {"type": "formula", "property": "Over Due", "formula_type": "boolean"},
+            "created_time": {"type": "timestamp", "property": "created_time"},
+            "last_edited_time": {"type": "timestamp", "property": "last_edited_time"},
+            "started_time": {"type": "date_start", "property": "Started time"},
+            "completed_time": {"type": "date_start", "property": "Completed Time"}
+        }
+    }
+}
+
+def _compile_id(field_config, db_name):
+    return lambda item, properties: item.get("id")
+
+def _compile_url(field_config, db_name):
+    return lambda item, properties: item.get("url")
+
+def _compile_timestamp(field_config, db_name):
+    key = field_config["property"]
+    return lambda item, properties: item.get(key)
+
+def _compile_title(field_config, db_name):
+    property_name = field_config["property"]
+    def extract(item, properties):
+        title_property = properties.get(property_name)
+        if title_property and title_property.get("type") == "title":
+            title_content = title_property.get("title", [])
+            if title_content:
+                return title_content[0].get("plain_text")
+        return None
+    return extract
+
+def _compile_created_by(field_config, db_name):
+    property_name = field_config["property"]
+    extract_type = field_config.get("extract", "name")
+    def extract(item, properties):
+        created_by_property = properties.get(property_name)
+        if created_by_property and created_by_property.get("type") == "created_by":
+            created_by_data = created_by_property.get("created_by")
+            if created_by_data and created_by_data.get("object") == "user":
+                return created_by_data.get(extract_type)
+        return None
+    return extract
+
+def _compile_status(field_config, db_name):
+    property_name = field_config["property"]
+    # Notion sometimes keys status properties by an encoded internal name instead of the display name
+    encoded_name = f"notion%3A%2F%2F{db_name}%2Fstatus_property"
+    def extract(item, properties):
+        status_property = properties.get(property_name) or properties.get(encoded_name)
+        if status_property and status_property.get("type") == "status":
+            status_data = status_property.get("status")
+            if status_data:
+                return status_data.get("name")
+        return None
+    return extract
+
+def _compile_select(field_config, db_name):
+    property_name = field_config["property"]
+    def extract(item, properties):
+        select_property = properties.get(property_name)
+        if select_property and select_property.get("type") == "select":
+            select_data = select_property.get("select")
+            if select_data:
+                return select_data.get("name")
+        return None
+    return extract
+
+def _compile_multi_select(field_config, db_name):
+    property_name = field_config["property"]
+    def extract(item, properties):
+        multi_select_property = properties.get(property_name)
+        if multi_select_property and multi_select_property.get("type") == "multi_select":
+            return [tag.get("name") for tag in multi_select_property.get("multi_select", []) if tag.get("name")]
+        return []
+    return extract
+
+def _compile_people(field_config, db_name):
+    property_name = field_config["property"]
+    extract_type = field_config.get("extract", "name")
+    is_single = field_config.get("single", False)
+    empty = None if is_single else []
+    if extract_type == "full":
+        # Return full person objects with id, name, email
+        def extract(item, properties):
+            people_property = properties.get(property_name)
+            if people_property and people_property.get("type") == "people":
+                people_list = people_property.get("people", [])
+                if people_list:
+                    return [
+                        {
+                            "id": person.get("id"),
+                            "name": person.get("name"),
+                            "email": person.get("person", {}).get("email") if person.get("person") else None
+                        }
+                        for person in people_list
+                    ]
+            return empty
+        return extract
+    # Return just names or ids
+    def extract(item, properties):
+        people_property = properties.get(property_name)
+        if people_property and people_property.get("type") == "people":
+            people_list = people_property.get("people", [])
+            if people_list:
+                result = [person.get(extract_type) for person in people_list if person.get(extract_type)]
+                return result[0] if is_single and result else result
+        return empty
+    return extract
+
+def _compile_relation(field_config, db_name):
+    property_name = field_config["property"]
+    is_single = field_config.get("single", False)
+    def extract(item, properties):
+        relation_property = properties.get(property_name)
+        if relation_property and relation_property.get("type") == "relation":
+            relation_ids = [rel.get("id") for rel in relation_property.get("relation", []) if rel.get("id")]
+            return relation_ids[0] if is_single and relation_ids else relation_ids
+        return None if is_single else []
+    return extract
+
+def _compile_relation_count(field_config, db_name):
+    property_name = field_config["property"]
+    def extract(item, properties):
+        relation_property = properties.get(property_name)
+        if relation_property and relation_property.get("type") == "relation":
+            return len(relation_property.get("relation", []))
+        return 0
+    return extract
+
+def _compile_url_property(field_config, db_name):
+    property_name = field_config["property"]
+    def extract(item, properties):
+        url_property = properties.get(property_name)
+        if url_property and url_property.get("type") == "url":
+            return url_property.get("url")
+        return None
+    return extract
+
+def _compile_date_start(field_config, db_name):
+    property_name = field_config["property"]
+    def extract(item, properties):
+        date_property = properties.get(property_name)
+        if date_property and date_property.get("type") == "date":
+            date_data = date_property.get("date")
+            if date_data:
+                return date_data.get("start")
+        return None
+    return extract
+
+def _compile_date_range(field_config, db_name):
+    property_name = field_config["property"]
+    def extract(item, properties):
+        date_property = properties.get(property_name)
+        if date_property and date_property.get("type") == "date":
+            date_data = date_property.get("date")
+            if date_data:
+                return {
+                    "start": date_data.get("start"),
+                    "end": date_data.get("end")
+                }
+        return None
+    return extract
+
+def _compile_unique_id(field_config, db_name):
+    property_name = field_config["property"]
+    def extract(item, properties):
+        unique_id_property = properties.get(property_name)
+        if unique_id_property and unique_id_property.get("type") == "unique_id":
+            unique_id_data = unique_id_property.get("unique_id")
+            if unique_id_data:
+                prefix = unique_id_data.get("prefix", "")
+                number = unique_id_data.get("number")
+                if number is not None:
+                    return f"{prefix}{number}" if prefix else str(number)
+        return None
+    return extract
+
+def _compile_formula(field_config, db_name):
+    property_name = field_config["property"]
+    expected_type = field_config.get("formula_type", "string")
+    def extract(item, properties):
+        formula_property = properties.get(property_name)
+        if formula_property and formula_property.get("type") == "formula":
+            formula_data = formula_property.get("formula")
+            if formula_data and formula_data.get("type") == expected_type:
+                return formula_data.get(expected_type)
+        return None
+    return extract
+
+# Field type -> factory building a specialized extractor(item) for one configured field
+FIELD_EXTRACTOR_FACTORIES = {
+    "id": _compile_id,
+    "url": _compile_url,
+    "timestamp": _compile_timestamp,
+    "title": _compile_title,
+    "created_by": _compile_created_by,
+    "status": _compile_status,
+    "select": _compile_select,
+    "multi_select": _compile_multi_select,
+    "people": _compile_people,
+    "relation": _compile_relation,
+    "relation_count": _compile_relation_count,
+    "url_property": _compile_url_property,
+    "date_start": _compile_date_start,
+    "date_range": _compile_date_range,
+    "unique_id": _compile_unique_id,
+    "formula": _compile_formula,
+}
+
+def compile_database_config(db_config):
+    """
+    Compile a database configuration into a list of (field_name, extractor) pairs, where
+    extractor(item, properties) reads one field. Unknown field types extract None, as before.
+    """
+    db_name = db_config.get("name", "unknown")
+    compiled = []
+    for field_name, field_config in db_config["fields"].items():
+        factory = FIELD_EXTRACTOR_FACTORIES.get(field_config["type"])
+        extractor = factory(field_config, db_name) if factory else (lambda item, properties: None)
+        compiled.append((field_name, extractor))
+    return compiled
+
+# Registry of compiled extractors, built once at import time
+COMPILED_DATABASE_CONFIGS = {
+    database_id: compile_database_config(db_config) for database_id, db_config in DATABASE_CONFIGS.items()
+}
+
+def register_database_config(database_id, db_config):
+    """
+    Register (or replace) the cleanup configuration of a database at runtime.
+    db_config follows the DATABASE_CONFIGS format: {"name": ..., "title_property": ..., "fields": {...}}.
+    """
+    compiled = compile_database_config(db_config)
+    DATABASE_CONFIGS[database_id] = db_config
+    COMPILED_DATABASE_CONFIGS[database_id] = compiled
+
 def clean_notion_database_response(notion_response, database_id):
     """
     General function to clean Notion database responses based on database configuration.
-    This function is scalable and can handle any database by adding its configuration.
+    This function is scalable and can handle any database by adding its configuration
+    (see register_database_config).
     
     Args:
         notion_response (list): List of Notion database items
@@ -10,249 +305,22 @@ def clean_notion_database_response(notion_response, database_id):
     Returns:
         list[dict]: Cleaned data based on the database configuration
     """
-    
-    # Database-specific field configurations
-    DATABASE_CONFIGS = {
-        "4542b3f7-39c3-47e0-9ecd-22c58437d812": {  # Notes DB
-            "name": "notes",
-            "title_property": "",  # Empty string is the title property for Notes
-            "fields": {
-                "page_id": {"type": "id"},
-                "created_by": {"type": "created_by", "property": "Created by", "extract": "name"},
-                "page_title": {"type": "title", "property": ""},
-                "page_url": {"type": "url"},
-                "status": {"type": "status", "property": "Status"},
-                "projects": {"type": "relation", "property": "Projects"},
-                "tags": {"type": "multi_select", "property": "Tags"}
-            }
-        },
-        "567db0a8-1efc-4123-9478-ef08bdb9db6a": {  # Projects DB
-            "name": "projects",
-            "title_property": "Project name",
-            "fields": {
-                "page_id": {"type": "id"},
-                "created_by_name": {"type": "created_by", "property": "Created by", "extract": "name"},
-                "created_by_id": {"type": "created_by", "property": "Created by", "extract": "id"},
-                "project_title": {"type": "title", "property": "Project name"},
-                "page_url": {"type": "url"},
-                "status": {"type": "status", "property": "Status"},
-                "priority": {"type": "select", "property": "Priority"},
-                "git_repo": {"type": "url_property", "property": "Git Repo"},
-                "project_manager_name": {"type": "people", "property": "Project Manager", "extract": "name", "single": True},
-                "project_manager_id": {"type": "people", "property": "Project Manager", "extract": "id", "single": True},
-                "project_type": {"type": "select", "property": "Project Type"},
-                "team_members": {"type": "people", "property": "People", "extract": "full"},
-                "production_url": {"type": "url_property", "property": "Production URL"},
-                "staging_url": {"type": "url_property", "property": "Staging URL "},
-                "tasks_count": {"type": "relation_count", "property": "Tasks"},
-                "project_dates": {"type": "date_range", "property": "Dates"},
-                "created_time": {"type": "timestamp", "property": "created_time"},
-                "last_edited_time": {"type": "timestamp", "property": "last_edited_time"}
-            }
-        },
-        "42fad9c5-af8f-4059-a906-ed6eedc6c571": {  # Tasks DB
-            "name": "tasks",
-            "title_property": "Task name",
-            "fields": {
-                "id": {"type": "id"},
-                "created_by_user_name": {"type": "created_by", "property": "Created by", "extract": "name"},
-                "created_by_user_id": {"type": "created_by", "property": "Created by", "extract": "id"},
-                "title": {"type": "title", "property": "Task name"},
-                "url": {"type": "url"},
-                "status": {"type": "status", "property": "Status"},
-                "priority": {"type": "select", "property": "Priority"},
-                "task_id": {"type": "unique_id", "property": "Task ID"},
-                "project_id": {"type": "relation", "property": "Project", "single": True},
-                "assignee_name": {"type": "people", "property": "Assignee", "extract": "name", "single": True},
-                "assignee_id": {"type": "people", "property": "Assignee", "extract": "id", "single": True},
-                "due_date": {"type": "date_start", "property": "Due"},
-                "urgency": {"type": "select", "property": "Urgency"},
-                "category": {"type": "select", "property": "Category"},
-                "tags": {"type": "multi_select", "property": "Tags"},
-                "execution_time": {"type": "formula", "property": "Execution time", "formula_type": "string"},
-                "over_due": {"type": "formula", "property": "Over Due", "formula_type": "boolean"},
-                "created_time": {"type": "timestamp", "property": "created_time"},
-                "last_edited_time": {"type": "timestamp", "property": "last_edited_time"},
-                "started_time": {"type": "date_start", "property": "Started time"},
-                "completed_time": {"type": "date_start", "property": "Completed Time"}
-            }
-        }
-    }
-    
-    def extract_field_value(item, field_config):
-        """Extract field value based on the field configuration"""
-        field_type = field_config["type"]
-        
-        if field_type == "id":
-            return item.get("id")
-        
-        elif field_type == "url":
-            return item.get("url")
-        
-        elif field_type == "timestamp":
-            return item.get(field_config["property"])
-        
-        elif field_type == "title":
-            title_property = item.get("properties", {}).get(field_config["property"])
-            if title_property and title_property.get("type") == "title":
-                title_content = title_property.get("title", [])
-                if title_content and len(title_content) > 0:
-                    return title_content[0].get("plain_text")
-            return None
-        
-        elif field_type == "created_by":
-            created_by_property = item.get("properties", {}).get(field_config["property"])
-            if created_by_property and created_by_property.get("type") == "created_by":
-                created_by_data = created_by_property.get("created_by")
-                if created_by_data and created_by_data.get("object") == "user":
-                    extract_type = field_config.get("extract", "name")
-                    return created_by_data.get(extract_type)
-            return None
-        
-        elif field_type == "status":
-            status_property = item.get("properties", {}).get(field_config["property"])
-            if not status_property:
-                # Try generic encoded property names
-                encoded_names = [
-                    f"notion%3A%2F%2F{DATABASE_CONFIGS.get(database_id, {}).get('name', 'unknown')}%2Fstatus_property"
-                ]
-                for encoded_name in encoded_names:
-                    status_property = item.get("properties", {}).get(encoded_name)
-                    if status_property:
-                        break
-            
-            if status_property and status_property.get("type") == "status":
-                status_data = status_property.get("status")
-                if status_data:
-                    return status_data.get("name")
-            return None
-        
-        elif field_type == "select":
-            select_property = item.get("properties", {}).get(field_config["property"])
-            if select_property and select_property.get("type") == "select":
-                select_data = select_property.get("select")
-                if select_data:
-                    return select_data.get("name")
-            return None
-        
-        elif field_type == "multi_select":
-            multi_select_property = item.get("properties", {}).get(field_config["property"])
-            if multi_select_property and multi_select_property.get("type") == "multi_select":
-                multi_select_list = multi_select_property.get("multi_select", [])
-                return [tag.get("name") for tag in multi_select_list if tag.get("name")]
-            return []
-        
-        elif field_type == "people":
-            people_property = item.get("properties", {}).get(field_config["property"])
-            if people_property and people_property.get("type") == "people":
-                people_list = people_property.get("people", [])
-                if people_list:
-                    extract_type = field_config.get("extract", "name")
-                    is_single = field_config.get("single", False)
-                    
-                    if extract_type == "full":
-                        # Return full person objects with id, name, email
-                        result = []
-                        for person in people_list:
-                            person_info = {
-                                "id": person.get("id"),
-                                "name": person.get("name"),
-                                "email": person.get("person", {}).get("email") if person.get("person") else None
-                            }
-                            result.append(person_info)
-                        return result
-                    else:
-                        # Return just names or ids
-                        result = [person.get(extract_type) for person in people_list if person.get(extract_type)]
-                        return result[0] if is_single and result else result
-            return None if field_config.get("single") else []
-        
-        elif field_type == "relation":
-            relation_property = item.get("properties", {}).get(field_config["property"])
-            if relation_property and relation_property.get("type") == "relation":
-                relation_list = relation_property.get("relation", [])
-                relation_ids = [rel.get("id") for rel in relation_list if rel.get("id")]
-                is_single = field_config.get("single", False)
-                return relation_ids[0] if is_single and relation_ids else relation_ids
-            return None if field_config.get("single") else []
-        
-        elif field_type == "relation_count":
-            relation_property = item.get("properties", {}).get(field_config["property"])
-            if relation_property and relation_property.get("type") == "relation":
-                relation_list = relation_property.get("relation", [])
-                return len(relation_list)
-            return 0
-        
-        elif field_type == "url_property":
-            url_property = item.get("properties", {}).get(field_config["property"])
-            if url_property and url_property.get("type") == "url":
-                return url_property.get("url")
-            return None
-        
-        elif field_type == "date_start":
-            date_property = item.get("properties", {}).get(field_config["property"])
-            if date_property and date_property.get("type") == "date":
-                date_data = date_property.get("date")
-                if date_data:
-                    return date_data.get("start")
-            return None
-        
-        elif field_type == "date_range":
-            date_property = item.get("properties", {}).get(field_config["property"])
-            if date_property and date_property.get("type") == "date":
-                date_data = date_property.get("date")
-                if date_data:
-                    return {
-                        "start": date_data.get("start"),
-                        "end": date_data.get("end")
-                    }
-            return None
-        
-        elif field_type == "unique_id":
-            unique_id_property = item.get("properties", {}).get(field_config["property"])
-            if unique_id_property and unique_id_property.get("type") == "unique_id":
-                unique_id_data = unique_id_property.get("unique_id")
-                if unique_id_data:
-                    prefix = unique_id_data.get("prefix", "")
-                    number = unique_id_data.get("number")
-                    if number is not None:
-                        return f"{prefix}{number}" if prefix else str(number)
-            return None
-        
-        elif field_type == "formula":
-            formula_property = item.get("properties", {}).get(field_config["property"])
-            if formula_property and formula_property.get("type") == "formula":
-                formula_data = formula_property.get("formula")
-                expected_type = field_config.get("formula_type", "string")
-                if formula_data and formula_data.get("type") == expected_type:
-                    return formula_data.get(expected_type)
-            return None
-        
-        return None
-    
     # Validate input
     if not isinstance(notion_response, list):
         print("Error: Invalid Notion response format. notion_response is not a list.")
         return []
     
-    # Get database configuration
-    db_config = DATABASE_CONFIGS.get(database_id)
-    if not db_config:
+    # Get compiled database configuration
+    extractors = COMPILED_DATABASE_CONFIGS.get(database_id)
+    if not extractors:
         print(f"Warning: No configuration found for database {database_id}. Using generic extraction.")
         # Fall back to generic extraction for unknown databases
         return _extract_generic_database_response(notion_response)
     
     cleaned_data = []
-    
     for item in notion_response:
-        extracted_item = {}
-        
-        # Extract each configured field
-        for field_name, field_config in db_config["fields"].items():
-            extracted_item[field_name] = extract_field_value(item, field_config)
-        
-        cleaned_data.append(extracted_item)
-    
+        properties = item.get("properties", {})
+        cleaned_data.append({field_name: extract(item, properties) for field_name, extract in extractors})
     return cleaned_data
 
 def _extract_generic_database_response(notion_response):
@@ -1,16 +1,44 @@
 import os
+from typing import Optional
 
-def limit_response_length(response: str, max_length: int = 20000, remove_whitespace: bool = True, page_number: int = 1) -> str:
+from utils.metrics import RESPONSE_BYTES, RESPONSE_PAGES
+from utils.result_store import RESULT_STORE
+
+def limit_response_length(response: str, max_length: int = 20000, remove_whitespace: bool = True, page_number: int = 1, owner: Optional[str] = None) -> str:
     """
     Limit the response length to a fixed page_length per page, supporting pagination.
     If remove_whitespace is True, remove all whitespace from the response before paginating.
     page_number is 1-based. Returns the correct slice and a message about total pages and how to get the next page.
     page_length is taken from the NOTION_TOOL_PAGE_LENGTH env variable if not provided, otherwise defaults to 10000.
+    Responses spanning more than one page are kept in the result store; the message then includes a
+    result_handle that get_stored_page can use to serve the other pages without rebuilding the response.
+    owner identifies the call that produced the response; only get_stored_page calls with the same owner get it back.
     """
-    page_length = int(os.getenv("NOTION_TOOL_PAGE_LENGTH", 10000))
-    
     if remove_whitespace:
         response = ''.join(response.split())
+    page_length = _page_length()
+    RESPONSE_BYTES.observe(len(response))
+    RESPONSE_PAGES.observe(max(1, (len(response) + page_length - 1) // page_length))
+    result_handle = None
+    if len(response) > page_length:
+        result_handle = RESULT_STORE.put(response, owner=owner)
+    return _render_page(response, page_number, result_handle)
+
+def get_stored_page(result_handle: str, page_number: int = 1, owner: Optional[str] = None) -> Optional[str]:
+    """
+    Return the requested page of a response previously stored by limit_response_length,
+    or None if the handle is unknown, has expired or belongs to a different owner.
+    """
+    response = RESULT_STORE.get(result_handle, owner=owner)
+    if response is None:
+        return None
+    return _render_page(response, page_number, result_handle)
+
+def _page_length() -> int:
+    return int(os.getenv("NOTION_TOOL_PAGE_LENGTH", 10000))
+
+def _render_page(response: str, page_number: int, result_handle: Optional[str] = None) -> str:
+    page_length = _page_length()
     total_length = len(response)
     if total_length == 0:
         return "[No content to display]"
@@ -23,8 +51,10 @@ def limit_response_length(response: str, max_length: int = 20000, remove_whitesp
     page_content = response[start:end]
     msg = f"\n\n[Page {page_number}/{total_pages}. Showing characters {start+1}-{end} of {total_length} characters. "
     if page_number < total_pages:
-        msg += f"To get the next page, call the tool with page_number={page_number+1}]"
+        msg += f"To get the next page, call the tool with page_number={page_number+1}"
+        if result_handle:
+            msg += f" and result_handle={result_handle}"
+        msg += "]"
     else:
         msg += "End of content.]"
     return page_content + msg
-
@@ -0,0 +1,120 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DEFAULT_MAX_AGES = "search=30,query_database=15,retrieve_full_page=60,retrieve_block=60,retrieve_block_children=30"
+
+
+def parse_max_ages(spec: str) -> Dict[str, int]:
+    """Parse "action=seconds,..." into a dict; the "default" action applies to unlisted actions."""
+    max_ages = {}
+    for part in spec.split(","):
+        if "=" in part:
+            action, seconds = part.split("=", 1)
+            max_ages[action.strip()] = int(seconds)
+    return max_ages
+
+
+def cache_control(action: Optional[str], max_ages: Optional[Dict[str, int]] = None) -> str:
+    """Cache-Control for a read tool action. Responses depend on the caller's token, so they are private."""
+    if max_ages is None:
+        max_ages = parse_max_ages(os.getenv("NOTION_READ_CACHE_MAX_AGE", DEFAULT_MAX_AGES))
+    max_age = max_ages.get(action, max_ages.get("default", 0))
+    return f"private, max-age={max_age}" if max_age > 0 else "private, no-cache"
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match comparison (RFC 9110: weak comparison, list of tags or "*")."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return etag in [tag[2:] if tag.startswith("W/") else tag for tag in candidates]
+
+
+class ResponseValidators:
+    """
+    Strong ETags for read tool responses.
+
+    A validator key combines the tool call (name and canonical arguments) with a freshness token
+    derived from Notion's last_edited_time values. The ETag is a hash of that key and of the
+    response body. The content hash of the latest body per key is remembered, so a request whose
+    freshness token is unchanged can be answered 304 without recomputing the response.
+    """
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._content_hashes = OrderedDict()
+        self._lock = threading.Lock()
+        self.not_modified = 0
+
+    @staticmethod
+    def validator_key(tool_name: str, arguments: dict, freshness_token: str) -> str:
+        canonical = json.dumps(arguments, sort_keys=True, separators=(',', ':'), default=str)
+        return hashlib.sha256(f"{tool_name}\n{canonical}\n{freshness_token}".encode()).hexdigest()
+
+    @staticmethod
+    def _etag(validator_key: str, content_hash: str) -> str:
+        return '"' + hashlib.sha256(f"{validator_key}:{content_hash}".encode()).hexdigest()[:32] + '"'
+
+    def current_etag(self, validator_key: str) -> Optional[str]:
+        """ETag of the last response seen for this key, if any, without recomputing it."""
+        with self._lock:
+            content_hash = self._content_hashes.get(validator_key)
+            if content_hash is not None:
+                self._content_hashes.move_to_end(validator_key)
+        return self._etag(validator_key, content_hash) if content_hash else None
+
+    def etag_for(self, validator_key: str, body: bytes) -> str:
+        """ETag of a freshly computed body; remembered for later revalidation."""
+        content_hash = hashlib.sha256(body).hexdigest()
+        with self._lock:
+            self._content_hashes[validator_key] = content_hash
+            self._content_hashes.move_to_end(validator_key)
+            while len(self._content_hashes) > self.max_entries:
+                self._content_hashes.popitem(last=False)
+        return self._etag(validator_key, content_hash)
+
+    def revalidate(self, tool_name: str, arguments: dict, freshness_token: Optional[str], if_none_match: Optional[str]) -> tuple:
+        """
+        Before running a call: return (validator_key, etag). validator_key is None when the call has no
+        freshness token; etag is set only when the client's copy is still current and 304 can be sent.
+        """
+        if not freshness_token:
+            return None, None
+        validator_key = self.validator_key(tool_name, arguments, freshness_token)
+        etag = self.current_etag(validator_key)
+        if etag and etag_matches(if_none_match, etag):
+            self._record_not_modified()
+            return validator_key, etag
+        return validator_key, None
+
+    def finish(self, validator_key: Optional[str], body: bytes, if_none_match: Optional[str]) -> tuple:
+        """After running a call: return (etag or None, whether the client's copy matches the new body)."""
+        if validator_key is None:
+            return None, False
+        etag = self.etag_for(validator_key, body)
+        if etag_matches(if_none_match, etag):
+            self._record_not_modified()
+            return etag, True
+        return etag, False
+
+    def _record_not_modified(self) -> None:
+        with self._lock:
+            self.not_modified += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"validators": len(self._content_hashes), "not_modified": self.not_modified}
+
+
+# Shared by the Flask and ASGI tool endpoints
+RESPONSE_VALIDATORS = ResponseValidators()
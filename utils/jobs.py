@@ -0,0 +1,231 @@
+import contextvars
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DEFAULT_JOB_STORE_PATH = os.path.join(os.path.dirname(__file__), "..", ".cache", "jobs.sqlite3")
+
+QUEUED, RUNNING, SUCCEEDED, FAILED = "queued", "running", "succeeded", "failed"
+
+# This process, as recorded on the jobs it creates: a pid alone may be reused after a reboot or a
+# container restart, so it is stored with the host's boot id and an id of this process run
+PROCESS_ID = uuid.uuid4().hex
+
+
+def _read_boot_id() -> str:
+    try:
+        with open("/proc/sys/kernel/random/boot_id") as f:
+            return f.read().strip()
+    except OSError:
+        return ""
+
+
+BOOT_ID = _read_boot_id()
+
+
+def _owner_alive(pid: Optional[int], boot_id: Optional[str], process_id: Optional[str]) -> bool:
+    """Whether the process that created a job is still running."""
+    if pid is None or boot_id != BOOT_ID:
+        return False
+    if pid == os.getpid():
+        return process_id == PROCESS_ID
+    if os.name != "posix":
+        # os.kill would terminate the process on Windows; assume it is alive
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class JobStore:
+    """
+    On-disk record of tool calls run as background jobs: status, progress counters and the
+    final result. Finished jobs survive a restart and are kept for ttl seconds. Each job records
+    the process that owns it; on startup, queued or running jobs whose owner is no longer alive
+    are marked failed, while those of other live processes sharing the store are left alone.
+    """
+
+    def __init__(self, path: str = DEFAULT_JOB_STORE_PATH, ttl: float = 24 * 3600):
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                job_id TEXT PRIMARY KEY,
+                tool TEXT NOT NULL,
+                arguments TEXT NOT NULL,
+                status TEXT NOT NULL,
+                progress TEXT NOT NULL,
+                result TEXT,
+                error TEXT,
+                created_at REAL NOT NULL,
+                started_at REAL,
+                finished_at REAL,
+                owner_pid INTEGER,
+                owner_boot_id TEXT,
+                owner_process_id TEXT
+            )
+            """
+        )
+        # Stores created before jobs had owners
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+        for column, column_type in (("owner_pid", "INTEGER"), ("owner_boot_id", "TEXT"), ("owner_process_id", "TEXT")):
+            if column not in columns:
+                self._conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {column_type}")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_created ON jobs (created_at)")
+        unfinished = self._conn.execute(
+            "SELECT job_id, owner_pid, owner_boot_id, owner_process_id FROM jobs WHERE status IN (?, ?)", (QUEUED, RUNNING)
+        ).fetchall()
+        now = time.time()
+        self._conn.executemany(
+            "UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE job_id = ?",
+            [(FAILED, "Interrupted by a server restart; submit the call again", now, job_id) for job_id, *owner in unfinished if not _owner_alive(*owner)],
+        )
+        self._conn.commit()
+
+    def create(self, tool: str, arguments: dict) -> str:
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            self._conn.execute("DELETE FROM jobs WHERE created_at < ?", (now - self.ttl,))
+            self._conn.execute(
+                "INSERT INTO jobs (job_id, tool, arguments, status, progress, created_at, owner_pid, owner_boot_id, owner_process_id) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (job_id, tool, json.dumps(arguments, default=str), QUEUED, "{}", now, os.getpid(), BOOT_ID, PROCESS_ID),
+            )
+            self._conn.commit()
+        return job_id
+
+    def update(self, job_id: str, **fields) -> None:
+        if "progress" in fields:
+            fields["progress"] = json.dumps(fields["progress"])
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with self._lock:
+            self._conn.execute(f"UPDATE jobs SET {assignments} WHERE job_id = ?", (*fields.values(), job_id))
+            self._conn.commit()
+
+    def get(self, job_id: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT job_id, tool, status, progress, result, error, created_at, started_at, finished_at FROM jobs WHERE job_id = ?",
+                (job_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        job = dict(zip(("job_id", "tool", "status", "progress", "result", "error", "created_at", "started_at", "finished_at"), row))
+        job["progress"] = json.loads(job["progress"])
+        return job
+
+
+class _Progress:
+    def __init__(self):
+        self.counts: Dict[str, int] = {}
+        self.lock = threading.Lock()
+
+
+_current_progress: contextvars.ContextVar[Optional[_Progress]] = contextvars.ContextVar("current_job_progress", default=None)
+
+
+def report_progress(**counts: int) -> None:
+    """Add to the running job's progress counters (e.g. blocks=100); a no-op outside a job."""
+    progress = _current_progress.get()
+    if progress is None:
+        return
+    with progress.lock:
+        for name, count in counts.items():
+            progress.counts[name] = progress.counts.get(name, 0) + count
+
+
+class JobRunner:
+    """
+    Runs tool calls on a bounded worker pool and records them in a JobStore. Progress reported
+    by a running call (see report_progress) is read live; it is stored once the job finishes.
+    """
+
+    def __init__(self, store: JobStore, workers: int = 4):
+        self.store = store
+        self.workers = workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+        self._running: Dict[str, _Progress] = {}
+
+    def _pool(self) -> ThreadPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="job")
+            return self._executor
+
+    def submit(self, tool: str, arguments: dict, run: Callable[[], str]) -> str:
+        """Queue run() as a job and return its id immediately."""
+        job_id = self.store.create(tool, arguments)
+        self._pool().submit(self._run, job_id, run)
+        return job_id
+
+    def _run(self, job_id: str, run: Callable[[], str]) -> None:
+        progress = self._running[job_id] = _Progress()
+        self.store.update(job_id, status=RUNNING, started_at=time.time())
+        context = contextvars.copy_context()
+        context.run(_current_progress.set, progress)
+        try:
+            result = context.run(run)
+            fields = {"status": SUCCEEDED, "result": result if isinstance(result, str) else json.dumps(result, default=str)}
+        except Exception as e:
+            fields = {"status": FAILED, "error": str(e)}
+        with progress.lock:
+            counts = dict(progress.counts)
+        self.store.update(job_id, progress=counts, finished_at=time.time(), **fields)
+        self._running.pop(job_id, None)
+
+    def get(self, job_id: str) -> Optional[dict]:
+        """The stored job, with live progress counters while it is running."""
+        progress = self._running.get(job_id)
+        job = self.store.get(job_id)
+        if job is not None and progress is not None and job["status"] == RUNNING:
+            with progress.lock:
+                job["progress"] = dict(progress.counts)
+        return job
+
+    def shutdown(self) -> None:
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+
+
+_job_runner: Optional[JobRunner] = None
+_job_runner_lock = threading.Lock()
+
+
+def get_job_runner() -> JobRunner:
+    """
+    The process-wide job runner, created on first use so that modules reporting progress can be
+    imported without opening the store (which marks unfinished jobs of a previous run as failed).
+    """
+    global _job_runner
+    with _job_runner_lock:
+        if _job_runner is None:
+            store = JobStore(path=os.getenv("JOB_STORE_PATH", DEFAULT_JOB_STORE_PATH), ttl=float(os.getenv("JOB_TTL", 24 * 3600)))
+            _job_runner = JobRunner(store, workers=int(os.getenv("JOB_WORKERS", 4)))
+        return _job_runner
+
+
+def async_requested(value: Optional[str]) -> bool:
+    """Job mode is opt-in per call with ?async=1."""
+    return bool(value) and value.lower() in ("1", "true", "yes")
@@ -0,0 +1,284 @@
+import asyncio
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from agency_swarm.tools.mcp import MCPServer
+from dotenv import load_dotenv
+from mcp.shared.exceptions import McpError
+
+from utils.metrics import MCP_CALL_LATENCY, MCP_CALLS, MCP_SPAWN_LATENCY, MCP_SPAWNS, REGISTRY, gauge_lines
+
+load_dotenv()
+
+
+class _Slot:
+    """One server process of the pool: the connected server, or None while it (re)starts."""
+
+    def __init__(self, index: int):
+        self.index = index
+        self.server: Optional[MCPServer] = None
+        self.in_flight = 0
+        self.restarts = 0
+        self.restart: Optional[asyncio.Event] = None
+
+
+class MCPServerPool:
+    """
+    Long-lived MCP server processes shared by every caller in the process. The servers live on
+    one background event loop; each is started, kept and stopped by its own supervisor task
+    (the stdio transport must be closed by the task that opened it) and restarted when it fails
+    to start, a call fails at the transport level or times out, or it misses a health-check ping.
+    Calls go to the ready server with the fewest calls in flight.
+    """
+
+    def __init__(self, name: str, factory: Callable[[], MCPServer], size: int = 2, call_timeout: float = 60.0, start_timeout: float = 60.0, health_interval: float = 30.0):
+        self.name = name
+        self.factory = factory
+        self.size = max(1, size)
+        self.call_timeout = call_timeout
+        self.start_timeout = start_timeout
+        self.health_interval = health_interval
+        self._slots = [_Slot(index) for index in range(self.size)]
+        self._tools = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._ready: Optional[asyncio.Event] = None
+        self._closing = False
+        self._tasks: List[asyncio.Task] = []
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        """Start the pool's event loop and begin spawning servers; returns without waiting for them."""
+        with self._lock:
+            if self._loop is not None:
+                return
+            self._loop = asyncio.new_event_loop()
+            self._closing, self._tasks = False, []
+            threading.Thread(target=self._loop.run_forever, name=f"mcp-pool-{self.name}", daemon=True).start()
+            # Scheduled under the lock so it runs before anything submitted by other threads
+            started = asyncio.run_coroutine_threadsafe(self._start(), self._loop)
+        started.result()
+
+    async def _start(self) -> None:
+        self._ready = asyncio.Event()
+        for slot in self._slots:
+            slot.restart = asyncio.Event()
+            self._tasks.append(asyncio.ensure_future(self._supervise(slot)))
+        self._tasks.append(asyncio.ensure_future(self._health_check()))
+
+    def _submit(self, coroutine):
+        self.start()
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop)
+
+    def warm_up(self, timeout: Optional[float] = None) -> bool:
+        """Start the pool and wait until at least one server is ready; False if none came up in time."""
+        try:
+            self._submit(self._ready_slot()).result(timeout or self.start_timeout)
+            return True
+        except Exception as e:
+            print(f"MCP server pool {self.name} did not warm up: {e}")
+            return False
+
+    async def _supervise(self, slot: _Slot) -> None:
+        failures = 0
+        while not self._closing:
+            started_at = time.perf_counter()
+            server = self.factory()
+            try:
+                # Not wrapped in a timeout: connect() leaves the transport's cancel scopes open in this
+                # task. A server that never comes up only holds its slot; callers give up after start_timeout.
+                await server.connect()
+            except Exception as e:
+                failures += 1
+                MCP_SPAWNS.inc(self.name, "error")
+                print(f"MCP server {self.name}[{slot.index}] failed to start: {e}")
+                await server.cleanup()
+                await asyncio.sleep(min(30, 2 ** (failures - 1)))
+                continue
+            failures = 0
+            MCP_SPAWNS.inc(self.name, "ok")
+            MCP_SPAWN_LATENCY.observe(time.perf_counter() - started_at, self.name)
+            slot.server = server
+            self._ready.set()
+            await slot.restart.wait()
+            slot.restart.clear()
+            slot.server = None
+            await server.cleanup()
+
+    def _restart(self, slot: _Slot, server: MCPServer) -> None:
+        # Only the server that failed is replaced; a restart may already be under way
+        if slot.server is server:
+            slot.server = None
+            slot.restarts += 1
+            slot.restart.set()
+
+    async def _ready_slot(self) -> _Slot:
+        deadline = time.monotonic() + self.start_timeout
+        while True:
+            ready = [slot for slot in self._slots if slot.server is not None]
+            if ready:
+                return min(ready, key=lambda slot: slot.in_flight)
+            self._ready.clear()
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(f"No {self.name} MCP server ready after {self.start_timeout:.0f}s")
+            try:
+                await asyncio.wait_for(self._ready.wait(), remaining)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _health_check(self) -> None:
+        while not self._closing:
+            await asyncio.sleep(self.health_interval)
+            for slot in self._slots:
+                server = slot.server
+                if server is None or slot.in_flight:
+                    continue
+                try:
+                    await asyncio.wait_for(server.session.send_ping(), self.call_timeout)
+                except Exception as e:
+                    print(f"MCP server {self.name}[{slot.index}] failed its health check, restarting: {e!r}")
+                    self._restart(slot, server)
+
+    async def _call_tool(self, tool_name: str, arguments: Optional[dict]):
+        slot = await self._ready_slot()
+        server = slot.server
+        slot.in_flight += 1
+        started_at = time.perf_counter()
+        status = "error"
+        try:
+            result = await asyncio.wait_for(server.call_tool(tool_name, arguments), self.call_timeout)
+            status = "ok"
+            return result
+        except McpError:
+            # The server answered with an error, so it is still healthy
+            raise
+        except Exception:
+            self._restart(slot, server)
+            raise
+        finally:
+            slot.in_flight -= 1
+            MCP_CALLS.inc(self.name, tool_name, status)
+            MCP_CALL_LATENCY.observe(time.perf_counter() - started_at, self.name, tool_name)
+
+    async def _list_tools(self) -> list:
+        if self._tools is None:
+            slot = await self._ready_slot()
+            self._tools = await asyncio.wait_for(slot.server.list_tools(), self.call_timeout)
+        return self._tools
+
+    async def alist_tools(self) -> list:
+        return await asyncio.wrap_future(self._submit(self._list_tools()))
+
+    async def acall_tool(self, tool_name: str, arguments: Optional[dict]):
+        return await asyncio.wrap_future(self._submit(self._call_tool(tool_name, arguments)))
+
+    async def aready(self) -> None:
+        await asyncio.wrap_future(self._submit(self._ready_slot()))
+
+    def server(self) -> "PooledMCPServer":
+        return PooledMCPServer(self)
+
+    def stats(self) -> dict:
+        return {
+            "size": self.size,
+            "ready": sum(slot.server is not None for slot in self._slots),
+            "in_flight": sum(slot.in_flight for slot in self._slots),
+            "restarts": sum(slot.restarts for slot in self._slots),
+        }
+
+    def close(self, timeout: float = 10.0) -> None:
+        """Stop every server process and the pool's event loop."""
+        with self._lock:
+            loop, self._loop = self._loop, None
+        if loop is None:
+            return
+        self._closing = True
+
+        async def stop():
+            for slot in self._slots:
+                slot.restart.set()
+            # Each supervisor closes its own server; whatever is still starting or sleeping is cancelled
+            _, pending = await asyncio.wait(self._tasks[:-1], timeout=timeout)
+            for task in list(pending) + self._tasks[-1:]:
+                task.cancel()
+
+        asyncio.run_coroutine_threadsafe(stop(), loop).result(timeout + 1)
+        loop.call_soon_threadsafe(loop.stop)
+
+
+class PooledMCPServer(MCPServer):
+    """
+    MCP server handle for an Agent backed by a pool. connect() only waits for a ready server and
+    cleanup() does nothing, so the per-call connect/cleanup done by agency_swarm's MCP tools no
+    longer starts and stops a process. Usable from any event loop or thread.
+    """
+
+    def __init__(self, pool: MCPServerPool):
+        self.pool = pool
+        self._strict = False
+
+    @property
+    def name(self) -> str:
+        return self.pool.name
+
+    @property
+    def strict(self) -> bool:
+        return self._strict
+
+    async def connect(self):
+        await self.pool.aready()
+
+    async def cleanup(self):
+        pass
+
+    async def list_tools(self):
+        return await self.pool.alist_tools()
+
+    async def call_tool(self, tool_name: str, arguments: Optional[dict[str, Any]]):
+        return await self.pool.acall_tool(tool_name, arguments)
+
+
+_pools: Dict[Tuple, MCPServerPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_mcp_pool(name: str, config: dict, factory: Callable[[], MCPServer]) -> MCPServerPool:
+    """
+    The process-wide pool for a server name and configuration (e.g. its environment), created on
+    first use and shared across calls and threads. Sized and timed by MCP_POOL_SIZE,
+    MCP_CALL_TIMEOUT, MCP_START_TIMEOUT and MCP_HEALTH_INTERVAL.
+    """
+    key = (name, tuple(sorted(config.items())))
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = MCPServerPool(
+                name,
+                factory,
+                size=int(os.getenv("MCP_POOL_SIZE", 2)),
+                call_timeout=float(os.getenv("MCP_CALL_TIMEOUT", 60)),
+                start_timeout=float(os.getenv("MCP_START_TIMEOUT", 60)),
+                health_interval=float(os.getenv("MCP_HEALTH_INTERVAL", 30)),
+            )
+        return pool
+
+
+def _pool_lines() -> List[str]:
+    samples = {"ready": {}, "in_flight": {}, "restarts": {}}
+    with _pools_lock:
+        pools = list(_pools.values())
+    # Pools of one server name with different configurations are reported together
+    for pool in pools:
+        for field, value in pool.stats().items():
+            if field in samples:
+                samples[field][(pool.name,)] = samples[field].get((pool.name,), 0) + value
+    return (
+        gauge_lines("mcp_pool_servers_ready", "MCP server processes connected and ready.", samples["ready"], ("server",))
+        + gauge_lines("mcp_pool_calls_in_flight", "MCP tool calls running on the pool.", samples["in_flight"], ("server",))
+        + gauge_lines("mcp_server_restarts_total", "MCP server processes restarted after a failure.", samples["restarts"], ("server",), kind="counter")
+    )
+
+
+REGISTRY.add_collector(_pool_lines)
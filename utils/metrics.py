@@ -0,0 +1,251 @@
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+BYTE_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+PAGE_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100)
+RATIO_BUCKETS = (1, 1.5, 2, 3, 4, 6, 8, 12, 16, 32)
+
+
+class _ThreadShards:
+    """
+    One dict per thread, written only by its own thread, so recording takes no lock. The lock is
+    only taken the first time a thread records and when shards are collected; shards of threads
+    that have exited are folded into a retired shard so short-lived pool threads do not pile up.
+    """
+
+    def __init__(self, merge: Callable[[dict, tuple, object], None]):
+        self._merge = merge
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._shards: List[Tuple[threading.Thread, dict]] = []
+        self._retired: dict = {}
+
+    def shard(self) -> dict:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = {}
+            with self._lock:
+                self._shards.append((threading.current_thread(), shard))
+        return shard
+
+    def collect(self) -> dict:
+        with self._lock:
+            live = []
+            for thread, shard in self._shards:
+                if thread.is_alive():
+                    live.append((thread, shard))
+                else:
+                    for labels, value in list(shard.items()):
+                        self._merge(self._retired, labels, value)
+            self._shards = live
+            merged = {}
+            for labels, value in list(self._retired.items()):
+                self._merge(merged, labels, value)
+            for _, shard in live:
+                # list() copies the items atomically while the owning thread may keep writing
+                for labels, value in list(shard.items()):
+                    self._merge(merged, labels, value)
+        return merged
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Iterable[str], values: Iterable[object]) -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._shards = _ThreadShards(self._merge)
+
+    @staticmethod
+    def _merge(target: dict, labels: tuple, value) -> None:
+        target[labels] = target.get(labels, 0) + value
+
+    def inc(self, *labels, amount: float = 1) -> None:
+        shard = self._shards.shard()
+        shard[labels] = shard.get(labels, 0) + amount
+
+    def values(self) -> Dict[tuple, float]:
+        return self._shards.collect()
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self.values().items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (), buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = tuple(sorted(buckets))
+        self._shards = _ThreadShards(self._merge)
+
+    @staticmethod
+    def _merge(target: dict, labels: tuple, value: list) -> None:
+        existing = target.get(labels)
+        target[labels] = list(value) if existing is None else [a + b for a, b in zip(existing, value)]
+
+    def observe(self, value: float, *labels) -> None:
+        shard = self._shards.shard()
+        # Per-bucket (non-cumulative) counts, then one overflow slot, the sum and the count
+        state = shard.get(labels)
+        if state is None:
+            state = shard[labels] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+        index = 0
+        while index < len(self.buckets) and value > self.buckets[index]:
+            index += 1
+        state[index] += 1
+        state[-2] += value
+        state[-1] += 1
+
+    def values(self) -> Dict[tuple, list]:
+        return self._shards.collect()
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        bucket_labelnames = self.labelnames + ("le",)
+        for labels, state in sorted(self.values().items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), state[:len(self.buckets) + 1]):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _format_value(bound)
+                lines.append(f"{self.name}_bucket{_format_labels(bucket_labelnames, labels + (le,))} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(state[-2])}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {state[-1]}")
+        return lines
+
+
+class MetricsRegistry:
+    """Metrics rendered in the Prometheus text exposition format."""
+
+    def __init__(self):
+        self._metrics = []
+        self._collectors: List[Callable[[], List[str]]] = []
+
+    def counter(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+        metric = Counter(name, documentation, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (), buckets: Tuple[float, ...] = LATENCY_BUCKETS) -> Histogram:
+        metric = Histogram(name, documentation, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Callable[[], List[str]]) -> None:
+        """collector() returns ready exposition lines, computed at scrape time."""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for collector in self._collectors:
+            lines.extend(collector())
+        return "\n".join(lines) + "\n"
+
+
+def gauge_lines(name: str, documentation: str, samples: Dict[tuple, float], labelnames: Tuple[str, ...] = (), kind: str = "gauge") -> List[str]:
+    """Exposition lines for values read from elsewhere at scrape time."""
+    lines = [f"# HELP {name} {documentation}", f"# TYPE {name} {kind}"]
+    for labels, value in sorted(samples.items()):
+        lines.append(f"{name}{_format_labels(labelnames, labels)} {_format_value(value)}")
+    return lines
+
+
+REGISTRY = MetricsRegistry()
+
+TOOL_REQUESTS = REGISTRY.counter("tool_requests_total", "Tool endpoint calls by outcome.", ("tool", "action", "status"))
+TOOL_LATENCY = REGISTRY.histogram("tool_request_duration_seconds", "Tool endpoint latency.", ("tool", "action"))
+NOTION_REQUESTS = REGISTRY.counter("notion_api_requests_total", "Notion API requests (every attempt, including retries).", ("endpoint", "status"))
+NOTION_LATENCY = REGISTRY.histogram("notion_api_request_duration_seconds", "Notion API request latency per attempt.", ("endpoint",))
+RESPONSE_BYTES = REGISTRY.histogram("tool_response_bytes", "Size of tool responses before pagination by limit_response_length.", buckets=BYTE_BUCKETS)
+RESPONSE_PAGES = REGISTRY.histogram("tool_response_pages", "Pages a tool response is split into by limit_response_length.", buckets=PAGE_BUCKETS)
+COMPRESSION_INPUT_BYTES = REGISTRY.counter("http_compression_input_bytes_total", "Response bytes before compression.", ("encoding",))
+COMPRESSION_OUTPUT_BYTES = REGISTRY.counter("http_compression_output_bytes_total", "Response bytes after compression.", ("encoding",))
+COMPRESSION_CPU_SECONDS = REGISTRY.counter("http_compression_cpu_seconds_total", "Thread CPU time spent compressing responses.", ("encoding",))
+COMPRESSION_RATIO = REGISTRY.histogram("http_compression_ratio", "Uncompressed / compressed size per response.", ("encoding",), buckets=RATIO_BUCKETS)
+MCP_SPAWNS = REGISTRY.counter("mcp_server_spawns_total", "MCP server processes started, by outcome.", ("server", "status"))
+MCP_SPAWN_LATENCY = REGISTRY.histogram("mcp_server_spawn_duration_seconds", "Time to start an MCP server process and initialise its session.", ("server",))
+MCP_CALLS = REGISTRY.counter("mcp_tool_calls_total", "MCP tool calls made through a server pool.", ("server", "tool", "status"))
+MCP_CALL_LATENCY = REGISTRY.histogram("mcp_tool_call_duration_seconds", "MCP tool call latency on a pooled server.", ("server", "tool"))
+SLACK_QUERIES = REGISTRY.counter("slack_queries_total", "SlackMCPTool queries by route: fast_path, fallback (recognised, direct call failed) or llm.", ("route", "operation"))
+
+
+def observe_tool_call(tool: str, action: Optional[str], status: str, seconds: float) -> None:
+    action = action if isinstance(action, str) else ""
+    TOOL_REQUESTS.inc(tool, action, status)
+    TOOL_LATENCY.observe(seconds, tool, action)
+
+
+_VERBS = {"GET": "retrieve", "POST": "create", "PATCH": "update", "DELETE": "delete"}
+
+
+def notion_endpoint(method: str, path: str) -> str:
+    """Stable endpoint name for a Notion API path, e.g. GET blocks/<id>/children -> blocks.children.list."""
+    parts = path.strip("/").split("/")
+    # Notion paths alternate resource names and ids: blocks/<id>/children, pages/<id>/properties/<id>
+    names = parts[0::2]
+    if names[-1] in ("search", "query"):
+        return ".".join(names)
+    method = method.upper()
+    if method == "GET":
+        verb = "list" if len(parts) % 2 == 1 else "retrieve"
+    elif method == "PATCH" and names[-1] == "children":
+        verb = "append"
+    else:
+        verb = _VERBS.get(method, method.lower())
+    return ".".join(names + [verb])
+
+
+def _cache_lines() -> List[str]:
+    from utils import page_blocks_cleanup
+    from utils.http_cache import RESPONSE_VALIDATORS
+    from utils.notion_api import get_client_metrics
+    from utils.result_store import RESULT_STORE
+    from utils.single_flight import TOOL_CALLS
+    from utils.slack_directory import SLACK_DIRECTORY
+
+    hits, misses = {}, {}
+    if page_blocks_cleanup.BLOCK_CACHE is not None:
+        block_cache = page_blocks_cleanup.BLOCK_CACHE.stats()
+        hits[("block_tree",)], misses[("block_tree",)] = block_cache["hits"], block_cache["misses"]
+    result_store = RESULT_STORE.stats()
+    hits[("result_store",)], misses[("result_store",)] = result_store["hits"], result_store["misses"]
+    single_flight = TOOL_CALLS.stats()
+    # A coalesced call is served without its own execution
+    hits[("single_flight",)], misses[("single_flight",)] = single_flight["coalesced"], single_flight["executions"]
+    for kind, directory in SLACK_DIRECTORY.stats().items():
+        hits[(f"slack_{kind}",)], misses[(f"slack_{kind}",)] = directory["hits"], directory["misses"]
+    ratios = {labels: round(hits[labels] / (hits[labels] + misses[labels]), 4) if hits[labels] + misses[labels] else 0.0 for labels in hits}
+
+    client = get_client_metrics()
+    return (
+        gauge_lines("cache_hits_total", "Cache lookups answered from the cache.", hits, ("cache",), kind="counter")
+        + gauge_lines("cache_misses_total", "Cache lookups that missed.", misses, ("cache",), kind="counter")
+        + gauge_lines("cache_hit_ratio", "Hits / (hits + misses) since start.", ratios, ("cache",))
+        + gauge_lines("http_not_modified_total", "Read tool calls answered 304 Not Modified.", {(): RESPONSE_VALIDATORS.stats()["not_modified"]}, kind="counter")
+        + gauge_lines("notion_api_retries_total", "Notion API requests retried.", {(): client["retries"]}, kind="counter")
+        + gauge_lines("notion_api_rate_limited_total", "Notion API 429 responses.", {(): client["rate_limited_responses"]}, kind="counter")
+        + gauge_lines("notion_api_throttled_seconds_total", "Seconds spent waiting on the rate limiter and Retry-After.", {(): client["throttled_seconds"]}, kind="counter")
+    )
+
+
+REGISTRY.add_collector(_cache_lines)
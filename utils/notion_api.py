@@ -0,0 +1,264 @@
+import asyncio
+import os
+import random
+import threading
+import time
+import weakref
+from typing import Any, Dict, Optional
+
+import httpx
+from dotenv import load_dotenv
+from notion_client import AsyncClient, Client
+from notion_client.client import BaseClient
+from notion_client.errors import RequestTimeoutError
+
+from utils.metrics import NOTION_LATENCY, NOTION_REQUESTS, notion_endpoint
+from utils.rate_limiter import NOTION_RATE_LIMITER, TokenBucket
+from utils.tracing import current_span, span
+
+load_dotenv()
+
+# Requests Notion rejected before doing any work; always safe to retry
+RATE_LIMITED_STATUS = 429
+# Transient server errors; only retried for requests that do not modify anything
+RETRYABLE_SERVER_STATUSES = {500, 502, 503, 504}
+
+
+def is_read_request(method: str, path: str) -> bool:
+    """True for requests that never modify the workspace (GETs, search and database queries)."""
+    method = method.upper()
+    if method == "GET":
+        return True
+    return method == "POST" and (path == "search" or (path.startswith("databases/") and path.endswith("/query")))
+
+
+class NotionClientMetrics:
+    """Process-wide counters for every request made through the shared Notion client."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.requests = 0
+            self.retries = 0
+            self.rate_limited_responses = 0
+            self.throttled_seconds = 0.0
+
+    def record(self, requests: int = 0, retries: int = 0, rate_limited: int = 0, throttled_seconds: float = 0.0) -> None:
+        with self._lock:
+            self.requests += requests
+            self.retries += retries
+            self.rate_limited_responses += rate_limited
+            self.throttled_seconds += throttled_seconds
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "retries": self.retries,
+                "rate_limited_responses": self.rate_limited_responses,
+                "throttled_seconds": round(self.throttled_seconds, 3),
+            }
+
+
+NOTION_CLIENT_METRICS = NotionClientMetrics()
+
+
+def retry_delay(response: Optional[httpx.Response], attempt: int, base_delay: float, max_delay: float) -> float:
+    """Seconds to wait before the next attempt: Retry-After when Notion sends it, else exponential backoff, plus jitter."""
+    retry_after = response.headers.get("Retry-After") if response is not None else None
+    if retry_after:
+        try:
+            return float(retry_after) + random.uniform(0, base_delay)
+        except ValueError:
+            pass
+    backoff = min(max_delay, base_delay * (2 ** attempt))
+    return backoff / 2 + random.uniform(0, backoff / 2)
+
+
+def _pool_limits(max_connections: int) -> httpx.Limits:
+    return httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections, keepalive_expiry=60)
+
+
+class _RetryPolicy:
+    """Retry decisions and bookkeeping shared by the sync and async clients."""
+
+    limiter: TokenBucket
+    max_retries: int
+    base_delay: float
+    max_delay: float
+    metrics: NotionClientMetrics
+
+    def _should_retry(self, response: Optional[httpx.Response], is_read: bool, attempt: int) -> bool:
+        """response is None when the attempt timed out."""
+        if attempt >= self.max_retries:
+            return False
+        if response is None:
+            return is_read
+        return response.status_code == RATE_LIMITED_STATUS or (is_read and response.status_code in RETRYABLE_SERVER_STATUSES)
+
+    @staticmethod
+    def _record_attempt(endpoint: str, response: Optional[httpx.Response], started_at: float, attempt: int) -> None:
+        status = str(response.status_code) if response is not None else "timeout"
+        NOTION_REQUESTS.inc(endpoint, status)
+        NOTION_LATENCY.observe(time.perf_counter() - started_at, endpoint)
+        current_span().set(status=status, attempts=attempt + 1)
+
+    def _record_retry(self, response: Optional[httpx.Response], attempt: int) -> float:
+        """Count one retry and return how long to wait before it."""
+        delay = retry_delay(response, attempt, self.base_delay, self.max_delay)
+        rate_limited = response is not None and response.status_code == RATE_LIMITED_STATUS
+        self.metrics.record(retries=1, rate_limited=int(rate_limited), throttled_seconds=delay if rate_limited else 0.0)
+        return delay
+
+
+class RateLimitedClient(_RetryPolicy, Client):
+    """
+    notion_client.Client that shares one keep-alive connection pool, takes a token from the
+    process-wide rate limiter before every request and retries 429s (honouring Retry-After)
+    and, for read requests, transient 5xx responses and timeouts.
+    """
+
+    def __init__(self, auth: Optional[str], limiter: TokenBucket = NOTION_RATE_LIMITER, max_retries: int = 5,
+                 base_delay: float = 0.5, max_delay: float = 30.0, max_connections: int = 20,
+                 metrics: NotionClientMetrics = NOTION_CLIENT_METRICS, transport: Optional[httpx.BaseTransport] = None):
+        super().__init__(auth=auth, client=httpx.Client(limits=_pool_limits(max_connections), transport=transport))
+        self.limiter = limiter
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.metrics = metrics
+
+    def request(self, path: str, method: str, query: Optional[Dict[Any, Any]] = None,
+                body: Optional[Dict[Any, Any]] = None, auth: Optional[str] = None) -> Any:
+        is_read = is_read_request(method, path)
+        endpoint = notion_endpoint(method, path)
+        with span(f"notion {endpoint}", path=path):
+            attempt = 0
+            while True:
+                self.metrics.record(requests=1, throttled_seconds=self.limiter.acquire())
+                request = self._build_request(method, path, query, body, auth)
+                started_at = time.perf_counter()
+                try:
+                    response = self.client.send(request)
+                except httpx.TimeoutException:
+                    response = None
+                self._record_attempt(endpoint, response, started_at, attempt)
+                if not self._should_retry(response, is_read, attempt):
+                    if response is None:
+                        raise RequestTimeoutError()
+                    return self._parse_response(response)
+                time.sleep(self._record_retry(response, attempt))
+                attempt += 1
+
+
+class AsyncRateLimitedClient(_RetryPolicy, AsyncClient):
+    """
+    asyncio counterpart of RateLimitedClient with the same limiter, retry policy and metrics.
+    httpx.AsyncClient pools are bound to one event loop, so a separate pool is kept per running
+    loop and a single instance can be shared by every coroutine in the process.
+    """
+
+    def __init__(self, auth: Optional[str], limiter: TokenBucket = NOTION_RATE_LIMITER, max_retries: int = 5,
+                 base_delay: float = 0.5, max_delay: float = 30.0, max_connections: int = 20,
+                 metrics: NotionClientMetrics = NOTION_CLIENT_METRICS, transport: Optional[httpx.AsyncBaseTransport] = None):
+        self._max_connections = max_connections
+        self._transport = transport
+        self._loop_clients = weakref.WeakKeyDictionary()
+        self._loop_clients_lock = threading.Lock()
+        super().__init__(auth=auth, client=self._new_http_client())
+        self.limiter = limiter
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.metrics = metrics
+
+    def _new_http_client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(limits=_pool_limits(self._max_connections), transport=self._transport)
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        http_client = self._loop_clients.get(loop)
+        if http_client is None:
+            with self._loop_clients_lock:
+                http_client = self._loop_clients.get(loop)
+                if http_client is None:
+                    http_client = self._loop_clients[loop] = self._new_loop_client()
+        return http_client
+
+    def _new_loop_client(self) -> httpx.AsyncClient:
+        """A pool configured like the one the base setter set up in __init__ (base_url, timeout, auth and version headers)."""
+        template = self._clients[0]
+        http_client = self._new_http_client()
+        http_client.base_url = template.base_url
+        http_client.timeout = template.timeout
+        http_client.headers = httpx.Headers(template.headers)
+        return http_client
+
+    @client.setter
+    def client(self, http_client: httpx.AsyncClient) -> None:
+        BaseClient.client.fset(self, http_client)
+
+    async def request(self, path: str, method: str, query: Optional[Dict[Any, Any]] = None,
+                      body: Optional[Dict[Any, Any]] = None, auth: Optional[str] = None) -> Any:
+        is_read = is_read_request(method, path)
+        endpoint = notion_endpoint(method, path)
+        with span(f"notion {endpoint}", path=path):
+            attempt = 0
+            while True:
+                wait = self.limiter.reserve()
+                if wait:
+                    await asyncio.sleep(wait)
+                self.metrics.record(requests=1, throttled_seconds=wait)
+                request = self._build_request(method, path, query, body, auth)
+                started_at = time.perf_counter()
+                try:
+                    response = await self.client.send(request)
+                except httpx.TimeoutException:
+                    response = None
+                self._record_attempt(endpoint, response, started_at, attempt)
+                if not self._should_retry(response, is_read, attempt):
+                    if response is None:
+                        raise RequestTimeoutError()
+                    return self._parse_response(response)
+                await asyncio.sleep(self._record_retry(response, attempt))
+                attempt += 1
+
+
+_shared_client: Optional[RateLimitedClient] = None
+_shared_async_client: Optional[AsyncRateLimitedClient] = None
+_shared_client_lock = threading.Lock()
+
+
+def _client_options() -> Dict[str, Any]:
+    return {
+        "auth": os.getenv("NOTION_API_KEY"),
+        "max_retries": int(os.getenv("NOTION_MAX_RETRIES", 5)),
+        "max_connections": int(os.getenv("NOTION_HTTP_MAX_CONNECTIONS", 20)),
+    }
+
+
+def get_notion_client() -> RateLimitedClient:
+    """Return the Notion client shared by every tool and helper in this process."""
+    global _shared_client
+    with _shared_client_lock:
+        if _shared_client is None:
+            _shared_client = RateLimitedClient(**_client_options())
+        return _shared_client
+
+
+def get_async_notion_client() -> AsyncRateLimitedClient:
+    """Return the asyncio Notion client shared by every coroutine in this process."""
+    global _shared_async_client
+    with _shared_client_lock:
+        if _shared_async_client is None:
+            _shared_async_client = AsyncRateLimitedClient(**_client_options())
+        return _shared_async_client
+
+
+def get_client_metrics() -> Dict[str, Any]:
+    """Retry and throttling counters of the shared Notion client."""
+    return NOTION_CLIENT_METRICS.snapshot()
@@ -0,0 +1,226 @@
+import json
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+
+class UnsupportedFilterError(ValueError):
+    """Raised when a Notion filter or sort cannot be evaluated locally."""
+
+
+TEXT_TYPES = ("title", "rich_text", "url", "email", "phone_number")
+DATE_TYPES = ("date", "created_time", "last_edited_time")
+
+
+def _plain_text(rich_text: list) -> str:
+    return "".join([t.get("plain_text", "") for t in rich_text or []])
+
+
+def property_value(prop: Optional[dict]) -> Any:
+    """Reduce a raw Notion page property to a plain Python value used for filtering and sorting."""
+    if not prop:
+        return None
+    prop_type = prop.get("type")
+    data = prop.get(prop_type)
+
+    if prop_type in ("title", "rich_text"):
+        return _plain_text(data)
+    if prop_type in ("url", "email", "phone_number", "number", "checkbox", "created_time", "last_edited_time"):
+        return data
+    if prop_type in ("select", "status"):
+        return data.get("name") if data else None
+    if prop_type == "multi_select":
+        return [option.get("name") for option in data or []]
+    if prop_type == "people":
+        return [person.get("id") for person in data or []]
+    if prop_type in ("created_by", "last_edited_by"):
+        return [data.get("id")] if data else []
+    if prop_type == "relation":
+        return [relation.get("id") for relation in data or []]
+    if prop_type == "date":
+        return data.get("start") if data else None
+    if prop_type == "unique_id":
+        return data.get("number") if data else None
+    if prop_type == "formula":
+        if not data:
+            return None
+        value = data.get(data.get("type"))
+        if data.get("type") == "date":
+            return value.get("start") if value else None
+        return value
+    raise UnsupportedFilterError(f"Property type '{prop_type}' is not supported for local queries")
+
+
+def _parse_datetime(value: str) -> datetime:
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+def _is_empty(value: Any) -> bool:
+    return value is None or value == "" or value == []
+
+
+def _match_condition(value: Any, filter_type: str, condition: dict) -> bool:
+    if len(condition) != 1:
+        raise UnsupportedFilterError(f"Expected exactly one condition for '{filter_type}', got {list(condition)}")
+    operator, operand = next(iter(condition.items()))
+
+    if operator == "is_empty":
+        return _is_empty(value)
+    if operator == "is_not_empty":
+        return not _is_empty(value)
+
+    if filter_type in TEXT_TYPES:
+        text = (value or "").lower()
+        operand = (operand or "").lower()
+        if operator == "equals":
+            return text == operand
+        if operator == "does_not_equal":
+            return text != operand
+        if operator == "contains":
+            return operand in text
+        if operator == "does_not_contain":
+            return operand not in text
+        if operator == "starts_with":
+            return text.startswith(operand)
+        if operator == "ends_with":
+            return text.endswith(operand)
+
+    elif filter_type in ("number", "unique_id"):
+        if operator == "equals":
+            return value == operand
+        if operator == "does_not_equal":
+            return value != operand
+        if value is None:
+            return False
+        if operator == "greater_than":
+            return value > operand
+        if operator == "less_than":
+            return value < operand
+        if operator == "greater_than_or_equal_to":
+            return value >= operand
+        if operator == "less_than_or_equal_to":
+            return value <= operand
+
+    elif filter_type == "checkbox":
+        if operator == "equals":
+            return bool(value) == operand
+        if operator == "does_not_equal":
+            return bool(value) != operand
+
+    elif filter_type in ("select", "status"):
+        if operator == "equals":
+            return value == operand
+        if operator == "does_not_equal":
+            return value != operand
+
+    elif filter_type in ("multi_select", "people", "relation", "created_by", "last_edited_by"):
+        values = value or []
+        if operator == "contains":
+            return operand in values
+        if operator == "does_not_contain":
+            return operand not in values
+
+    elif filter_type in DATE_TYPES and operator in ("equals", "before", "after", "on_or_before", "on_or_after"):
+        if value is None:
+            return False
+        current = _parse_datetime(value)
+        target = _parse_datetime(operand)
+        if operator == "equals":
+            return current.date() == target.date()
+        if operator == "before":
+            return current < target
+        if operator == "after":
+            return current > target
+        if operator == "on_or_before":
+            return current <= target
+        if operator == "on_or_after":
+            return current >= target
+
+    raise UnsupportedFilterError(f"Condition '{operator}' on '{filter_type}' is not supported for local queries")
+
+
+def matches_filter(page: dict, notion_filter: Optional[dict]) -> bool:
+    """Evaluate a Notion database query filter object against a raw page object."""
+    if not notion_filter:
+        return True
+    if "and" in notion_filter:
+        return all(matches_filter(page, sub_filter) for sub_filter in notion_filter["and"])
+    if "or" in notion_filter:
+        return any(matches_filter(page, sub_filter) for sub_filter in notion_filter["or"])
+
+    if "timestamp" in notion_filter:
+        timestamp = notion_filter["timestamp"]
+        return _match_condition(page.get(timestamp), timestamp, notion_filter[timestamp])
+
+    prop_name = notion_filter.get("property")
+    if prop_name is None:
+        raise UnsupportedFilterError(f"Filter {notion_filter} has no property, timestamp or compound key")
+    filter_types = [key for key in notion_filter if key != "property"]
+    if len(filter_types) != 1:
+        raise UnsupportedFilterError(f"Filter on '{prop_name}' must have exactly one type condition")
+    filter_type = filter_types[0]
+    condition = notion_filter[filter_type]
+
+    prop = page.get("properties", {}).get(prop_name)
+    if filter_type == "formula":
+        if len(condition) != 1:
+            raise UnsupportedFilterError(f"Formula filter on '{prop_name}' must have exactly one sub-type")
+        formula_type, formula_condition = next(iter(condition.items()))
+        filter_type = {"string": "rich_text", "checkbox": "checkbox", "number": "number", "date": "date"}.get(formula_type)
+        if filter_type is None:
+            raise UnsupportedFilterError(f"Formula filter type '{formula_type}' is not supported for local queries")
+        condition = formula_condition
+    return _match_condition(property_value(prop), filter_type, condition)
+
+
+def _sort_key(page: dict, sort: dict, schema: Optional[dict]) -> Any:
+    if "timestamp" in sort:
+        return page.get(sort["timestamp"])
+    prop_name = sort.get("property")
+    if prop_name is None:
+        raise UnsupportedFilterError(f"Sort {sort} has no property or timestamp")
+    prop = page.get("properties", {}).get(prop_name)
+    value = property_value(prop)
+    if isinstance(value, list):
+        value = value[0] if value else None
+    if value is None or value == "":
+        return None
+
+    prop_type = prop.get("type") if prop else None
+    if prop_type in ("select", "status") and schema:
+        # Notion orders select and status values by the option order of the database schema
+        options = schema.get(prop_name, {}).get(prop_type, {}).get("options", [])
+        order = [option.get("name") for option in options]
+        if order:
+            return order.index(value) if value in order else len(order)
+    if isinstance(value, str):
+        return value.lower()
+    return value
+
+
+def _comparable(value: Any) -> tuple:
+    """Total-order key for a non-empty sort value: numbers, then text, then anything else as JSON."""
+    if isinstance(value, (bool, int, float)):
+        return (0, value)
+    if isinstance(value, str):
+        return (1, value)
+    return (2, json.dumps(value, sort_keys=True, default=str))
+
+
+def sort_pages(pages: list, sorts: Optional[list], schema: Optional[dict] = None) -> list:
+    """
+    Sort raw page objects by a list of Notion sort objects. Empty values always sort last.
+    schema is the database `properties` object, used to order select/status options like Notion does.
+    """
+    ordered = list(pages)
+    for sort in reversed(sorts or []):
+        descending = sort.get("direction", "ascending") == "descending"
+        keyed = [(_sort_key(page, sort, schema), page) for page in ordered]
+        present = [item for item in keyed if item[0] is not None]
+        missing = [item for item in keyed if item[0] is None]
+        # Values of one property can still differ in type across pages (formulas, unknown select options)
+        present.sort(key=lambda item: _comparable(item[0]), reverse=descending)
+        ordered = [page for _, page in present + missing]
+    return ordered
@@ -0,0 +1,268 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from dotenv import load_dotenv
+
+from utils.db_response_cleanup import DATABASE_CONFIGS, clean_notion_database_response
+from utils.notion_filters import matches_filter, sort_pages
+from utils.page_blocks_cleanup import notion
+
+load_dotenv()
+
+DEFAULT_MIRROR_PATH = os.path.join(os.path.dirname(__file__), "..", ".cache", "notion_mirror.sqlite3")
+
+
+def _iso(timestamp: Optional[float]) -> Optional[str]:
+    if timestamp is None:
+        return None
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat()
+
+
+class NotionMirror:
+    """
+    Local SQLite mirror of Notion databases.
+
+    The first sync of a database pages through it completely; later syncs only ask Notion
+    for pages whose last_edited_time is on or after the newest one already mirrored.
+    Pages removed from a database are not visible to incremental syncs, so a full resync
+    runs every full_sync_interval seconds and drops rows that no longer exist.
+    """
+
+    def __init__(self, path: str = DEFAULT_MIRROR_PATH, full_sync_interval: float = 24 * 3600):
+        self.path = path
+        self.full_sync_interval = full_sync_interval
+        self._lock = threading.Lock()
+        self._sync_locks: Dict[str, threading.Lock] = {}
+        # database_id -> (synced_at, decoded pages), so repeated local queries skip JSON decoding
+        self._decoded: Dict[str, tuple] = {}
+        self._background_thread = None
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS pages (
+                page_id TEXT PRIMARY KEY,
+                database_id TEXT NOT NULL,
+                created_time TEXT,
+                last_edited_time TEXT,
+                payload TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_pages_database ON pages (database_id);
+            CREATE TABLE IF NOT EXISTS sync_state (
+                database_id TEXT PRIMARY KEY,
+                schema TEXT,
+                watermark TEXT,
+                synced_at REAL,
+                full_synced_at REAL
+            );
+            """
+        )
+        self._conn.commit()
+
+    def _sync_lock(self, database_id: str) -> threading.Lock:
+        with self._lock:
+            return self._sync_locks.setdefault(database_id, threading.Lock())
+
+    def sync_state(self, database_id: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT schema, watermark, synced_at, full_synced_at FROM sync_state WHERE database_id = ?",
+                (database_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            "schema": json.loads(row[0]) if row[0] else None,
+            "watermark": row[1],
+            "synced_at": row[2],
+            "full_synced_at": row[3],
+        }
+
+    def _query_all(self, database_id: str, notion_filter: Optional[dict] = None):
+        """Yield every page of a Notion database query, oldest edit first."""
+        cursor = None
+        while True:
+            params = {
+                "database_id": database_id,
+                "page_size": 100,
+                "sorts": [{"timestamp": "last_edited_time", "direction": "ascending"}],
+            }
+            if notion_filter:
+                params["filter"] = notion_filter
+            if cursor:
+                params["start_cursor"] = cursor
+            response = notion.databases.query(**params)
+            for page in response.get("results", []):
+                yield page
+            if not response.get("has_more"):
+                break
+            cursor = response.get("next_cursor")
+
+    def sync(self, database_id: str, full: bool = False) -> dict:
+        """
+        Bring the mirror of one database up to date and return a summary of what changed.
+        A full sync is forced when the database was never synced or the last full sync is too old.
+        """
+        with self._sync_lock(database_id):
+            state = self.sync_state(database_id)
+            started_at = time.time()
+            if state is None or state["full_synced_at"] is None or started_at - state["full_synced_at"] > self.full_sync_interval:
+                full = True
+
+            schema = notion.databases.retrieve(database_id=database_id).get("properties", {})
+
+            notion_filter = None
+            if not full and state["watermark"]:
+                notion_filter = {"timestamp": "last_edited_time", "last_edited_time": {"on_or_after": state["watermark"]}}
+
+            watermark = None if full else state["watermark"]
+            seen_ids = set()
+            rows = []
+            for page in self._query_all(database_id, notion_filter):
+                seen_ids.add(page["id"])
+                rows.append((page["id"], database_id, page.get("created_time"), page.get("last_edited_time"), json.dumps(page)))
+                if page.get("last_edited_time") and (watermark is None or page["last_edited_time"] > watermark):
+                    watermark = page["last_edited_time"]
+
+            with self._lock:
+                removed = 0
+                if full:
+                    existing = {row[0] for row in self._conn.execute("SELECT page_id FROM pages WHERE database_id = ?", (database_id,))}
+                    stale_ids = existing - seen_ids
+                    removed = len(stale_ids)
+                    self._conn.executemany("DELETE FROM pages WHERE page_id = ?", [(page_id,) for page_id in stale_ids])
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO pages (page_id, database_id, created_time, last_edited_time, payload) VALUES (?, ?, ?, ?, ?)",
+                    rows,
+                )
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO sync_state (database_id, schema, watermark, synced_at, full_synced_at) VALUES (?, ?, ?, ?, ?)",
+                    (database_id, json.dumps(schema), watermark, started_at, started_at if full else state["full_synced_at"]),
+                )
+                self._conn.commit()
+                self._decoded.pop(database_id, None)
+
+            return {
+                "database_id": database_id,
+                "mode": "full" if full else "incremental",
+                "pages_fetched": len(rows),
+                "pages_removed": removed,
+                "synced_at": _iso(started_at),
+            }
+
+    def sync_all(self, database_ids: Optional[list] = None) -> list:
+        """Sync every configured database, reporting failures instead of raising."""
+        results = []
+        for database_id in database_ids or list(DATABASE_CONFIGS.keys()):
+            try:
+                results.append(self.sync(database_id))
+            except Exception as e:
+                results.append({"database_id": database_id, "error": str(e)})
+        return results
+
+    def ensure_fresh(self, database_id: str, max_staleness: float) -> dict:
+        """Sync the database if it was never mirrored or its last sync is older than max_staleness seconds."""
+        state = self.sync_state(database_id)
+        if state is None or time.time() - state["synced_at"] > max_staleness:
+            self.sync(database_id)
+            state = self.sync_state(database_id)
+        return state
+
+    def _pages(self, database_id: str, synced_at: float) -> list:
+        cached = self._decoded.get(database_id)
+        if cached and cached[0] == synced_at:
+            return cached[1]
+        with self._lock:
+            payloads = self._conn.execute("SELECT payload FROM pages WHERE database_id = ?", (database_id,)).fetchall()
+        pages = [json.loads(payload[0]) for payload in payloads]
+        self._decoded[database_id] = (synced_at, pages)
+        return pages
+
+    def query(self, database_id: str, notion_filter: Optional[dict] = None, sorts: Optional[list] = None,
+              page_size: int = 50, start_cursor: Optional[str] = None, max_staleness: float = 300) -> Dict[str, Any]:
+        """
+        Answer a databases.query call from the mirror. Filters and sorts use Notion's JSON format
+        (see utils.notion_filters); start_cursor/next_cursor are offsets into the local result.
+        Raises UnsupportedFilterError for filters that cannot be evaluated locally.
+        """
+        state = self.ensure_fresh(database_id, max_staleness)
+        pages = [page for page in self._pages(database_id, state["synced_at"]) if matches_filter(page, notion_filter)]
+        pages = sort_pages(pages, sorts or [{"timestamp": "last_edited_time", "direction": "descending"}], state["schema"])
+
+        try:
+            offset = int(start_cursor) if start_cursor else 0
+        except ValueError:
+            raise ValueError(f"start_cursor '{start_cursor}' is not a local cursor; use the next_cursor returned by a local query")
+        window = pages[offset:offset + page_size]
+        has_more = offset + page_size < len(pages)
+        return {
+            "results": window,
+            "total_count": len(pages),
+            "has_more": has_more,
+            "next_cursor": str(offset + page_size) if has_more else None,
+            "synced_at": _iso(state["synced_at"]),
+            "staleness_seconds": round(time.time() - state["synced_at"], 1),
+        }
+
+    def start_background_sync(self, interval: float, database_ids: Optional[list] = None) -> None:
+        """Sync all configured databases every interval seconds on a daemon thread."""
+        if self._background_thread is not None:
+            return
+
+        def loop():
+            while True:
+                for result in self.sync_all(database_ids):
+                    if "error" in result:
+                        print(f"Notion mirror sync failed for {result['database_id']}: {result['error']}")
+                time.sleep(interval)
+
+        self._background_thread = threading.Thread(target=loop, name="notion-mirror-sync", daemon=True)
+        self._background_thread.start()
+
+
+NOTION_MIRROR = NotionMirror(
+    path=os.getenv("NOTION_MIRROR_PATH", DEFAULT_MIRROR_PATH),
+    full_sync_interval=float(os.getenv("NOTION_MIRROR_FULL_SYNC_INTERVAL", 24 * 3600)),
+)
+
+
+def _max_staleness() -> float:
+    return float(os.getenv("NOTION_MIRROR_MAX_STALENESS", 300))
+
+
+def local_query_version(database_id: str) -> Optional[str]:
+    """The mirror's synced_at if clean_local_query would answer without syncing first, else None."""
+    state = NOTION_MIRROR.sync_state(database_id)
+    if state is None or time.time() - state["synced_at"] > _max_staleness():
+        return None
+    return repr(state["synced_at"])
+
+
+def clean_local_query(database_id: str, notion_filter: Optional[dict] = None, sorts: Optional[list] = None,
+                      page_size: int = 50, start_cursor: Optional[str] = None) -> Dict[str, Any]:
+    """Run a mirror query and clean the rows the same way as a remote query_database result."""
+    raw = NOTION_MIRROR.query(
+        database_id,
+        notion_filter=notion_filter,
+        sorts=sorts,
+        page_size=page_size,
+        start_cursor=start_cursor,
+        max_staleness=_max_staleness(),
+    )
+    cleaned_results = clean_notion_database_response(raw["results"], database_id)
+    return {
+        "items": cleaned_results,
+        "items_length": len(cleaned_results),
+        "total_count": raw["total_count"],
+        "has_more": raw["has_more"],
+        "next_cursor": raw["next_cursor"],
+        "source": "local",
+        "synced_at": raw["synced_at"],
+        "staleness_seconds": raw["staleness_seconds"],
+    }
@@ -1,20 +1,36 @@
 import json
-from notion_client import Client
 from notion_client.errors import APIResponseError
 from dotenv import load_dotenv
+from typing import Optional
 import os
 
+from utils.block_cache import BLOCK_CACHE, tree_version
+from utils.notion_api import get_notion_client
+from utils.jobs import report_progress
+from utils.tracing import current_span, traced
+
 load_dotenv()
 
 NOTION_API_KEY = os.getenv("NOTION_API_KEY")
 
-notion = Client(auth=NOTION_API_KEY)
+notion = get_notion_client()
 
-def get_blocks_recursive_clean(block_id: str, depth: int) -> list:
-    if depth <= 0:
-        return []
+@traced("list_children", "block_id")
+def list_block_children(block_id: str, version: Optional[str] = None) -> tuple:
+    """
+    List all direct children of a block, following pagination.
+    When version (see block_cache.tree_version) is given, the listing is served from and
+    stored in the block cache. Returns (children, error) where error is None on success;
+    on failure children holds whatever was listed before the failing request.
+    """
+    if BLOCK_CACHE is not None:
+        cached = BLOCK_CACHE.get_children(block_id, version)
+        if cached is not None:
+            current_span().set(cached=True)
+            report_progress(blocks=len(cached))
+            return cached, None
     
-    blocks_clean = []
+    children = []
     cursor = None
     
     while True:
@@ -25,53 +41,72 @@ def get_blocks_recursive_clean(block_id: str, depth: int) -> list:
                 page_size=100
             )
         except APIResponseError as e:
-            # Return error message as a block
-            blocks_clean.append({
-                "error": f"Could not access blocks for block_id {block_id}: {str(e)}"
-            })
-            return blocks_clean
+            return children, f"Could not access blocks for block_id {block_id}: {str(e)}"
         
-        for block in response.get("results", []):
-            block_type = block["type"]
-            try:
-                # Extract combined text content for this block
-                text_content = extract_text_from_block(block)
-                
-                # Recursively get children text blocks if any
-                children = []
-                if block.get("has_children"):
-                    children = get_blocks_recursive_clean(block["id"], depth-1)
-                
-                # Handle child databases
-                if block_type == "child_database":
-                    try:
-                        db_content = process_database_clean(block["id"])
-                    except APIResponseError as e:
-                        db_content = [{"error": f"Could not access database {block['id']}: {str(e)}"}]
-                    block_data = {
-                        "type": "child_database",
-                        "content": db_content
-                    }
-                else:
-                    block_data = {
-                        block_type: text_content
-                    }
-                    if children:
-                        block_data["children"] = children
-                
-                blocks_clean.append(block_data)
-            
-            except Exception as e:
-                # Catch all to avoid breaking on unexpected block formats
-                blocks_clean.append({
-                    "error": f"Error processing block {block['id']}: {str(e)}"
-                })
+        children.extend(response.get("results", []))
+        report_progress(blocks=len(response.get("results", [])))
         
         if not response.get("has_more"):
             break
         
         cursor = response.get("next_cursor")
     
+    if BLOCK_CACHE is not None:
+        BLOCK_CACHE.put_children(block_id, version, children)
+    return children, None
+
+def get_blocks_recursive_clean(block_id: str, depth: int, version: Optional[str] = None) -> list:
+    """Text-only block tree. Pass the page's last_edited_time as version to serve unchanged listings from the block cache."""
+    return _recursive_clean(block_id, depth, tree_version(block_id, version))
+
+@traced("subtree", "block_id", "depth")
+def _recursive_clean(block_id: str, depth: int, version: Optional[str]) -> list:
+    if depth <= 0:
+        return []
+    
+    blocks_clean = []
+    children, error = list_block_children(block_id, version)
+    
+    for block in children:
+        block_type = block["type"]
+        try:
+            # Extract combined text content for this block
+            text_content = extract_text_from_block(block)
+            
+            # Recursively get children text blocks if any
+            block_children = []
+            if block.get("has_children"):
+                block_children = _recursive_clean(block["id"], depth-1, version)
+            
+            # Handle child databases
+            if block_type == "child_database":
+                try:
+                    db_content = process_database_clean(block["id"])
+                except APIResponseError as e:
+                    db_content = [{"error": f"Could not access database {block['id']}: {str(e)}"}]
+                block_data = {
+                    "type": "child_database",
+                    "content": db_content
+                }
+            else:
+                block_data = {
+                    block_type: text_content
+                }
+                if block_children:
+                    block_data["children"] = block_children
+            
+            blocks_clean.append(block_data)
+        
+        except Exception as e:
+            # Catch all to avoid breaking on unexpected block formats
+            blocks_clean.append({
+                "error": f"Error processing block {block['id']}: {str(e)}"
+            })
+    
+    if error:
+        # Return error message as a block
+        blocks_clean.append({"error": error})
+    
     return blocks_clean
 
 def extract_text_from_block(block: dict) -> str:
@@ -96,6 +131,7 @@ def extract_text_from_block(block: dict) -> str:
     # Default fallback
     return str(content)
 
+@traced("process_database_clean", "database_id")
 def process_database_clean(database_id: str) -> list:
     """Process database entries with cleaned page data"""
     entries = []
@@ -111,6 +147,7 @@ def process_database_clean(database_id: str) -> list:
         except APIResponseError as e:
             return [{"error": f"Could not query database {database_id}: {str(e)}"}]
         
+        report_progress(pages=len(response.get("results", [])))
         for page in response.get("results", []):
             entries.append(process_page_clean(page))
         
@@ -138,53 +175,44 @@ def extract_title(page: dict) -> str:
                 return "".join([t.get("plain_text", "") for t in title_items])
     return "Untitled"
 
-def get_blocks_recursive_full(block_id: str, depth: int) -> list:
+def get_blocks_recursive_full(block_id: str, depth: int, version: Optional[str] = None) -> list:
     """
     Get blocks with FULL structure preserved for UPDATE operations.
     This maintains all IDs, metadata, and formatting needed for Notion API updates.
+    Pass the page's last_edited_time as version to let an unchanged page's listings
+    be served from the block cache instead of re-listing their children.
     """
+    return _recursive_full(block_id, depth, tree_version(block_id, version))
+
+@traced("subtree", "block_id", "depth")
+def _recursive_full(block_id: str, depth: int, version: Optional[str]) -> list:
     if depth <= 0:
         return []
     
     blocks_full = []
-    cursor = None
+    children, error = list_block_children(block_id, version)
     
-    while True:
+    for block in children:
         try:
-            response = notion.blocks.children.list(
-                block_id=block_id,
-                start_cursor=cursor,
-                page_size=100
-            )
-        except APIResponseError as e:
-            # Return error message as a block
-            blocks_full.append({
-                "error": f"Could not access blocks for block_id {block_id}: {str(e)}"
-            })
-            return blocks_full
-        
-        for block in response.get("results", []):
-            try:
-                # Preserve FULL block structure for updates
-                full_block = block.copy()
-                
-                # Recursively get children with full structure if any
-                if block.get("has_children"):
-                    # Store children in a separate key to avoid API conflicts
-                    full_block["children_blocks"] = get_blocks_recursive_full(block["id"], depth-1)
-                
-                blocks_full.append(full_block)
+            # Preserve FULL block structure for updates
+            full_block = block.copy()
             
-            except Exception as e:
-                # Catch all to avoid breaking on unexpected block formats
-                blocks_full.append({
-                    "error": f"Error processing block {block['id']}: {str(e)}"
-                })
-        
-        if not response.get("has_more"):
-            break
+            # Recursively get children with full structure if any
+            if block.get("has_children"):
+                # Store children in a separate key to avoid API conflicts
+                full_block["children_blocks"] = _recursive_full(block["id"], depth-1, version)
+            
+            blocks_full.append(full_block)
         
-        cursor = response.get("next_cursor")
+        except Exception as e:
+            # Catch all to avoid breaking on unexpected block formats
+            blocks_full.append({
+                "error": f"Error processing block {block['id']}: {str(e)}"
+            })
+    
+    if error:
+        # Return error message as a block
+        blocks_full.append({"error": error})
     
     return blocks_full
 
@@ -0,0 +1,60 @@
+import os
+import threading
+import time
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket. acquire() blocks until a token is available, so every
+    caller sharing one bucket is held to `rate` requests per second on average with
+    bursts of up to `capacity` requests.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1):
+        self.rate = rate
+        self.capacity = max(capacity, 1)
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    def acquire(self) -> float:
+        """Take one token, sleeping as long as needed. Returns the time spent waiting in seconds."""
+        if self.rate <= 0:
+            return 0.0
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill(time.monotonic())
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+    def reserve(self) -> float:
+        """
+        Take one token without blocking and return how many seconds the caller must wait
+        before using it. Lets asyncio callers sleep with asyncio.sleep instead of blocking the loop.
+        """
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens -= 1
+            return max(0.0, -self._tokens / self.rate)
+
+
+# Shared by every Notion caller in the process; Notion allows ~3 requests per second per integration
+NOTION_RATE_LIMITER = TokenBucket(
+    rate=float(os.getenv("NOTION_RATE_LIMIT", 3)),
+    capacity=float(os.getenv("NOTION_RATE_BURST", 3)),
+)
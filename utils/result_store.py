@@ -0,0 +1,82 @@
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+class ResultStore:
+    """
+    Short-lived, in-process store for serialized tool results.
+
+    Results are keyed by an opaque handle and expire ttl seconds after they were stored.
+    The total size of all stored results is bounded by max_bytes; when a new result does
+    not fit, the least recently used results are dropped first. Each worker process has
+    its own store, so a handle from another worker simply misses. A result stored with an
+    owner (the tool call that produced it) is only returned to lookups for the same owner.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, ttl: float = 900):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # handle -> (content, expires_at, owner)
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+    def put(self, content: str, owner: Optional[str] = None) -> Optional[str]:
+        """Store content and return its handle, or None if it can never fit in the store."""
+        size = len(content)
+        if size > self.max_bytes:
+            return None
+        handle = uuid.uuid4().hex
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            while self._entries and self._total_bytes + size > self.max_bytes:
+                _, (evicted, _, _) = self._entries.popitem(last=False)
+                self._total_bytes -= len(evicted)
+            self._entries[handle] = (content, now + self.ttl, owner)
+            self._total_bytes += size
+        return handle
+
+    def get(self, handle: str, owner: Optional[str] = None) -> Optional[str]:
+        """Stored content of handle; None if it expired or was stored for a different owner."""
+        with self._lock:
+            self._expire(time.monotonic())
+            entry = self._entries.get(handle)
+            if entry is None or (owner is not None and entry[2] != owner):
+                self.misses += 1
+                return None
+            self._entries.move_to_end(handle)
+            self.hits += 1
+            return entry[0]
+
+    def _expire(self, now: float) -> None:
+        """Drop expired entries. Caller holds the lock."""
+        expired = [handle for handle, (_, expires_at, _) in self._entries.items() if expires_at <= now]
+        for handle in expired:
+            content, _, _ = self._entries.pop(handle)
+            self._total_bytes -= len(content)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+RESULT_STORE = ResultStore(
+    max_bytes=int(os.getenv("NOTION_RESULT_STORE_MAX_BYTES", 64 * 1024 * 1024)),
+    ttl=float(os.getenv("NOTION_RESULT_STORE_TTL", 900)),
+)
@@ -0,0 +1,346 @@
+import json
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+from utils.block_tree_fetcher import get_blocks_concurrent_full
+from utils.page_blocks_cleanup import notion, extract_text_from_block
+
+load_dotenv()
+
+DEFAULT_INDEX_PATH = os.path.join(os.path.dirname(__file__), "..", ".cache", "notion_search_index.sqlite3")
+
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+TITLE_WEIGHT = 3
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def _plain_text(rich_text: list) -> str:
+    return "".join([t.get("plain_text", "") for t in rich_text or []])
+
+
+def extract_title(item: dict) -> str:
+    """Title of a page (its title-type property) or database (its title array)."""
+    if item.get("object") == "database":
+        return _plain_text(item.get("title"))
+    for prop in item.get("properties", {}).values():
+        if prop.get("type") == "title":
+            return _plain_text(prop.get("title"))
+    return ""
+
+
+def extract_properties_text(item: dict) -> str:
+    """Searchable text of every non-title page property (or database description)."""
+    if item.get("object") == "database":
+        return _plain_text(item.get("description"))
+    parts = []
+    for prop_name, prop in item.get("properties", {}).items():
+        prop_type = prop.get("type")
+        data = prop.get(prop_type)
+        if not data:
+            continue
+        if prop_type == "rich_text":
+            parts.append(_plain_text(data))
+        elif prop_type in ("select", "status"):
+            parts.append(data.get("name", ""))
+        elif prop_type == "multi_select":
+            parts.extend(option.get("name", "") for option in data)
+        elif prop_type == "people":
+            parts.extend(person.get("name") or "" for person in data)
+        elif prop_type in ("url", "email", "phone_number"):
+            parts.append(data)
+    return " ".join(part for part in parts if part)
+
+
+def extract_blocks_text(blocks: list) -> str:
+    """Flatten a get_blocks_recursive_full tree into plain text via extract_text_from_block."""
+    parts = []
+    stack = list(reversed(blocks))
+    while stack:
+        block = stack.pop()
+        content = block.get(block.get("type"), {})
+        # Skip blocks without text (dividers, images...) whose fallback is a repr of their content
+        if isinstance(content, dict) and any(key in content for key in ("rich_text", "text", "title", "url")):
+            text = extract_text_from_block(block)
+            if text:
+                parts.append(text)
+        stack.extend(reversed(block.get("children_blocks", [])))
+    return "\n".join(parts)
+
+
+def _has_error_blocks(blocks: list) -> bool:
+    """Whether a get_blocks_concurrent_full tree contains {"error": ...} blocks from failed listings."""
+    stack = list(blocks)
+    while stack:
+        block = stack.pop()
+        if "error" in block:
+            return True
+        stack.extend(block.get("children_blocks", []))
+    return False
+
+
+class BM25Index:
+    """In-memory inverted index with Okapi BM25 ranking."""
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Dict[str, int]] = defaultdict(dict)
+        self._doc_terms: Dict[str, Counter] = {}
+        self._doc_lengths: Dict[str, int] = {}
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self._doc_terms)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._doc_terms
+
+    def add(self, doc_id: str, title: str, text: str) -> None:
+        self.remove(doc_id)
+        terms = Counter(tokenize(text))
+        for term in tokenize(title):
+            terms[term] += TITLE_WEIGHT
+        for term, frequency in terms.items():
+            self._postings[term][doc_id] = frequency
+        self._doc_terms[doc_id] = terms
+        self._doc_lengths[doc_id] = sum(terms.values())
+        self._total_length += self._doc_lengths[doc_id]
+
+    def remove(self, doc_id: str) -> None:
+        terms = self._doc_terms.pop(doc_id, None)
+        if terms is None:
+            return
+        for term in terms:
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(doc_id, None)
+                if not postings:
+                    del self._postings[term]
+        self._total_length -= self._doc_lengths.pop(doc_id)
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[Tuple[str, float]]:
+        """Return (doc_id, score) pairs for documents matching any query term, best first."""
+        doc_count = len(self._doc_terms)
+        if doc_count == 0:
+            return []
+        average_length = self._total_length / doc_count
+        scores: Dict[str, float] = defaultdict(float)
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (doc_count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for doc_id, frequency in postings.items():
+                norm = self.k1 * (1 - self.b + self.b * self._doc_lengths[doc_id] / average_length)
+                scores[doc_id] += idf * frequency * (self.k1 + 1) / (frequency + norm)
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return ranked[:limit] if limit else ranked
+
+
+class LocalSearchIndex:
+    """
+    Offline full-text search over the Notion workspace.
+
+    Documents (raw page/database object, title, property text, block text) are stored in
+    SQLite so a restart only rebuilds the in-memory BM25 index instead of re-fetching
+    Notion. refresh() walks Notion's search endpoint newest-edit-first down to the watermark
+    of the last completed pass and only re-fetches items whose last_edited_time changed.
+    A pass that fails midway leaves the watermark where it was, and pages whose blocks could
+    not all be listed keep it at their edit time, so both are retried by the next pass. A full
+    refresh also forgets pages Notion no longer returns.
+    """
+
+    def __init__(self, path: str = DEFAULT_INDEX_PATH, block_depth: int = 3, full_refresh_interval: float = 24 * 3600):
+        self.path = path
+        self.block_depth = block_depth
+        self.full_refresh_interval = full_refresh_interval
+        self.refreshed_at: Optional[float] = None
+        self._full_refreshed_at: Optional[float] = None
+        self._watermark: Optional[str] = None
+        self._index = BM25Index()
+        self._versions: Dict[str, str] = {}
+        self._object_types: Dict[str, str] = {}
+        self._lock = threading.RLock()
+        self._refresh_lock = threading.Lock()
+        self._background_thread = None
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS search_documents (
+                object_id TEXT PRIMARY KEY,
+                object_type TEXT,
+                last_edited_time TEXT,
+                payload TEXT NOT NULL,
+                title TEXT,
+                body TEXT
+            )
+            """
+        )
+        self._conn.commit()
+        for object_id, object_type, last_edited_time, title, body in self._conn.execute(
+            "SELECT object_id, object_type, last_edited_time, title, body FROM search_documents"
+        ):
+            self._index.add(object_id, title, body)
+            self._versions[object_id] = last_edited_time
+            self._object_types[object_id] = object_type
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._index)
+
+    def index_item(self, item: dict, blocks: Optional[list] = None, complete: bool = True) -> None:
+        """
+        Add or replace one raw page/database object, with its block tree for pages. An item
+        indexed from an incomplete block tree (complete=False) is searchable but keeps no
+        version, so the next refresh fetches it again.
+        """
+        version = item.get("last_edited_time") if complete else None
+        title = extract_title(item)
+        body = "\n".join(part for part in (extract_properties_text(item), extract_blocks_text(blocks or [])) if part)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO search_documents (object_id, object_type, last_edited_time, payload, title, body) VALUES (?, ?, ?, ?, ?, ?)",
+                (item["id"], item.get("object"), version, json.dumps(item), title, body),
+            )
+            self._conn.commit()
+            self._index.add(item["id"], title, body)
+            self._versions[item["id"]] = version
+            self._object_types[item["id"]] = item.get("object")
+
+    def remove_item(self, object_id: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM search_documents WHERE object_id = ?", (object_id,))
+            self._conn.commit()
+            self._index.remove(object_id)
+            self._versions.pop(object_id, None)
+            self._object_types.pop(object_id, None)
+
+    def refresh(self, full: bool = False) -> dict:
+        """Index everything edited since the last completed refresh (or everything, for a full refresh)."""
+        with self._refresh_lock:
+            started_at = time.time()
+            if self._full_refreshed_at is None or self._watermark is None or started_at - self._full_refreshed_at > self.full_refresh_interval:
+                full = True
+            seen_ids = set()
+            indexed = 0
+            # Newest edit seen, held back to the oldest page that could not be indexed completely
+            watermark = None
+            cursor = None
+            while True:
+                params = {"sort": {"direction": "descending", "timestamp": "last_edited_time"}, "page_size": 100}
+                if cursor:
+                    params["start_cursor"] = cursor
+                response = notion.search(**params)
+                reached_watermark = False
+                for item in response.get("results", []):
+                    edited = item.get("last_edited_time") or ""
+                    if watermark is None:
+                        watermark = edited
+                    if not full and edited < self._watermark:
+                        # Everything older was covered by a completed pass
+                        reached_watermark = True
+                        break
+                    seen_ids.add(item["id"])
+                    if self._versions.get(item["id"]) == item.get("last_edited_time"):
+                        continue
+                    blocks = None
+                    if item.get("object") == "page":
+                        blocks = get_blocks_concurrent_full(item["id"], depth=self.block_depth, version=item.get("last_edited_time"))
+                    complete = not _has_error_blocks(blocks or [])
+                    self.index_item(item, blocks, complete=complete)
+                    if not complete:
+                        watermark = min(watermark, edited)
+                    indexed += 1
+                if reached_watermark or not response.get("has_more"):
+                    break
+                cursor = response.get("next_cursor")
+
+            removed = 0
+            if full:
+                with self._lock:
+                    stale_ids = set(self._versions) - seen_ids
+                for object_id in stale_ids:
+                    self.remove_item(object_id)
+                removed = len(stale_ids)
+                self._full_refreshed_at = started_at
+            # Only a pass that got this far moves the watermark, so an interrupted pass is redone
+            if watermark is not None:
+                self._watermark = watermark
+            self.refreshed_at = started_at
+            return {"mode": "full" if full else "incremental", "indexed": indexed, "removed": removed, "documents": len(self)}
+
+    def search(self, query: str, page_size: int = 50, start_cursor: Optional[str] = None, object_type: Optional[str] = None) -> dict:
+        """
+        Rank indexed documents for query with BM25, optionally only "page" or "database" objects.
+        Returns a response shaped like Notion's search endpoint (results/has_more/next_cursor)
+        where cursors are local offsets.
+        """
+        try:
+            offset = int(start_cursor) if start_cursor else 0
+        except ValueError:
+            raise ValueError(f"start_cursor '{start_cursor}' is not a local cursor; use the next_cursor returned by a local search")
+        with self._lock:
+            ranked = self._index.search(query)
+            if object_type:
+                ranked = [item for item in ranked if self._object_types.get(item[0]) == object_type]
+            window = ranked[offset:offset + page_size]
+            placeholders = ",".join("?" for _ in window)
+            payloads = dict(self._conn.execute(
+                f"SELECT object_id, payload FROM search_documents WHERE object_id IN ({placeholders})",
+                [object_id for object_id, _ in window],
+            ).fetchall()) if window else {}
+        has_more = offset + page_size < len(ranked)
+        return {
+            "results": [json.loads(payloads[object_id]) for object_id, _ in window if object_id in payloads],
+            "has_more": has_more,
+            "next_cursor": str(offset + page_size) if has_more else None,
+            "request_id": None,
+        }
+
+    def start_background_refresh(self, interval: float) -> None:
+        """Refresh the index every interval seconds on a daemon thread."""
+        if self._background_thread is not None:
+            return
+
+        def loop():
+            while True:
+                try:
+                    self.refresh()
+                except Exception as e:
+                    print(f"Notion search index refresh failed: {e}")
+                time.sleep(interval)
+
+        self._background_thread = threading.Thread(target=loop, name="notion-search-index", daemon=True)
+        self._background_thread.start()
+
+
+SEARCH_INDEX = LocalSearchIndex(
+    path=os.getenv("NOTION_SEARCH_INDEX_PATH", DEFAULT_INDEX_PATH),
+    block_depth=int(os.getenv("NOTION_SEARCH_INDEX_DEPTH", 3)),
+    full_refresh_interval=float(os.getenv("NOTION_SEARCH_INDEX_FULL_REFRESH_INTERVAL", 24 * 3600)),
+)
+
+
+def fuse_search_results(local_results: list, remote_results: list, limit: int, k: int = 60) -> list:
+    """Merge two ranked result lists with reciprocal rank fusion, dropping duplicate ids."""
+    scores: Dict[str, float] = defaultdict(float)
+    items: Dict[str, dict] = {}
+    for results in (local_results, remote_results):
+        for rank, item in enumerate(results):
+            scores[item["id"]] += 1 / (k + rank + 1)
+            items.setdefault(item["id"], item)
+    ranked_ids = sorted(scores, key=lambda object_id: -scores[object_id])
+    return [items[object_id] for object_id in ranked_ids[:limit]]
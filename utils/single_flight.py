@@ -0,0 +1,106 @@
+import asyncio
+import json
+import threading
+from typing import Any, Awaitable, Callable, Dict
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Collapses identical concurrent calls into one execution. The first caller for a key runs
+    the call; callers arriving while it is in flight wait and receive the same result (or
+    exception). Nothing is cached once the call finishes.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights: Dict[str, _Flight] = {}
+        self._async_flights: Dict[str, asyncio.Future] = {}
+        self.executions = 0
+        self.coalesced = 0
+
+    @staticmethod
+    def key(tool_name: str, arguments: dict) -> str:
+        """Tool name plus canonical JSON of the arguments, so key order and spacing do not matter."""
+        return f"{tool_name}:{json.dumps(arguments, sort_keys=True, separators=(',', ':'), default=str)}"
+
+    def do(self, key: str, function: Callable[[], Any]) -> Any:
+        """Run function() unless an identical call is in flight on another thread, then share its outcome."""
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                self.executions += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = function()
+            return flight.result
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    async def ado(self, key: str, coroutine_function: Callable[[], Awaitable[Any]]) -> Any:
+        """asyncio counterpart of do() for callers on one event loop."""
+        with self._lock:
+            future = self._async_flights.get(key)
+            leader = future is None
+            if leader:
+                future = self._async_flights[key] = asyncio.get_running_loop().create_future()
+                self.executions += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            # shield: a cancelled follower must not cancel the shared call
+            return await asyncio.shield(future)
+
+        try:
+            result = await coroutine_function()
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # Mark retrieved so a call without followers does not log a warning
+            raise
+        finally:
+            with self._lock:
+                self._async_flights.pop(key, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "executions": self.executions,
+                "coalesced": self.coalesced,
+                "in_flight": len(self._flights) + len(self._async_flights),
+            }
+
+
+# Shared by the Flask and ASGI tool endpoints
+TOOL_CALLS = SingleFlight()
+
+
+def is_read_only(tool_class) -> bool:
+    """Only tools that declare read_only = True are coalesced; write tools are never shared."""
+    return bool(getattr(tool_class, "read_only", False))
@@ -0,0 +1,42 @@
+import os
+import threading
+from typing import Iterator, List, Optional
+
+from dotenv import load_dotenv
+from slack_sdk import WebClient
+from slack_sdk.http_retry.builtin_handlers import ConnectionErrorRetryHandler, RateLimitErrorRetryHandler
+
+load_dotenv()
+
+_shared_client: Optional[WebClient] = None
+_shared_client_lock = threading.Lock()
+
+
+def get_slack_client() -> WebClient:
+    """Return the Slack Web API client shared by every tool and helper in this process."""
+    global _shared_client
+    with _shared_client_lock:
+        if _shared_client is None:
+            max_retries = int(os.getenv("SLACK_MAX_RETRIES", 3))
+            _shared_client = WebClient(
+                token=os.getenv("SLACK_BOT_TOKEN"),
+                timeout=int(os.getenv("SLACK_TIMEOUT", 30)),
+                retry_handlers=[ConnectionErrorRetryHandler(max_retries=max_retries), RateLimitErrorRetryHandler(max_retry_count=max_retries)],
+            )
+        return _shared_client
+
+
+def iter_pages(method, items_key: str, **kwargs) -> Iterator[dict]:
+    """Items of every page of a cursor-paginated Web API method, e.g. conversations_list -> channels."""
+    cursor = None
+    while True:
+        response = method(cursor=cursor, **kwargs) if cursor else method(**kwargs)
+        yield from response.get(items_key) or []
+        cursor = (response.get("response_metadata") or {}).get("next_cursor")
+        if not cursor:
+            return
+
+
+def configured_channel_ids() -> List[str]:
+    """Channel ids from SLACK_CHANNEL_IDS (comma separated), the channels the Slack MCP server is limited to."""
+    return [channel_id.strip() for channel_id in os.getenv("SLACK_CHANNEL_IDS", "").split(",") if channel_id.strip()]
@@ -0,0 +1,322 @@
+import json
+import os
+import re
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from dotenv import load_dotenv
+from slack_sdk.signature import SignatureVerifier
+
+from utils.slack_api import get_slack_client, iter_pages
+
+load_dotenv()
+
+CHANNEL_MENTION = re.compile(r"<#([A-Z0-9]+)(?:\|[^>]*)?>")
+USER_MENTION = re.compile(r"<@([A-Z0-9]+)(?:\|[^>]*)?>")
+CHANNEL_ID = re.compile(r"[CGD][A-Z0-9]{6,}")
+USER_ID = re.compile(r"[UW][A-Z0-9]{6,}")
+
+# Channels and users of each kind listed in the Slack agent's instructions; 0 leaves them out
+PROMPT_SUMMARY_LIMIT = int(os.getenv("SLACK_DIRECTORY_PROMPT_LIMIT", 50))
+
+
+def user_display_name(user: dict) -> str:
+    profile = user.get("profile") or {}
+    return profile.get("display_name") or user.get("real_name") or profile.get("real_name") or user.get("name") or user.get("id")
+
+
+class _Directory:
+    """
+    id -> object map of one kind of Slack object, with a name -> id index. Loaded in full on first
+    use and again once ttl seconds have passed. A caller that finds an expired directory while
+    another thread is reloading it gets the previous contents instead of waiting. Single objects
+    are updated in between by put() / remove(), e.g. from Slack events.
+    """
+
+    def __init__(self, kind: str, fetch: Callable[[], Iterable[dict]], names: Callable[[dict], List[str]], ttl: float):
+        self.kind = kind
+        self._fetch = fetch
+        self._names = names
+        self.ttl = ttl
+        self.loaded_at: Optional[float] = None
+        self._checked_at: Optional[float] = None
+        self._by_id: Dict[str, dict] = {}
+        self._ids_by_name: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.RLock()
+        self._changes: Optional[List[Callable[[], None]]] = None
+        self.hits = 0
+        self.misses = 0
+
+    def refresh(self) -> int:
+        with self._refresh_lock:
+            return self._refresh()
+
+    def _refresh(self) -> int:
+        with self._lock:
+            self._changes = []
+        try:
+            items = {item["id"]: item for item in self._fetch() if item.get("id")}
+        except Exception:
+            with self._lock:
+                self._changes = None
+            raise
+        with self._lock:
+            self._by_id = items
+            self._ids_by_name = {}
+            for item in items.values():
+                self._index(item)
+            # Changes that arrived while the listing was being fetched may be missing from it
+            changes, self._changes = self._changes, None
+            for change in changes:
+                change()
+            self.loaded_at = self._checked_at = time.time()
+        return len(items)
+
+    def _index(self, item: dict) -> None:
+        for name in self._names(item):
+            if name:
+                self._ids_by_name[name.lower()] = item["id"]
+
+    def _ensure(self) -> None:
+        if self._checked_at is not None and time.time() - self._checked_at < self.ttl:
+            return
+        # Only the first load makes callers wait; later reloads serve the old contents meanwhile
+        if not self._refresh_lock.acquire(blocking=self.loaded_at is None):
+            return
+        try:
+            if self._checked_at is None or time.time() - self._checked_at >= self.ttl:
+                try:
+                    count = self.refresh()
+                    print(f"Slack {self.kind} directory loaded: {count} entries")
+                except Exception as e:
+                    if self.loaded_at is None:
+                        raise
+                    # Keep serving the previous contents and try again after another ttl
+                    self._checked_at = time.time()
+                    print(f"Slack {self.kind} directory refresh failed, keeping the previous copy: {e}")
+        finally:
+            self._refresh_lock.release()
+
+    def get(self, object_id: str) -> Optional[dict]:
+        self._ensure()
+        with self._lock:
+            item = self._by_id.get(object_id)
+            if item is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return item
+
+    def find(self, name: str) -> Optional[str]:
+        self._ensure()
+        with self._lock:
+            object_id = self._ids_by_name.get(name.lower())
+            if object_id is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return object_id
+
+    def all(self) -> List[dict]:
+        self._ensure()
+        with self._lock:
+            return list(self._by_id.values())
+
+    def put(self, item: dict) -> None:
+        """Add an object or merge changed fields into the stored one."""
+        with self._lock:
+            self._apply(lambda: self._put(item))
+
+    def remove(self, object_id: str) -> None:
+        with self._lock:
+            self._apply(lambda: self._remove(object_id))
+
+    def _apply(self, change: Callable[[], None]) -> None:
+        change()
+        if self._changes is not None:
+            self._changes.append(change)
+
+    def _put(self, item: dict) -> None:
+        merged = dict(self._by_id.get(item["id"], {}), **item)
+        self._by_id[item["id"]] = merged
+        self._unindex(item["id"])
+        self._index(merged)
+
+    def _remove(self, object_id: str) -> None:
+        self._by_id.pop(object_id, None)
+        self._unindex(object_id)
+
+    def _unindex(self, object_id: str) -> None:
+        self._ids_by_name = {name: other_id for name, other_id in self._ids_by_name.items() if other_id != object_id}
+
+    def invalidate(self) -> None:
+        """Reload on next use."""
+        with self._lock:
+            self._checked_at = None
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._by_id), "loaded_at": self.loaded_at, "hits": self.hits, "misses": self.misses}
+
+
+class SlackDirectory:
+    """
+    In-process directories of the workspace's channels and users, each listed with limit=1000 pages.
+    They back every name <-> id lookup of the Slack tools and are kept current by Slack events
+    (see apply_event) between TTL reloads.
+    """
+
+    def __init__(self, ttl: float = 3600, client=None):
+        self._client = client
+        self.channels = _Directory("channels", self._fetch_channels, lambda channel: [channel.get("name")], ttl)
+        self.users = _Directory("users", self._fetch_users, self._user_names, ttl)
+
+    def client(self):
+        return self._client or get_slack_client()
+
+    def _fetch_channels(self) -> Iterable[dict]:
+        return iter_pages(self.client().conversations_list, "channels", types="public_channel,private_channel", limit=1000)
+
+    def _fetch_users(self) -> Iterable[dict]:
+        return iter_pages(self.client().users_list, "members", limit=1000)
+
+    @staticmethod
+    def _user_names(user: dict) -> List[str]:
+        profile = user.get("profile") or {}
+        # Later names win on conflicts, so the unique handle is indexed last
+        return [user.get("real_name"), profile.get("display_name"), user.get("name")]
+
+    def load(self) -> None:
+        """Load both directories now, e.g. at startup."""
+        self.channels.refresh()
+        self.users.refresh()
+
+    def start_background_load(self) -> threading.Thread:
+        """Load both directories in a daemon thread, so the first Slack question does not wait for them."""
+        def run():
+            try:
+                self.load()
+                print(f"Slack directories preloaded: {len(self.channels.all())} channels, {len(self.users.all())} users")
+            except Exception as e:
+                print(f"Slack directory preload failed, loading on first use instead: {e}")
+
+        thread = threading.Thread(target=run, name="slack-directory-preload", daemon=True)
+        thread.start()
+        return thread
+
+    def channel_id(self, reference: str) -> Optional[str]:
+        """Channel id for a <#C..|name> mention, id, #name or name; None if no channel matches."""
+        reference = reference.strip()
+        mention = CHANNEL_MENTION.fullmatch(reference)
+        if mention:
+            return mention.group(1)
+        if CHANNEL_ID.fullmatch(reference):
+            return reference
+        return self.channels.find(reference.lstrip("#"))
+
+    def channel_name(self, channel_id: str) -> Optional[str]:
+        """Name of a channel; None if it is unknown or the directory cannot be loaded."""
+        try:
+            channel = self.channels.get(channel_id)
+        except Exception as e:
+            print(f"Slack channel directory unavailable: {e}")
+            return None
+        return channel.get("name") if channel else None
+
+    def user_id(self, reference: str) -> Optional[str]:
+        """User id for a <@U..> mention, id, @handle, display name or real name; None if no user matches."""
+        reference = reference.strip()
+        mention = USER_MENTION.fullmatch(reference)
+        if mention:
+            return mention.group(1)
+        if USER_ID.fullmatch(reference):
+            return reference
+        return self.users.find(reference.lstrip("@"))
+
+    def user_names(self, user_ids: Iterable[str]) -> Dict[str, str]:
+        """Display names of the given user ids that are known; empty if the directory cannot be loaded."""
+        try:
+            return {user_id: user_display_name(user) for user_id in set(user_ids) if user_id and (user := self.users.get(user_id))}
+        except Exception as e:
+            print(f"Slack user directory unavailable: {e}")
+            return {}
+
+    def prompt_summary(self, limit: Optional[int] = None) -> str:
+        """
+        Up to `limit` (default SLACK_DIRECTORY_PROMPT_LIMIT) channel and user names with their ids,
+        for the agent's instructions; empty if the limit is 0 or the directories are unavailable.
+        """
+        limit = PROMPT_SUMMARY_LIMIT if limit is None else limit
+        if limit <= 0:
+            return ""
+        try:
+            channels = sorted(
+                (channel for channel in self.channels.all() if not channel.get("is_archived")),
+                key=lambda channel: channel.get("name") or "",
+            )
+            users = sorted(
+                (user for user in self.users.all() if not user.get("deleted") and not user.get("is_bot")),
+                key=lambda user: user.get("name") or "",
+            )
+        except Exception as e:
+            print(f"Slack directories unavailable: {e}")
+            return ""
+        lines = ["Known Slack channels (name: id); use these ids instead of listing channels:"]
+        lines += [f"#{channel.get('name')}: {channel['id']}" for channel in channels[:limit]]
+        if len(channels) > limit:
+            lines.append(f"({len(channels) - limit} more channels not listed)")
+        lines += ["Known Slack users (handle / display name: id):"]
+        lines += [f"@{user.get('name')} / {user_display_name(user)}: {user['id']}" for user in users[:limit]]
+        if len(users) > limit:
+            lines.append(f"({len(users) - limit} more users not listed)")
+        return "\n".join(lines)
+
+    def apply_event(self, event: dict) -> bool:
+        """Update the directories from a Slack Events API event; False for events that do not concern them."""
+        event_type = event.get("type")
+        if event_type in ("channel_created", "channel_rename", "group_rename"):
+            self.channels.put(event["channel"])
+        elif event_type in ("channel_deleted", "group_deleted"):
+            self.channels.remove(event["channel"])
+        elif event_type in ("channel_archive", "group_archive", "channel_unarchive", "group_unarchive"):
+            self.channels.put({"id": event["channel"], "is_archived": event_type.endswith("_archive") and not event_type.endswith("unarchive")})
+        elif event_type in ("team_join", "user_change"):
+            self.users.put(event["user"])
+        else:
+            return False
+        return True
+
+    def stats(self) -> dict:
+        return {"channels": self.channels.stats(), "users": self.users.stats()}
+
+
+SLACK_DIRECTORY = SlackDirectory(ttl=float(os.getenv("SLACK_DIRECTORY_TTL", 3600)))
+
+
+def handle_slack_event(body: bytes, headers: dict) -> Tuple[int, dict]:
+    """
+    Slack Events API request -> (status, JSON body). Requests must carry a valid signature for
+    SLACK_SIGNING_SECRET; the url_verification handshake is answered and channel / user events
+    update SLACK_DIRECTORY.
+    """
+    signing_secret = os.getenv("SLACK_SIGNING_SECRET")
+    if not signing_secret:
+        return 503, {"message": "SLACK_SIGNING_SECRET is not set"}
+    if not SignatureVerifier(signing_secret).is_valid_request(body, headers):
+        return 401, {"message": "Invalid Slack signature"}
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        return 400, {"message": "Body must be JSON"}
+    if payload.get("type") == "url_verification":
+        return 200, {"challenge": payload.get("challenge")}
+    if payload.get("type") == "event_callback":
+        try:
+            applied = SLACK_DIRECTORY.apply_event(payload.get("event") or {})
+        except (KeyError, TypeError) as e:
+            print(f"Ignoring malformed Slack event: {e}")
+            applied = False
+        return 200, {"ok": True, "applied": applied}
+    return 200, {"ok": True, "applied": False}
@@ -0,0 +1,147 @@
+import os
+import re
+from typing import List, NamedTuple, Optional
+
+from dotenv import load_dotenv
+
+from utils.metrics import REGISTRY, SLACK_QUERIES, gauge_lines
+from utils.slack_api import configured_channel_ids, get_slack_client
+from utils.slack_directory import SLACK_DIRECTORY
+
+load_dotenv()
+
+
+class SlackIntent(NamedTuple):
+    operation: str
+    channel: Optional[str] = None
+    limit: Optional[int] = None
+
+
+_CHANNEL = r"(?:the\s+)?(?:channel\s+)?(?P<channel><#[A-Z0-9]+(?:\|[^>]*)?>|#?[\w.-]+)(?:\s+channel)?"
+
+# Whole-query patterns only: anything less certain goes to the agent
+_INTENTS = [
+    ("list_channels", re.compile(r"(?:(?:list|show|get|what are)\s+)?(?:me\s+)?(?:all\s+)?(?:the\s+)?(?:available\s+)?(?:slack\s+)?channels(?:\s+and\s+(?:their\s+)?ids)?", re.IGNORECASE)),
+    ("channel_info", re.compile(r"(?:(?:get|show|fetch)\s+)?(?:the\s+)?(?:channel\s+)?info(?:rmation)?\s+(?:(?:for|about|on|of)\s+)?" + _CHANNEL, re.IGNORECASE)),
+    ("channel_history", re.compile(
+        r"(?:(?:get|show|read|fetch)\s+)?(?:me\s+)?(?:the\s+)?(?:latest|recent|last|newest)\s+(?:(?P<limit>\d+)\s+)?messages?\s+(?:in|from|on)\s+" + _CHANNEL,
+        re.IGNORECASE,
+    )),
+]
+
+DEFAULT_HISTORY_LIMIT = 10
+MAX_HISTORY_LIMIT = 100
+
+
+def fast_path_enabled() -> bool:
+    """Simple Slack queries skip the agent unless SLACK_FAST_PATH=0."""
+    return os.getenv("SLACK_FAST_PATH", "1").lower() not in ("0", "false", "no")
+
+
+def parse_intent(query: str) -> Optional[SlackIntent]:
+    """The Slack operation a query asks for, when it is one of the simple ones answered without the agent."""
+    text = re.sub(r"\s+", " ", query or "").strip().rstrip(".!?").strip()
+    text = re.sub(r"^please |,? please$", "", text, flags=re.IGNORECASE)
+    for operation, pattern in _INTENTS:
+        match = pattern.fullmatch(text)
+        if match is not None:
+            groups = match.groupdict()
+            limit = int(groups["limit"]) if groups.get("limit") else None
+            return SlackIntent(operation, groups.get("channel"), limit)
+    return None
+
+
+def _channel_summary(channel: dict) -> dict:
+    return {
+        "id": channel.get("id"),
+        "name": channel.get("name"),
+        "is_private": channel.get("is_private", False),
+        "is_archived": channel.get("is_archived", False),
+        "num_members": channel.get("num_members"),
+        "topic": (channel.get("topic") or {}).get("value", ""),
+        "purpose": (channel.get("purpose") or {}).get("value", ""),
+    }
+
+
+def list_channels(client) -> List[dict]:
+    """Channels the Slack MCP server would list: SLACK_CHANNEL_IDS when set, otherwise every public channel."""
+    channel_ids = configured_channel_ids()
+    if channel_ids:
+        return [_channel_summary(SLACK_DIRECTORY.channels.get(channel_id) or client.conversations_info(channel=channel_id)["channel"]) for channel_id in channel_ids]
+    channels = sorted(SLACK_DIRECTORY.channels.all(), key=lambda channel: channel.get("name") or "")
+    return [_channel_summary(channel) for channel in channels if not channel.get("is_private") and not channel.get("is_archived")]
+
+
+def resolve_channel(reference: str) -> str:
+    """
+    Channel id for a #name, bare name, <#C123|name> mention or id; LookupError when no channel
+    matches or the channel is outside SLACK_CHANNEL_IDS, so the agent decides what to do with it.
+    """
+    channel_id = SLACK_DIRECTORY.channel_id(reference)
+    if channel_id is None:
+        raise LookupError(f"No Slack channel named #{reference.lstrip('#')}")
+    channel_ids = configured_channel_ids()
+    if channel_ids and channel_id not in channel_ids:
+        raise LookupError(f"Slack channel {channel_id} is not in SLACK_CHANNEL_IDS")
+    return channel_id
+
+
+def _message_summary(message: dict, user_names: dict) -> dict:
+    summary = {"ts": message.get("ts"), "user": message.get("user") or message.get("bot_id"), "text": message.get("text", "")}
+    if summary["user"] in user_names:
+        summary["user_name"] = user_names[summary["user"]]
+    if message.get("reply_count"):
+        summary["reply_count"] = message["reply_count"]
+    if message.get("thread_ts") and message.get("thread_ts") != message.get("ts"):
+        summary["thread_ts"] = message["thread_ts"]
+    return summary
+
+
+def run_intent(intent: SlackIntent, client=None) -> dict:
+    """Answer an intent with one or a few Slack Web API calls."""
+    client = client or get_slack_client()
+    if intent.operation == "list_channels":
+        channels = list_channels(client)
+        return {"operation": "list_channels", "channels": channels, "count": len(channels)}
+    channel_id = resolve_channel(intent.channel)
+    if intent.operation == "channel_info":
+        channel = client.conversations_info(channel=channel_id, include_num_members=True)["channel"]
+        return {"operation": "channel_info", "channel": _channel_summary(channel)}
+    limit = min(intent.limit or DEFAULT_HISTORY_LIMIT, MAX_HISTORY_LIMIT)
+    messages = client.conversations_history(channel=channel_id, limit=limit).get("messages") or []
+    user_names = SLACK_DIRECTORY.user_names(message.get("user") for message in messages)
+    return {"operation": "channel_history", "channel": channel_id, "messages": [_message_summary(message, user_names) for message in messages]}
+
+
+def try_fast_path(query: str) -> Optional[dict]:
+    """
+    The direct Web API answer to a simple query, or None when the query should go to the agent:
+    it is not recognised (route "llm") or the direct call failed (route "fallback").
+    """
+    intent = parse_intent(query)
+    if intent is None:
+        SLACK_QUERIES.inc("llm", "")
+        return None
+    try:
+        result = run_intent(intent)
+    except Exception as e:
+        print(f"Slack fast path for {intent.operation} failed, falling back to the agent: {e}")
+        SLACK_QUERIES.inc("fallback", intent.operation)
+        return None
+    SLACK_QUERIES.inc("fast_path", intent.operation)
+    return result
+
+
+def fast_path_stats() -> dict:
+    counts = {"fast_path": 0, "fallback": 0, "llm": 0}
+    for (route, _), value in SLACK_QUERIES.values().items():
+        counts[route] = counts.get(route, 0) + value
+    total = sum(counts.values())
+    return dict(counts, hit_ratio=round(counts["fast_path"] / total, 4) if total else 0.0)
+
+
+def _fast_path_lines() -> List[str]:
+    return gauge_lines("slack_fast_path_hit_ratio", "SlackMCPTool queries answered without the agent / all queries.", {(): fast_path_stats()["hit_ratio"]})
+
+
+REGISTRY.add_collector(_fast_path_lines)
@@ -0,0 +1,277 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from dotenv import load_dotenv
+
+from utils.slack_api import configured_channel_ids, get_slack_client, iter_pages
+from utils.slack_directory import SLACK_DIRECTORY
+
+load_dotenv()
+
+DEFAULT_STORE_PATH = os.path.join(os.path.dirname(__file__), "..", ".cache", "slack_messages.sqlite3")
+
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+_MESSAGE_COLUMNS = ("channel_id", "ts", "thread_ts", "user", "text", "reply_count")
+
+
+def _iso(timestamp: Optional[float]) -> Optional[str]:
+    if timestamp is None:
+        return None
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat()
+
+
+def fts_query(text: str) -> str:
+    """An FTS5 MATCH expression requiring every word of text, with FTS operators quoted away."""
+    return " ".join(f'"{token}"' for token in TOKEN_PATTERN.findall(text))
+
+
+class SlackMessageStore:
+    """
+    Local SQLite copy of Slack channel histories with an FTS5 index over message text.
+
+    The first sync of a channel fetches backfill_days of history. Each later sync only asks
+    conversations.history for messages newer than the newest one stored (its `oldest` cursor).
+    Replies are fetched with conversations.replies, starting after the newest reply already stored.
+    This happens for threads whose parent shows new replies, and for threads started within the
+    last thread_window seconds, whose parents an incremental history call does not return again.
+    Edits and deletions of older messages are not picked up.
+    """
+
+    def __init__(self, path: str = DEFAULT_STORE_PATH, backfill_days: float = 30, thread_window: float = 3 * 24 * 3600):
+        self.path = path
+        self.backfill_days = backfill_days
+        self.thread_window = thread_window
+        self._lock = threading.Lock()
+        self._sync_locks: Dict[str, threading.Lock] = {}
+        self._background_thread = None
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS messages (
+                channel_id TEXT NOT NULL,
+                ts TEXT NOT NULL,
+                thread_ts TEXT,
+                user TEXT,
+                text TEXT,
+                reply_count INTEGER,
+                payload TEXT NOT NULL,
+                PRIMARY KEY (channel_id, ts)
+            );
+            CREATE INDEX IF NOT EXISTS idx_messages_thread ON messages (channel_id, thread_ts);
+            CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5(text, tokenize = 'unicode61');
+            CREATE TABLE IF NOT EXISTS threads (
+                channel_id TEXT NOT NULL,
+                thread_ts TEXT NOT NULL,
+                latest_reply_ts TEXT,
+                PRIMARY KEY (channel_id, thread_ts)
+            );
+            CREATE TABLE IF NOT EXISTS sync_state (
+                channel_id TEXT PRIMARY KEY,
+                channel_name TEXT,
+                latest_ts TEXT,
+                synced_at REAL
+            );
+            """
+        )
+        self._conn.commit()
+
+    def _sync_lock(self, channel_id: str) -> threading.Lock:
+        with self._lock:
+            return self._sync_locks.setdefault(channel_id, threading.Lock())
+
+    def sync_state(self, channel_id: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT channel_name, latest_ts, synced_at FROM sync_state WHERE channel_id = ?", (channel_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {"channel_name": row[0], "latest_ts": row[1], "synced_at": row[2]}
+
+    def _store_messages(self, channel_id: str, messages: List[dict]) -> None:
+        with self._lock:
+            for message in messages:
+                if not message.get("ts"):
+                    continue
+                self._conn.execute(
+                    """
+                    INSERT INTO messages (channel_id, ts, thread_ts, user, text, reply_count, payload) VALUES (?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (channel_id, ts) DO UPDATE SET
+                        thread_ts = excluded.thread_ts, user = excluded.user, text = excluded.text,
+                        reply_count = excluded.reply_count, payload = excluded.payload
+                    """,
+                    (channel_id, message["ts"], message.get("thread_ts"), message.get("user") or message.get("bot_id"),
+                     message.get("text", ""), message.get("reply_count", 0), json.dumps(message)),
+                )
+                # The upsert keeps the row's rowid, which is also the message's FTS rowid
+                (rowid,) = self._conn.execute("SELECT rowid FROM messages WHERE channel_id = ? AND ts = ?", (channel_id, message["ts"])).fetchone()
+                self._conn.execute("DELETE FROM messages_fts WHERE rowid = ?", (rowid,))
+                self._conn.execute("INSERT INTO messages_fts (rowid, text) VALUES (?, ?)", (rowid, message.get("text", "")))
+            self._conn.commit()
+
+    def _sync_thread(self, client, channel_id: str, thread_ts: str) -> int:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT latest_reply_ts FROM threads WHERE channel_id = ? AND thread_ts = ?", (channel_id, thread_ts)
+            ).fetchone()
+        oldest = row[0] if row and row[0] else thread_ts
+        replies = list(iter_pages(client.conversations_replies, "messages", channel=channel_id, ts=thread_ts, oldest=oldest, limit=200))
+        # conversations.replies always returns the parent too; it is stored again with its new reply_count
+        self._store_messages(channel_id, replies)
+        latest_reply_ts = max([message["ts"] for message in replies if message.get("ts") != thread_ts] + [oldest])
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO threads (channel_id, thread_ts, latest_reply_ts) VALUES (?, ?, ?)",
+                (channel_id, thread_ts, latest_reply_ts),
+            )
+            self._conn.commit()
+        return sum(1 for message in replies if message.get("ts") != thread_ts and message["ts"] > oldest)
+
+    def sync(self, channel_id: str, client=None) -> dict:
+        """Fetch what is new in one channel since its last sync and return a summary."""
+        client = client or get_slack_client()
+        with self._sync_lock(channel_id):
+            state = self.sync_state(channel_id)
+            started_at = time.time()
+            oldest = state["latest_ts"] if state and state["latest_ts"] else f"{started_at - self.backfill_days * 86400:.6f}"
+            channel_name = SLACK_DIRECTORY.channel_name(channel_id) or client.conversations_info(channel=channel_id)["channel"].get("name")
+
+            messages = list(iter_pages(client.conversations_history, "messages", channel=channel_id, oldest=oldest, limit=200))
+            self._store_messages(channel_id, messages)
+            latest_ts = max([message["ts"] for message in messages if message.get("ts")] + ([state["latest_ts"]] if state and state["latest_ts"] else []), default=None)
+
+            with self._lock:
+                known = dict(self._conn.execute("SELECT thread_ts, latest_reply_ts FROM threads WHERE channel_id = ?", (channel_id,)).fetchall())
+            threads = {message["ts"] for message in messages if message.get("reply_count") and message.get("latest_reply", "") > (known.get(message["ts"]) or "")}
+            window_start = f"{started_at - self.thread_window:.6f}"
+            threads.update(thread_ts for thread_ts in known if thread_ts >= window_start)
+            replies = sum(self._sync_thread(client, channel_id, thread_ts) for thread_ts in sorted(threads))
+
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO sync_state (channel_id, channel_name, latest_ts, synced_at) VALUES (?, ?, ?, ?)",
+                    (channel_id, channel_name, latest_ts, started_at),
+                )
+                self._conn.commit()
+            return {
+                "channel_id": channel_id,
+                "mode": "incremental" if state else "backfill",
+                "messages_fetched": len(messages),
+                "threads_checked": len(threads),
+                "replies_fetched": replies,
+                "synced_at": _iso(started_at),
+            }
+
+    def sync_all(self, channel_ids: Optional[list] = None) -> list:
+        """Sync every configured channel (SLACK_CHANNEL_IDS), reporting failures instead of raising."""
+        results = []
+        for channel_id in channel_ids or configured_channel_ids():
+            try:
+                results.append(self.sync(channel_id))
+            except Exception as e:
+                results.append({"channel_id": channel_id, "error": str(e)})
+        return results
+
+    def ensure_fresh(self, channel_ids: List[str], max_staleness: float) -> None:
+        """
+        Sync channels never synced or last synced more than max_staleness seconds ago. A failed
+        sync of a channel that has stored messages is reported and its stored copy is served.
+        """
+        for channel_id in channel_ids:
+            state = self.sync_state(channel_id)
+            if state is not None and time.time() - state["synced_at"] <= max_staleness:
+                continue
+            try:
+                self.sync(channel_id)
+            except Exception as e:
+                if state is None:
+                    raise
+                print(f"Slack store sync failed for {channel_id}, serving the stored copy: {e}")
+
+    def resolve_channel(self, reference: str) -> Optional[str]:
+        """Stored channel id for an id, #name or name."""
+        name = reference.strip().lstrip("#")
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT channel_id FROM sync_state WHERE channel_id = ? OR lower(channel_name) = lower(?)", (name, name)
+            ).fetchone()
+        return row[0] if row else None
+
+    def freshness(self, channel_ids: List[str]) -> Dict[str, dict]:
+        """When each channel was last synced and how old that copy is."""
+        now = time.time()
+        result = {}
+        for channel_id in channel_ids:
+            state = self.sync_state(channel_id)
+            result[channel_id] = {
+                "channel_name": state["channel_name"] if state else None,
+                "synced_at": _iso(state["synced_at"]) if state else None,
+                "staleness_seconds": round(now - state["synced_at"], 1) if state else None,
+                "latest_ts": state["latest_ts"] if state else None,
+            }
+        return result
+
+    def read(self, channel_id: str, thread_ts: Optional[str] = None, limit: int = 20) -> List[dict]:
+        """Latest top-level messages of a channel, newest first; or a thread, parent first."""
+        with self._lock:
+            if thread_ts:
+                rows = self._conn.execute(
+                    f"SELECT {', '.join(_MESSAGE_COLUMNS)} FROM messages WHERE channel_id = ? AND (thread_ts = ? OR ts = ?) ORDER BY ts LIMIT ?",
+                    (channel_id, thread_ts, thread_ts, limit),
+                ).fetchall()
+            else:
+                rows = self._conn.execute(
+                    f"SELECT {', '.join(_MESSAGE_COLUMNS)} FROM messages WHERE channel_id = ? AND (thread_ts IS NULL OR thread_ts = ts) ORDER BY ts DESC LIMIT ?",
+                    (channel_id, limit),
+                ).fetchall()
+        return [dict(zip(_MESSAGE_COLUMNS, row)) for row in rows]
+
+    def search(self, query: str, channel_ids: Optional[List[str]] = None, limit: int = 20) -> List[dict]:
+        """Stored messages containing every word of query, best BM25 match first, with a highlighted snippet."""
+        match = fts_query(query)
+        if not match:
+            return []
+        sql = (
+            f"SELECT {', '.join('m.' + column for column in _MESSAGE_COLUMNS)}, snippet(messages_fts, 0, '*', '*', '...', 16), bm25(messages_fts) AS score"
+            " FROM messages_fts JOIN messages m ON m.rowid = messages_fts.rowid WHERE messages_fts MATCH ?"
+        )
+        params: list = [match]
+        if channel_ids:
+            sql += f" AND m.channel_id IN ({', '.join('?' for _ in channel_ids)})"
+            params.extend(channel_ids)
+        sql += " ORDER BY score LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [dict(zip(_MESSAGE_COLUMNS + ("snippet", "score"), row[:-1] + (round(-row[-1], 4),))) for row in rows]
+
+    def start_background_sync(self, interval: float, channel_ids: Optional[list] = None) -> None:
+        """Sync all configured channels every interval seconds on a daemon thread."""
+        if self._background_thread is not None:
+            return
+
+        def loop():
+            while True:
+                for result in self.sync_all(channel_ids):
+                    if "error" in result:
+                        print(f"Slack store sync failed for {result['channel_id']}: {result['error']}")
+                time.sleep(interval)
+
+        self._background_thread = threading.Thread(target=loop, name="slack-store-sync", daemon=True)
+        self._background_thread.start()
+
+
+SLACK_STORE = SlackMessageStore(
+    path=os.getenv("SLACK_STORE_PATH", DEFAULT_STORE_PATH),
+    backfill_days=float(os.getenv("SLACK_STORE_BACKFILL_DAYS", 30)),
+    thread_window=float(os.getenv("SLACK_STORE_THREAD_WINDOW", 3 * 24 * 3600)),
+)
@@ -0,0 +1,169 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DEFAULT_MANIFEST_PATH = os.path.join(os.path.dirname(__file__), "..", ".cache", "tool_manifest.json")
+MANIFEST_VERSION = 2
+
+
+def _sha256(path: str) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+class LazyTool:
+    """
+    Stand-in for a tool class listed in the manifest. The tool module is imported on the first
+    call (or load()), so server boot does not pay for importing every tool. Calling it with the
+    tool's parameters returns a tool instance, exactly like calling the tool class.
+    """
+
+    def __init__(self, entry: dict):
+        self.entry = entry
+        self.__name__ = entry["name"]
+        self._tool_class = None
+        self._lock = threading.Lock()
+
+    @property
+    def openai_schema(self) -> dict:
+        return self.entry["openai_schema"]
+
+    @property
+    def read_only(self) -> bool:
+        return self.entry.get("read_only", False)
+
+    @property
+    def loaded(self) -> bool:
+        return self._tool_class is not None
+
+    def load(self):
+        if self._tool_class is None:
+            with self._lock:
+                if self._tool_class is None:
+                    from agency_swarm.tools import ToolFactory
+                    started_at = time.perf_counter()
+                    self._tool_class = ToolFactory.from_file(self.entry["path"])
+                    print(f"Imported tool {self.__name__} in {(time.perf_counter() - started_at) * 1000:.0f} ms")
+        return self._tool_class
+
+    def __call__(self, **kwargs):
+        return self.load()(**kwargs)
+
+    def __repr__(self) -> str:
+        return f"<LazyTool {self.__name__}{' (loaded)' if self.loaded else ''}>"
+
+
+def _discover_tool_files(tools_folder: str) -> List[Tuple[str, str]]:
+    """(folder, path) for every .py file under tools_folder, with the folder naming used by main.parse_all_tools."""
+    found = []
+    for root, dirs, files in os.walk(tools_folder):
+        dirs[:] = sorted(d for d in dirs if d != "__pycache__")
+        relative_path = os.path.relpath(root, tools_folder)
+        folder = relative_path if relative_path != '.' else 'root'
+        for filename in sorted(files):
+            if filename.endswith('.py'):
+                found.append((folder, os.path.join(root, filename)))
+    return found
+
+
+def _build_entry(folder: str, path: str, stat: os.stat_result, sha256: str) -> dict:
+    # agency_swarm is only imported when a manifest entry has to be rebuilt
+    from agency_swarm.tools import ToolFactory
+    tool_class = ToolFactory.from_file(path)
+    return {
+        "name": tool_class.__name__,
+        "folder": folder,
+        "route": f"/{tool_class.__name__}",
+        "path": path,
+        "mtime_ns": stat.st_mtime_ns,
+        "size": stat.st_size,
+        "sha256": sha256,
+        "openai_schema": tool_class.openai_schema,
+        "read_only": bool(getattr(tool_class, "read_only", False)),
+    }
+
+
+def load_tool_manifest(tools_folder: str = './tools', manifest_path: Optional[str] = None) -> Tuple[Dict[str, List[LazyTool]], dict]:
+    """
+    Return ({folder: [LazyTool, ...]}, stats) for every tool file under tools_folder.
+
+    Entries are cached in a JSON manifest keyed by file path. An entry is reused when the
+    file's mtime and size are unchanged, or when its content hash still matches (e.g. after a
+    fresh checkout); only new or changed files are imported to rebuild their entry.
+    """
+    started_at = time.perf_counter()
+    manifest_path = manifest_path or os.getenv("TOOL_MANIFEST_PATH", DEFAULT_MANIFEST_PATH)
+    cached = {}
+    try:
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        if manifest.get("version") == MANIFEST_VERSION:
+            cached = manifest.get("tools", {})
+    except (OSError, ValueError):
+        pass
+
+    entries = {}
+    stats = {"tools": 0, "cached": 0, "rebuilt": 0}
+    for folder, path in _discover_tool_files(tools_folder):
+        stat = os.stat(path)
+        entry = cached.get(path)
+        if entry and entry["folder"] == folder and (entry["mtime_ns"], entry["size"]) == (stat.st_mtime_ns, stat.st_size):
+            stats["cached"] += 1
+        else:
+            sha256 = _sha256(path)
+            if entry and entry["folder"] == folder and entry["sha256"] == sha256:
+                entry = dict(entry, mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+                stats["cached"] += 1
+            else:
+                entry = _build_entry(folder, path, stat, sha256)
+                stats["rebuilt"] += 1
+        entries[path] = entry
+    stats["tools"] = len(entries)
+
+    if entries != cached:
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(manifest_path)), exist_ok=True)
+            tmp_path = f"{manifest_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump({"version": MANIFEST_VERSION, "tools": entries}, f, indent=2)
+            os.replace(tmp_path, manifest_path)
+        except OSError as e:
+            print(f"Could not write tool manifest {manifest_path}: {e}")
+
+    tools_by_folder = {}
+    for entry in entries.values():
+        tools_by_folder.setdefault(entry["folder"], []).append(LazyTool(entry))
+    stats["elapsed_ms"] = round((time.perf_counter() - started_at) * 1000, 1)
+    return tools_by_folder, stats
+
+
+def get_openapi_schema(tools: List[LazyTool], url: str, title="Agent Tools", description="A collection of tools.") -> str:
+    """ToolFactory.get_openapi_schema built from the cached manifest schemas, without importing the tools."""
+    schema = {
+        "openapi": "3.1.0",
+        "info": {"title": title, "description": description, "version": "v1.0.0"},
+        "servers": [{"url": url}],
+        "paths": {},
+        "components": {"schemas": {}, "securitySchemes": {"apiKey": {"type": "apiKey"}}},
+    }
+    for tool in tools:
+        openai_schema = json.loads(json.dumps(tool.openai_schema))
+        defs = openai_schema["parameters"].pop("$defs", {})
+        schema["paths"]["/" + openai_schema["name"]] = {
+            "post": {
+                "description": openai_schema["description"],
+                "operationId": openai_schema["name"],
+                "x-openai-isConsequential": False,
+                "parameters": [],
+                "requestBody": {"content": {"application/json": {"schema": openai_schema["parameters"]}}},
+            }
+        }
+        schema["components"]["schemas"].update(defs)
+    return json.dumps(schema, indent=2).replace("#/$defs/", "#/components/schemas/")
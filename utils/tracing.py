@@ -0,0 +1,218 @@
+import contextvars
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Iterator, List, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DEFAULT_TRACE_DIR = os.path.join(os.path.dirname(__file__), "..", ".cache", "traces")
+
+
+class Span:
+    def __init__(self, name: str, span_id: int, parent_id: Optional[int], args: dict):
+        self.name = name
+        self.span_id = span_id
+        self.parent_id = parent_id
+        self.args = args
+        self.thread_id = threading.get_ident()
+        self.start_ns = time.perf_counter_ns()
+        self.end_ns: Optional[int] = None
+
+    def set(self, **args) -> None:
+        self.args.update(args)
+
+
+class _NoopSpan:
+    """Returned by span() when no trace is active, so callers never need to check."""
+    span_id = None
+
+    def set(self, **args) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class Trace:
+    """Spans recorded for one request, from every thread and task working on it."""
+
+    def __init__(self, name: str):
+        self.trace_id = uuid.uuid4().hex
+        self.name = name
+        self.spans: List[Span] = []
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def new_span(self, name: str, parent_id: Optional[int], args: dict) -> Span:
+        with self._lock:
+            self._next_id += 1
+            span_id = self._next_id
+        return Span(name, span_id, parent_id, args)
+
+    def finish(self, span: Span) -> None:
+        span.end_ns = time.perf_counter_ns()
+        with self._lock:
+            self.spans.append(span)
+
+    def to_chrome_trace(self) -> dict:
+        """
+        Chrome trace-event JSON (chrome://tracing, Perfetto). Concurrent spans cannot overlap on
+        one track, so each span is put on a lane (tid) where it nests cleanly, preferring its
+        parent's lane; args carry span_id / parent_id to follow the tree across lanes.
+        """
+        with self._lock:
+            spans = sorted(self.spans, key=lambda span: (span.start_ns, -span.end_ns))
+        if not spans:
+            return {"traceEvents": [], "displayTimeUnit": "ms", "otherData": {"trace_id": self.trace_id, "name": self.name}}
+        origin = spans[0].start_ns
+        lanes: List[List[int]] = []  # per lane, end times of the spans still open at the current start
+        lane_of = {}
+        events = []
+        for span in spans:
+            candidates = ([lane_of[span.parent_id]] if span.parent_id in lane_of else []) + list(range(len(lanes)))
+            for lane in candidates:
+                stack = lanes[lane]
+                while stack and stack[-1] <= span.start_ns:
+                    stack.pop()
+                if not stack or stack[-1] >= span.end_ns:
+                    break
+            else:
+                lanes.append([])
+                lane = len(lanes) - 1
+            lanes[lane].append(span.end_ns)
+            lane_of[span.span_id] = lane
+            events.append({
+                "name": span.name,
+                "ph": "X",
+                "ts": (span.start_ns - origin) / 1000,
+                "dur": (span.end_ns - span.start_ns) / 1000,
+                "pid": 1,
+                "tid": lane,
+                "args": dict(span.args, span_id=span.span_id, parent_id=span.parent_id),
+            })
+        events.append({"name": "process_name", "ph": "M", "pid": 1, "args": {"name": self.name}})
+        return {"traceEvents": events, "displayTimeUnit": "ms", "otherData": {"trace_id": self.trace_id, "name": self.name}}
+
+
+_current_trace: contextvars.ContextVar[Optional[Trace]] = contextvars.ContextVar("current_trace", default=None)
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("current_span", default=None)
+
+
+def current_span():
+    """The innermost open span of the active trace, or a no-op span."""
+    return _current_span.get() or _NOOP_SPAN
+
+
+@contextmanager
+def span(name: str, parent=None, **args) -> Iterator:
+    """
+    Record a span in the active trace; a no-op when no trace is active. The parent defaults to
+    the innermost open span; pass parent explicitly where work is scheduled outside the span that
+    caused it (e.g. the next level of a breadth-first tree walk).
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        yield _NOOP_SPAN
+        return
+    if parent is None:
+        parent = _current_span.get()
+    current = trace.new_span(name, getattr(parent, "span_id", None), args)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.set(error=type(e).__name__)
+        raise
+    finally:
+        _current_span.reset(token)
+        trace.finish(current)
+
+
+def traced(name: str, *recorded_args: str):
+    """Decorator running a function inside span(name), recording the named arguments."""
+    def decorator(function):
+        signature = inspect.signature(function)
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if _current_trace.get() is None:
+                return function(*args, **kwargs)
+            bound = signature.bind_partial(*args, **kwargs).arguments
+            with span(name, **{key: bound[key] for key in recorded_args if key in bound}):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+@contextmanager
+def start_trace(name: str, **args) -> Iterator[Trace]:
+    """Trace everything done in this context (including run_sync coroutines and copied contexts) under one root span."""
+    trace = Trace(name)
+    token = _current_trace.set(trace)
+    try:
+        with span(name, **args):
+            yield trace
+    finally:
+        _current_trace.reset(token)
+
+
+def trace_requested(header_value: Optional[str], query_value: Optional[str] = None) -> bool:
+    """Tracing is opt-in per request with X-Trace: 1 (or ?trace=1)."""
+    return any(value and value.lower() in ("1", "true", "yes") for value in (header_value, query_value))
+
+
+def save_trace(trace: Trace, trace_dir: Optional[str] = None) -> str:
+    """Write the Chrome trace JSON to TRACE_DIR/<trace_id>.json, prune old traces and return the path."""
+    trace_dir = trace_dir or os.getenv("TRACE_DIR", DEFAULT_TRACE_DIR)
+    os.makedirs(trace_dir, exist_ok=True)
+    path = os.path.join(trace_dir, f"{trace.trace_id}.json")
+    with open(path, "w") as f:
+        json.dump(trace.to_chrome_trace(), f)
+    prune_traces(trace_dir, max_files=int(os.getenv("TRACE_MAX_FILES", 500)), ttl=float(os.getenv("TRACE_TTL", 24 * 3600)))
+    return path
+
+
+def prune_traces(trace_dir: str, max_files: int, ttl: float) -> int:
+    """Delete saved traces older than ttl seconds, then the oldest ones beyond max_files. Returns how many were deleted."""
+    traces = []
+    for entry in os.scandir(trace_dir):
+        if entry.name.endswith(".json"):
+            try:
+                traces.append((entry.stat().st_mtime, entry.path))
+            except OSError:
+                continue
+    traces.sort(reverse=True)
+    cutoff = time.time() - ttl
+    expired = [path for index, (mtime, path) in enumerate(traces) if index >= max_files or mtime < cutoff]
+    for path in expired:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+    return len(expired)
+
+
+def trace_headers(trace: Trace) -> dict:
+    """Save the trace and return the debug response header with its id (served by /traces/<id>)."""
+    save_trace(trace)
+    return {"X-Trace-Id": trace.trace_id}
+
+
+def load_trace(trace_id: str, trace_dir: Optional[str] = None) -> Optional[str]:
+    """Saved trace JSON by id, or None. Only hex ids are accepted, so no path can be injected."""
+    if not trace_id or any(c not in "0123456789abcdef" for c in trace_id):
+        return None
+    path = os.path.join(trace_dir or os.getenv("TRACE_DIR", DEFAULT_TRACE_DIR), f"{trace_id}.json")
+    try:
+        with open(path) as f:
+            return f.read()
+    except OSError:
+        return None